@@ -0,0 +1,293 @@
+import asyncio
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from hedging import async_hedged_call
+from metrics import RequestTiming
+from resilience import backoff_time
+from safe_requests import BROWSER_HEADERS, FetchResult
+from singleflight import request_key
+
+# 与 safe_requests 中 Retry 配置保持一致
+RETRY_STATUS = {500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"HEAD", "GET", "OPTIONS"}
+
+
+class AsyncSafeClient:
+    """
+    基于共享 aiohttp.ClientSession 的异步请求客户端。
+
+    通过全局信号量和按主机划分的信号量限制并发，即使一次创建上千个任务，
+    同时打开的连接数也不会超过 limit / limit_per_host。
+
+    参数:
+        limit (int): 全局最大并发请求数，默认 100
+        limit_per_host (int): 单个主机最大并发请求数，默认 10
+        headers (dict, optional): 额外的默认请求头，会覆盖 BROWSER_HEADERS 中的同名字段
+        rate_limiter (HostRateLimiter or AutoThrottle, optional): 按主机限速器，可与 SafeClient 共享同一实例
+        metrics (Metrics, optional): 记录每个请求的 DNS/建连/首字节/下载耗时，见 metrics 模块
+        circuit_breaker (CircuitBreaker, optional): 按主机熔断，可与 SafeClient 共享，见 resilience 模块
+        retry_budget (RetryBudget, optional): 重试预算，限制重试占总请求的比例
+        jitter (bool): 重试退避时间是否加入随机抖动，默认 True
+        hedge_policy (HedgePolicy, optional): 对冲请求策略，request(..., hedge=True) 时生效，见 hedging 模块
+        single_flight (AsyncSingleFlight, optional): 合并同时发出的相同请求，见 singleflight 模块
+        coalesce_post (bool): 配置了 single_flight 时，请求体相同的 POST 是否也合并，默认 False
+    """
+
+    def __init__(self, limit=100, limit_per_host=10, headers=None, rate_limiter=None, metrics=None,
+                 circuit_breaker=None, retry_budget=None, jitter=True, hedge_policy=None,
+                 single_flight=None, coalesce_post=False):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.headers = {**BROWSER_HEADERS, **(headers or {})}
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.circuit_breaker = circuit_breaker
+        self.retry_budget = retry_budget
+        self.jitter = jitter
+        self.hedge_policy = hedge_policy
+        self.single_flight = single_flight
+        self.coalesce_post = coalesce_post
+        self._session = None
+        self._loop = None
+        self._semaphore = None
+        self._host_semaphores = {}
+
+    def _bind_loop(self):
+        """Session 和信号量都绑定在事件循环上，换了循环（如多次 asyncio.run）就重新创建"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._session = None
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._host_semaphores = {}
+
+    def _get_session(self):
+        self._bind_loop()
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            trace_configs = [self.metrics.trace_config()] if self.metrics is not None else None
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector,
+                                                  trace_configs=trace_configs)
+        return self._session
+
+    def _host_semaphore(self, host):
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.limit_per_host)
+        return semaphore
+
+    async def request(self, method, url, hedge=False, **kwargs):
+        """
+        发送异步请求，返回 FetchResult，字段与 safe_get / safe_post 相同：
+        success、response、data、error。
+
+        关键字参数:
+            headers、timeout、max_retries、backoff_factor、return_json: 含义见 safe_get
+            retry_post: 声明该 POST 是幂等的，允许重试并附带 Idempotency-Key
+            hedge (bool): 配置了 hedge_policy 时，GET/HEAD 请求超过该主机 p95 延迟未返回会发出对冲请求，
+                先返回的结果胜出，另一个任务被取消
+            其余参数（data、json、params 等）原样传给 aiohttp
+
+        对 5xx 和连接错误按指数退避重试；建连失败对所有方法重试，超时、5xx 和连接中途断开只对幂等方法重试。
+        配置了 single_flight 时，同时发出的相同 GET/HEAD（以及 coalesce_post=True 时的相同 POST）只请求一次。
+        """
+        method = method.upper()
+
+        async def send():
+            if hedge and self.hedge_policy is not None and method in ("GET", "HEAD"):
+                return await async_hedged_call(self.hedge_policy, urlsplit(url).netloc,
+                                               lambda: self._send(method, url, **kwargs))
+            return await self._send(method, url, **kwargs)
+
+        flight = self.single_flight
+        if flight is not None and (method in ("GET", "HEAD") or (method == "POST" and self.coalesce_post)):
+            return await flight.do(request_key(method, url, kwargs), send)
+        return await send()
+
+    async def _send(self, method, url,
+                    headers=None,
+                    timeout=10,
+                    max_retries=2,
+                    backoff_factor=1,
+                    return_json=False,
+                    retry_post=False,
+                    **kwargs):
+        host = urlsplit(url).netloc
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow(host):
+            return FetchResult.failure(f"熔断中：{host} 连续失败，暂停请求")
+        if self.retry_budget is not None:
+            self.retry_budget.deposit()
+        retry_post = retry_post and method == "POST"
+        if retry_post:
+            headers = {'Idempotency-Key': str(uuid.uuid4()), **(headers or {})}
+
+        timing = RequestTiming(host, method) if self.metrics is not None else None
+        started = time.perf_counter()
+        result = None
+        cancelled = False
+        try:
+            result = await self._request(method, url, headers, timeout, max_retries, backoff_factor,
+                                         return_json, retry_post, timing, **kwargs)
+            return result
+        except asyncio.CancelledError:
+            # 被取消（如对冲请求中落败的一方）不代表主机出错，不记入熔断和指标
+            cancelled = True
+            raise
+        finally:
+            if breaker is not None:
+                if cancelled:
+                    breaker.cancel(host)
+                else:
+                    breaker.record(host, result is not None and result.status is not None and result.status < 500)
+            if timing is not None and not cancelled:
+                timing.total = time.perf_counter() - started
+                if result is not None:
+                    timing.error = result['error']
+                self.metrics.record(timing)
+
+    def _spend_retry(self):
+        """没有配置重试预算，或预算充足时返回 True"""
+        return self.retry_budget is None or self.retry_budget.try_spend()
+
+    async def _request(self, method, url, headers, timeout, max_retries, backoff_factor,
+                       return_json, retry_post, timing, **kwargs):
+        session = self._get_session()
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS or retry_post
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        limiter = self.rate_limiter
+        host = urlsplit(url).netloc
+        attempt = 0
+
+        while True:
+            attempt += 1
+            retry_allowed = attempt <= max_retries
+            if limiter is not None:
+                await limiter.acquire_async(host)
+            if timing is not None:
+                timing.retries = attempt - 1
+                kwargs['trace_request_ctx'] = timing
+            started = time.perf_counter()
+            status = retry_after = None
+            retry = False
+            try:
+                async with self._semaphore, self._host_semaphore(host):
+                    async with session.request(method, url, headers=headers,
+                                               timeout=client_timeout, **kwargs) as response:
+                        status = response.status
+                        retry_after = response.headers.get('Retry-After')
+                        if timing is not None:
+                            timing.status = status
+                            headers_at = time.perf_counter()
+                        if status in RETRY_STATUS and idempotent and retry_allowed and self._spend_retry():
+                            retry = True
+                        else:
+                            # 与同步版本一致：拿到响应即视为成功，不检查状态码
+                            # 连接释放前必须读完正文，解码则留到访问 data 时再做
+                            body = await response.read()
+                            if timing is not None:
+                                timing.download = time.perf_counter() - headers_at
+                                timing.bytes = response.content.total_bytes
+                            mode = "json" if return_json else "text"
+                            return FetchResult(response, mode=mode, content=body,
+                                               encoding=response.get_encoding())
+
+            except asyncio.TimeoutError:
+                retry = idempotent and retry_allowed and self._spend_retry()
+                error_msg = f"请求超时（超过 {timeout} 秒）"
+            except aiohttp.ClientConnectorError:
+                # 建立连接失败（DNS、拒绝连接等）时请求尚未发出，POST 也可以安全重试
+                retry = retry_allowed and self._spend_retry()
+                error_msg = "网络连接错误（DNS失败、拒绝连接等）"
+            except aiohttp.ClientConnectionError:
+                # ServerDisconnected / ClientOSError 可能发生在请求体写出之后，只重试幂等请求
+                retry = idempotent and retry_allowed and self._spend_retry()
+                error_msg = "网络连接错误（DNS失败、拒绝连接等）"
+            except aiohttp.TooManyRedirects:
+                error_msg = "重定向次数过多"
+            except aiohttp.ClientResponseError as e:
+                error_msg = f"HTTP错误: {e}"
+            except aiohttp.ClientError as e:
+                error_msg = f"未知请求错误: {e}"
+            except Exception as e:
+                error_msg = f"未预期的错误: {e}"
+            finally:
+                if limiter is not None:
+                    limiter.release(host, time.perf_counter() - started, status, retry_after)
+
+            if retry:
+                # 退避等待时不占用并发名额
+                await asyncio.sleep(backoff_time(backoff_factor, attempt, self.jitter))
+                continue
+
+            return FetchResult.failure(error_msg)
+
+    async def get(self, url, **kwargs):
+        """发送异步 GET 请求，参数见 request()"""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, data=None, json=None, **kwargs):
+        """发送异步 POST 请求，参数见 request()"""
+        return await self.request("POST", url, data=data, json=json, **kwargs)
+
+    async def close(self):
+        """关闭共享的 ClientSession"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# 模块级默认客户端：async_safe_get / async_safe_post 共用
+default_async_client = AsyncSafeClient()
+
+
+async def async_safe_get(url,
+                         headers=None,
+                         timeout=10,
+                         max_retries=2,
+                         backoff_factor=1,
+                         return_json=False):
+    """
+    safe_get 的异步版本，参数与返回值相同。
+
+    用法:
+        results = await asyncio.gather(*(async_safe_get(u) for u in urls))
+        await close_default_client()
+    """
+    return await default_async_client.get(url,
+                                          headers=headers,
+                                          timeout=timeout,
+                                          max_retries=max_retries,
+                                          backoff_factor=backoff_factor,
+                                          return_json=return_json)
+
+
+async def async_safe_post(url,
+                          data=None,
+                          json=None,
+                          headers=None,
+                          timeout=10,
+                          max_retries=2,
+                          backoff_factor=1,
+                          return_json=False,
+                          retry_post=False):
+    """safe_post 的异步版本，参数与返回值相同"""
+    return await default_async_client.post(url,
+                                           data=data,
+                                           json=json,
+                                           headers=headers,
+                                           timeout=timeout,
+                                           max_retries=max_retries,
+                                           backoff_factor=backoff_factor,
+                                           return_json=return_json,
+                                           retry_post=retry_post)
+
+
+async def close_default_client():
+    """在事件循环结束前调用，关闭默认客户端的连接"""
+    await default_async_client.close()
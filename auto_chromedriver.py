@@ -3,9 +3,10 @@ import os
 import re
 import sys
 import json
+import time
 import shutil
-import zipfile
 import platform
+import tempfile
 import subprocess
 from pathlib import Path
 
@@ -13,6 +14,8 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from downloader import download, extract_archive
+
 
 def get_chrome_version():
     """自动获取本地 Chrome 浏览器版本"""
@@ -40,6 +43,21 @@ def get_chrome_version():
                 version = subprocess.check_output([chrome_path, "--version"], text=True)
                 return version.strip().split()[-1]
 
+        else:
+            # macOS / Linux：直接执行浏览器的 --version，输出如 "Google Chrome 126.0.6478.126"
+            if system == "Darwin":
+                candidates = ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"]
+            else:
+                candidates = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"]
+            for candidate in candidates:
+                executable = candidate if os.path.isabs(candidate) else shutil.which(candidate)
+                if not executable or not os.path.exists(executable):
+                    continue
+                output = subprocess.check_output([executable, "--version"], text=True)
+                version = re.search(r"(\d+\.\d+\.\d+\.\d+)", output)
+                if version:
+                    return version.group(1)
+
     except Exception as e:
         print(f"⚠️ 获取 Chrome 版本失败: {e}")
         return None
@@ -81,8 +99,91 @@ def get_matched_chromedriver_version(chrome_version):
     return None
 
 
+CACHE_DIR = Path.home() / ".auto_chromedriver"
+VERSION_MAP_FILE = "versions.json"
+VERSION_MAP_TTL = 7 * 24 * 3600  # Chrome 主版本 -> driver 版本 的映射缓存 7 天
+
+
+class FileLock:
+    """
+    跨进程文件锁（Windows 用 msvcrt，其余系统用 fcntl），保证多个爬虫进程同时启动时只有一个去下载。
+
+    用法:
+        with FileLock(cache_dir / ".lock"):
+            ...
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = None
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+b")
+        if platform.system() == "Windows":
+            import msvcrt
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK 约 10 秒后超时，继续等待
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if platform.system() == "Windows":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+def _driver_exe():
+    return "chromedriver.exe" if platform.system() == "Windows" else "chromedriver"
+
+
+def load_cached_driver_version(cache_dir, major_version, ttl=VERSION_MAP_TTL):
+    """从磁盘读取未过期的 Chrome 主版本 -> driver 版本映射，没有时返回 None"""
+    try:
+        with open(Path(cache_dir) / VERSION_MAP_FILE, encoding="utf-8") as f:
+            entry = json.load(f).get(major_version)
+    except (OSError, ValueError):
+        return None
+    if not entry or time.time() - entry.get("checked_at", 0) > ttl:
+        return None
+    return entry.get("driver")
+
+
+def save_cached_driver_version(cache_dir, major_version, driver_version):
+    """写入版本映射；先写临时文件再 os.replace，避免其他进程读到写了一半的文件"""
+    path = Path(cache_dir) / VERSION_MAP_FILE
+    try:
+        with open(path, encoding="utf-8") as f:
+            versions = json.load(f)
+    except (OSError, ValueError):
+        versions = {}
+    versions[major_version] = {"driver": driver_version, "checked_at": time.time()}
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".versions-", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(versions, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
 def download_chromedriver(driver_version, output_dir):
-    """从淘宝镜像下载 chromedriver"""
+    """
+    从淘宝镜像下载 chromedriver 到 output_dir（每个 driver 版本一个目录）。
+
+    下载和解压由 downloader 完成：支持断点续传，解压到临时目录后整体替换 output_dir，
+    其他进程要么看不到该目录，要么看到完整的 driver。
+    """
     system = platform.system()
     if system == "Windows":
         filename = "chromedriver_win32.zip"
@@ -97,61 +198,83 @@ def download_chromedriver(driver_version, output_dir):
         raise OSError("不支持的操作系统")
 
     download_url = f"https://npmmirror.com/mirrors/chromedriver/{driver_version}/{filename}"
-    output_path = Path(output_dir) / filename
-    driver_exe = "chromedriver.exe" if system == "Windows" else "chromedriver"
+    output_dir = Path(output_dir)
+    driver_exe = _driver_exe()
 
     # 检查是否已存在
-    if (Path(output_dir) / driver_exe).exists():
+    if (output_dir / driver_exe).exists():
         print(f"✅ chromedriver 已存在: {output_dir}")
-        return str(Path(output_dir) / driver_exe)
+        return str(output_dir / driver_exe)
 
-    print(f"📥 正在下载: {download_url}")
-    try:
-        response = requests.get(download_url, stream=True, timeout=30)
-        response.raise_for_status()
-        with open(output_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-
-        # 解压
-        with zipfile.ZipFile(output_path, 'r') as zip_ref:
-            zip_ref.extractall(output_dir)
-
-        # 删除 zip
-        output_path.unlink()
+    # 压缩包放在缓存目录的 .downloads 下，下载中断后下次可以续传
+    archive_path = output_dir.parent / ".downloads" / f"{driver_version}-{filename}"
 
+    def prepare(tmp_dir):
+        # 新版压缩包里 driver 在子目录中，统一移到目录根部
+        exe_path = tmp_dir / driver_exe
+        if not exe_path.exists():
+            found = next(tmp_dir.rglob(driver_exe), None)
+            if found is None:
+                raise FileNotFoundError(f"压缩包中没有 {driver_exe}")
+            shutil.move(str(found), str(exe_path))
         # macOS/Linux 添加执行权限
         if system != "Windows":
-            exe_path = Path(output_dir) / driver_exe
             exe_path.chmod(0o755)
 
+    print(f"📥 正在下载: {download_url}")
+    try:
+        download(download_url, archive_path)
+        extract_archive(archive_path, output_dir, prepare=prepare)
+        archive_path.unlink()
         print(f"✅ 下载并解压成功: {output_dir}")
-        return str(Path(output_dir) / driver_exe)
+        return str(output_dir / driver_exe)
 
     except Exception as e:
         print(f"❌ 下载失败: {e}")
         raise
 
+def get_chromedriver_path(cache_dir=CACHE_DIR, ttl=VERSION_MAP_TTL):
+    """
+    返回与本机 Chrome 匹配的 chromedriver 路径，找不到时返回 None。
 
-def main():
-    cache_dir = Path.home() / ".auto_chromedriver"
-    cache_dir.mkdir(exist_ok=True)
+    版本映射和 driver 都缓存在 cache_dir 中：映射未过期且 driver 已安装时不发任何网络请求；
+    需要联网时持有跨进程文件锁，多个进程同时启动只会下载一次。
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
 
     # 1. 获取 Chrome 版本
     chrome_ver = get_chrome_version()
     if not chrome_ver:
-        sys.exit(1)
+        return None
     print(f"🔍 检测到 Chrome 版本: {chrome_ver}")
+    major_version = chrome_ver.split('.')[0]
 
-    # 2. 获取匹配的 driver 版本
-    driver_ver = get_matched_chromedriver_version(chrome_ver)
-    if not driver_ver:
-        print("❌ 未找到匹配的 chromedriver 版本")
-        sys.exit(1)
-    print(f"🎯 匹配的 chromedriver 版本: {driver_ver}")
+    # 2. 热启动：映射和 driver 都在本地
+    driver_ver = load_cached_driver_version(cache_dir, major_version, ttl)
+    if driver_ver and (cache_dir / driver_ver / _driver_exe()).exists():
+        print(f"🎯 使用缓存的 chromedriver 版本: {driver_ver}")
+        return str(cache_dir / driver_ver / _driver_exe())
 
-    # 3. 下载并返回路径
-    driver_path = download_chromedriver(driver_ver, cache_dir)
+    with FileLock(cache_dir / ".lock"):
+        # 拿到锁后再查一次，可能其他进程刚刚装好
+        driver_ver = load_cached_driver_version(cache_dir, major_version, ttl)
+        if not driver_ver:
+            driver_ver = get_matched_chromedriver_version(chrome_ver)
+            if not driver_ver:
+                print("❌ 未找到匹配的 chromedriver 版本")
+                return None
+            save_cached_driver_version(cache_dir, major_version, driver_ver)
+        print(f"🎯 匹配的 chromedriver 版本: {driver_ver}")
+
+        # 3. 下载并返回路径
+        return download_chromedriver(driver_ver, cache_dir / driver_ver)
+
+
+def main():
+    driver_path = get_chromedriver_path()
+    if not driver_path:
+        sys.exit(1)
     print(f"📌 chromedriver 路径: {driver_path}")
 
     return driver_path
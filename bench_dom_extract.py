@@ -0,0 +1,102 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from extract import BAIDU_RESULTS, extract_dom
+
+
+def fixture_page(count):
+    """生成一个结构与百度搜索结果页相同的静态页面，共 count 条结果"""
+    rows = []
+    for i in range(count):
+        rows.append(f"""
+        <div class="result c-container">
+          <h3 class="t"><a class="sc-link" href="/item/{i}">
+            <span class="tts-b-hl">搜索结果标题 {i}</span><em>Selenium 爬虫</em></a></h3>
+          <div class="c-abstract">第 {i} 条结果的摘要文字</div>
+          <a class="sc-link">没有 href 的链接不算结果</a>
+        </div>""")
+    return f"<html><head><meta charset='utf-8'><title>Selenium 爬虫_百度搜索</title></head><body>" \
+           f"<div id='content_left'>{''.join(rows)}</div></body></html>"
+
+
+def make_driver(driver_path=None):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    if driver_path is None:
+        from auto_chromedriver import get_chromedriver_path
+        driver_path = get_chromedriver_path()
+    options = Options()
+    options.add_argument("--headless=new")
+    return webdriver.Chrome(service=Service(executable_path=driver_path), options=options)
+
+
+def count_round_trips(driver):
+    """包装 driver.execute，统计发给 chromedriver 的命令数（每个命令一次 HTTP 往返）"""
+    counter = [0]
+    execute = driver.execute
+
+    def counted(*args, **kwargs):
+        counter[0] += 1
+        return execute(*args, **kwargs)
+
+    driver.execute = counted
+    return counter
+
+
+def per_element(driver):
+    """test.py / t.py 原来的写法：每条结果分别 find_element、取 .text 和 get_attribute"""
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+
+    records = []
+    for result in driver.find_elements(By.XPATH, "//a[contains(@class, 'sc-link') and @href]"):
+        try:
+            title_span = result.find_element(By.XPATH, ".//span[@class='tts-b-hl']")
+            records.append({"title": title_span.text.strip(), "link": result.get_attribute("href")})
+        except NoSuchElementException:
+            continue
+    return records
+
+
+def bench(driver, counter, fn, rounds):
+    counter[0] = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        records = fn(driver)
+    return (time.perf_counter() - started) / rounds, counter[0] / rounds, records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对比逐元素 WebDriver 调用与单次 execute_script 批量提取")
+    parser.add_argument("--results", type=int, default=50, help="页面中的搜索结果条数")
+    parser.add_argument("--rounds", type=int, default=5, help="每种方式重复的轮数")
+    parser.add_argument("--driver", default=None, help="chromedriver 路径，默认由 auto_chromedriver 获取")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        page = Path(tmp) / "results.html"
+        page.write_text(fixture_page(args.results), encoding="utf-8")
+
+        driver = make_driver(args.driver)
+        try:
+            driver.get(page.as_uri())
+            counter = count_round_trips(driver)
+            loop_time, loop_trips, loop_records = bench(driver, counter, per_element, args.rounds)
+            batch_time, batch_trips, batch_records = bench(driver, counter, lambda d: extract_dom(d, BAIDU_RESULTS),
+                                                           args.rounds)
+        finally:
+            driver.quit()
+
+    assert loop_records == batch_records, "两种方式的提取结果不一致"
+    print(f"{len(batch_records)} 条结果")
+    print(f"逐元素调用: {loop_trips:.0f} 次往返, {loop_time * 1000:.1f} ms/页")
+    print(f"execute_script 批量提取: {batch_trips:.0f} 次往返, {batch_time * 1000:.1f} ms/页")
+    print(f"加速比: {loop_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
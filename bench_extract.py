@@ -0,0 +1,96 @@
+import argparse
+import time
+from pathlib import Path
+
+from extract import DOUBAN_TOP250, extract
+
+PAGES_DIR = Path("bench_pages") / "douban"
+
+# 两个引擎容易出现差异的片段：内联脚本/样式、注释、嵌套标签间的空白、空页面
+PARITY_CASES = [
+    '<div class="pl2"><a href="/1">Book <span>: sub</span><script>var a=1</script></a></div>',
+    '<div class="pl2"><a href="/2"><style>.x{color:red}</style>\n  Title\n  <!-- note --><span> 副标题 </span></a></div>',
+    "", "  \n ", "<!-- 空页面 -->",
+]
+
+
+def download_pages(directory):
+    """保存豆瓣读书 Top250 的 10 个页面，之后的基准测试可离线重复运行"""
+    from safe_requests import safe_get_many
+
+    directory.mkdir(parents=True, exist_ok=True)
+    urls = [f"https://book.douban.com/top250?start={i}" for i in range(0, 250, 25)]
+    for index, (url, response) in enumerate(safe_get_many(urls, concurrency=5, preserve_order=True)):
+        if response["success"]:
+            (directory / f"top250_{index:02d}.html").write_text(response["data"], encoding="utf-8")
+        else:
+            print("请求失败:", url, response["error"])
+
+
+def synthetic_page(start):
+    """没有保存页面时，生成一个结构与 Top250 相同的页面"""
+    rows = []
+    for i in range(start, start + 25):
+        rows.append(f"""
+        <table width="100%"><tr class="item">
+          <td width="100" valign="top"><a class="nbg" href="https://book.douban.com/subject/{1000 + i}/">
+            <img src="https://img.example/{i}.jpg" width="90" /></a></td>
+          <td valign="top">
+            <div class="pl2">
+              <a href="https://book.douban.com/subject/{1000 + i}/" title="书名{i}">
+                书名{i}
+                <span style="font-size:12px;">：副标题{i}</span>
+              </a>
+              <img src="https://img.example/read.gif" title="可试读" />
+            </div>
+            <p class="pl">作者{i} / 出版社 / 2000-1 / 29.00元</p>
+            <div class="star clearfix"><span class="rating_nums">9.{i % 10}</span>
+              <span class="pl">(  {i * 137} 人评价  )</span></div>
+            <p class="quote"><span class="inq">一句话简介 {i}</span></p>
+          </td>
+        </tr></table>""")
+    return f"<html><head><meta charset='utf-8'><title>豆瓣读书 Top 250</title></head><body>" \
+           f"<div id='content'><div class='indent'>{''.join(rows)}</div></div></body></html>"
+
+
+def load_pages(directory):
+    pages = [p.read_text(encoding="utf-8") for p in sorted(directory.glob("*.html"))]
+    if pages:
+        print(f"使用 {len(pages)} 个已保存页面: {directory}")
+        return pages
+    print("未找到已保存页面，使用生成的 Top250 结构页面（可加 --download 保存真实页面）")
+    return [synthetic_page(i) for i in range(0, 250, 25)]
+
+
+def bench(pages, engine, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            extract(page, DOUBAN_TOP250, engine=engine)
+    return (time.perf_counter() - started) / (rounds * len(pages))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="对比 lxml 与 BeautifulSoup(html.parser) 的提取速度")
+    parser.add_argument("--pages", type=Path, default=PAGES_DIR, help="已保存页面所在目录")
+    parser.add_argument("--download", action="store_true", help="先下载 Top250 页面到 --pages 目录")
+    parser.add_argument("--rounds", type=int, default=20, help="每个引擎重复的轮数")
+    args = parser.parse_args(argv)
+
+    if args.download:
+        download_pages(args.pages)
+    pages = load_pages(args.pages)
+
+    # 先确认两个引擎结果完全一致
+    for page in PARITY_CASES + pages:
+        assert extract(page, DOUBAN_TOP250, engine="lxml") == extract(page, DOUBAN_TOP250, engine="bs4"), "提取结果不一致"
+
+    bs4_time = bench(pages, "bs4", args.rounds)
+    lxml_time = bench(pages, "lxml", args.rounds)
+    print(f"bs4 (html.parser): {bs4_time * 1000:.2f} ms/页")
+    print(f"lxml (编译选择器): {lxml_time * 1000:.2f} ms/页")
+    print(f"加速比: {bs4_time / lxml_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
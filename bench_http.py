@@ -0,0 +1,214 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+
+from async_safe_requests import AsyncSafeClient
+from safe_requests import SafeClient, safe_get_many
+from stand_in_server import StandInServer
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+
+def percentile(sorted_values, pct):
+    """最近秩法求百分位数"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb():
+    """当前进程的内存峰值；每个场景在单独的子进程里运行，所以这就是该场景的峰值"""
+    if resource is None:
+        return None
+    # Linux 上 ru_maxrss 单位是 KB
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def summarize(name, latencies, errors, seconds):
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        "name": name,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": errors,
+        "seconds": round(seconds, 4),
+        "rps": round(total / seconds, 1) if seconds else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_threads(name, call, urls, concurrency):
+    """用线程池并发执行同步请求函数 call(url)"""
+    def timed(url):
+        started = time.perf_counter()
+        result = call(url)
+        return result["success"], time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed, urls))
+    seconds = time.perf_counter() - started
+    return summarize(name, [t for ok, t in outcomes if ok], sum(not ok for ok, _ in outcomes), seconds)
+
+
+class _TimedClient:
+    """包装 SafeClient，记录 safe_get_many 内部每个请求的耗时"""
+
+    def __init__(self, client):
+        self.client = client
+        self.latencies = []
+
+    def get(self, url, **kwargs):
+        started = time.perf_counter()
+        result = self.client.get(url, **kwargs)
+        if result["success"]:
+            self.latencies.append(time.perf_counter() - started)
+        return result
+
+
+def bench_batch(urls, concurrency, client):
+    timed = _TimedClient(client)
+    errors = 0
+    started = time.perf_counter()
+    for _, result in safe_get_many(urls, concurrency=concurrency, client=timed):
+        errors += not result["success"]
+    seconds = time.perf_counter() - started
+    return summarize("safe_get_many", timed.latencies, errors, seconds)
+
+
+async def _bench_aiohttp(urls, concurrency):
+    """asyncio_spider 的写法：共享 ClientSession + gather，仅加一个信号量限制并发"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def fetch(session, url):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                async with session.get(url) as response:
+                    await response.text()
+                    latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(fetch(session, url) for url in urls))
+    return summarize("aiohttp", latencies, errors, time.perf_counter() - started)
+
+
+async def _bench_async_safe(urls, concurrency):
+    client = AsyncSafeClient(limit=concurrency, limit_per_host=concurrency)
+    # 与 aiohttp 场景一致：延迟只统计拿到并发名额之后的部分
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def fetch(url):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            result = await client.get(url)
+            if result["success"]:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fetch(url) for url in urls))
+    seconds = time.perf_counter() - started
+    await client.close()
+    return summarize("async_safe_get", latencies, errors, seconds)
+
+
+SCENARIOS = ["safe_get", "safe_post", "safe_get_many", "aiohttp", "async_safe_get"]
+
+
+def run_scenario(name, urls, concurrency):
+    """在子进程中执行一个场景；ru_maxrss 是整个进程的峰值，不隔离的话后面的场景只会看到前面的最大值"""
+    baseline = peak_rss_mb()  # 导入模块后的基线，各场景相同
+    # 连接池大小与并发数一致，避免 urllib3 丢弃连接影响结果
+    client = SafeClient(pool_maxsize=concurrency)
+    try:
+        if name == "safe_get":
+            result = bench_threads(name, lambda url: client.get(url), urls, concurrency)
+        elif name == "safe_post":
+            result = bench_threads(name, lambda url: client.post(url, data={"text": "hello"}), urls, concurrency)
+        elif name == "safe_get_many":
+            result = bench_batch(urls, concurrency, client)
+        elif name == "aiohttp":
+            result = asyncio.run(_bench_aiohttp(urls, concurrency))
+        elif name == "async_safe_get":
+            result = asyncio.run(_bench_async_safe(urls, concurrency))
+        else:
+            raise ValueError(f"未知的场景: {name}")
+    finally:
+        client.close()
+    result["rss_growth_mb"] = round(result["peak_rss_mb"] - baseline, 1) if baseline is not None else None
+    return result
+
+
+def run(args):
+    server = StandInServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           payload_size=args.payload_size, retry_after=args.retry_after, seed=0)
+    base_url = server.start()
+    urls = [f"{base_url}/item/{i}" for i in range(args.requests)]
+    # spawn 出的子进程从零开始，不继承父进程（替身服务器、之前场景）占用的内存
+    context = multiprocessing.get_context("spawn")
+    results = []
+    try:
+        for name in args.scenarios:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(run_scenario, name, urls, args.concurrency).result()
+            print(f"{result['name']:<16} {result['rps']:>8} req/s  p50 {result['p50_ms']} ms  "
+                  f"p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  错误 {result['errors']}  "
+                  f"内存峰值 {result['peak_rss_mb']} MB (+{result['rss_growth_mb']})")
+            results.append(result)
+    finally:
+        server.stop()
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP 层基准测试（本地替身服务器）")
+    parser.add_argument("--requests", type=int, default=500, help="每个场景的请求数")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="服务器基础延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-size", type=int, default=16 * 1024)
+    parser.add_argument("--retry-after", type=float, default=None)
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--output", type=Path, default=None,
+                        help="结果 JSON 路径，默认 bench_results/http-<时间>.json")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    output = args.output or Path("bench_results") / f"http-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print("结果已写入:", output)
+
+
+if __name__ == "__main__":
+    main()
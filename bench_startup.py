@@ -0,0 +1,112 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# spider.py 的各个入口；--help 只解析参数就退出，测的是纯启动开销；
+# fetch 真正请求一次本地替身服务器（{base_url} 在运行时替换），包含请求路径上所有延迟导入
+COMMANDS = {
+    "spider --help": ["spider.py", "--help"],
+    "douban --help": ["spider.py", "douban", "--help"],
+    "translate --help": ["spider.py", "translate", "--help"],
+    "baidu-search --help": ["spider.py", "baidu-search", "--help"],
+    "fetch --help": ["spider.py", "fetch", "--help"],
+    "bench --help": ["spider.py", "bench", "--help"],
+    "fetch <stand-in url>": ["spider.py", "fetch", "{base_url}/item/1"],
+}
+
+# 对照组：按原来各脚本的写法在顶层一次性导入所有依赖（没安装的模块跳过）
+EAGER_MODULES = ["requests", "aiohttp", "lxml.html", "bs4", "selenium.webdriver", "dashscope",
+                 "safe_requests", "async_safe_requests", "extract", "sinks", "translate", "summarize",
+                 "incremental", "pipeline", "webdriver_pool", "scrape_doubanread", "selenium_baiduSearch"]
+EAGER_CODE = ("import importlib\n"
+              f"for name in {EAGER_MODULES!r}:\n"
+              "    try:\n"
+              "        importlib.import_module(name)\n"
+              "    except ImportError:\n"
+              "        pass\n")
+
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 的输出。
+
+    返回 (所有模块 self 时间之和 ms, {顶层模块: 累计 ms})；顶层模块即名字前没有缩进的行。
+    """
+    total_us = 0
+    top = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        total_us += int(self_us)
+        if not name.startswith("  "):
+            top[name.strip()] = int(cumulative_us) / 1000
+    return total_us / 1000, top
+
+
+def measure(args, repeat=5):
+    """用 -X importtime 运行 python args 共 repeat 次，返回导入耗时、最慢的顶层模块和墙钟时间"""
+    walls, imports, top = [], [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        walls.append((time.perf_counter() - start) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"命令执行失败（退出码 {proc.returncode}）: {' '.join(args)}")
+        total, modules = parse_importtime(proc.stderr)
+        imports.append(total)
+        for name, ms in modules.items():
+            top[name] = min(ms, top.get(name, ms))
+    slowest = sorted(top.items(), key=lambda item: item[1], reverse=True)[:5]
+    return {
+        "import_ms": round(statistics.median(imports), 1),
+        "wall_ms_median": round(statistics.median(walls), 1),
+        "wall_ms_min": round(min(walls), 1),
+        "top_modules": [[name, round(ms, 1)] for name, ms in slowest],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用 -X importtime 测量 spider.py 各子命令的冷启动开销")
+    parser.add_argument("--repeat", type=int, default=5, help="每条命令运行的次数，取中位数")
+    parser.add_argument("--no-baseline", action="store_true", help="不测顶层一次性导入所有依赖的对照组")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="结果 JSON 路径，默认 bench_results/startup-<时间>.json")
+    args = parser.parse_args(argv)
+
+    commands = dict(COMMANDS)
+    if not args.no_baseline:
+        commands["eager imports (baseline)"] = ["-c", EAGER_CODE]
+
+    # 替身服务器在本进程中运行，它的导入不计入被测命令
+    from stand_in_server import StandInServer
+
+    server = StandInServer(latency=0, payload_size=1024, seed=0)
+    base_url = server.start()
+    report = {"python": sys.version.split()[0], "repeat": args.repeat, "commands": {}}
+    print(f"{'命令':<26}{'导入 ms':>10}{'墙钟 ms':>10}  最慢的顶层模块")
+    try:
+        for label, command in commands.items():
+            result = measure([arg.format(base_url=base_url) for arg in command], args.repeat)
+            report["commands"][label] = result
+            slowest = ", ".join(f"{name} {ms:.0f}" for name, ms in result["top_modules"][:3])
+            print(f"{label:<26}{result['import_ms']:>10.1f}{result['wall_ms_median']:>10.1f}  {slowest}")
+    finally:
+        server.stop()
+
+    output = args.output or Path("bench_results") / f"startup-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print("结果已写入:", output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,544 @@
+import bisect
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from urllib.parse import urldefrag, urlsplit
+
+from metrics import Histogram, Metrics
+from rate_limit import HostRateLimiter
+from safe_requests import SafeClient, safe_get_many
+
+
+class HashRing:
+    """
+    一致性哈希环：按主机名把 URL 分配给分片，同一主机总是落在同一个 worker 上，
+    限速和连接复用都只发生在这个 worker 内。分片数变化时只有约 1/N 的主机会换分片。
+
+    参数:
+        shards (int): 分片数
+        replicas (int): 每个分片在环上的虚拟节点数，默认 100
+    """
+
+    def __init__(self, shards, replicas=100):
+        self.shards = shards
+        points = sorted((self._hash(f"{shard}#{i}"), shard) for shard in range(shards) for i in range(replicas))
+        self._keys = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def shard_for(self, host):
+        index = bisect.bisect(self._keys, self._hash(host)) % len(self._keys)
+        return self._shards[index]
+
+
+def shard_urls(ring, urls):
+    """把 URL 转成队列后端接收的 (shard, host, url)"""
+    for url in urls:
+        url = urldefrag(url)[0]
+        host = urlsplit(url).netloc
+        yield ring.shard_for(host), host, url
+
+
+class SqliteQueue:
+    """
+    基于 SQLite 的任务队列后端（默认），适合同一台机器上的多个 worker 进程。
+
+    - pop() 取出的任务处于“已领取”状态，ack() 后才算完成；超过 lease 秒未确认的任务会重新排队，
+      worker 崩溃不会丢任务
+    - steal() 把其他分片中排队最多的一个主机整体转给空闲分片，窃取后主机仍只属于一个 worker：
+      只窃取没有已领取任务的主机；转移记录在 owners 表中，之后 push() 的同主机 URL 也进入新分片，
+      其他分片要等新主人超过 lease 秒（从窃取或最后一次领取该主机的任务算起）没有领取才能再窃取
+    - 抓取结果和各 worker 的统计也写在同一个库里，便于合并输出
+
+    每个进程应各自创建实例（SQLite 连接不能跨进程共享）。
+
+    参数:
+        db_path (str): 数据库文件，默认 crawl.db
+        lease (float): 任务领取后的租期（秒），默认 600
+    """
+
+    QUEUED, CLAIMED, DONE = 0, 1, 2
+
+    def __init__(self, db_path="crawl.db", lease=600):
+        self.lease = lease
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                host TEXT NOT NULL,
+                shard INTEGER NOT NULL,
+                state INTEGER NOT NULL DEFAULT 0,
+                claimed_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_shard ON tasks (shard, state, host);
+            CREATE INDEX IF NOT EXISTS tasks_host ON tasks (host, state);
+            CREATE TABLE IF NOT EXISTS owners (host TEXT PRIMARY KEY, shard INTEGER NOT NULL, since REAL);
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT PRIMARY KEY,
+                shard INTEGER,
+                status INTEGER,
+                error TEXT,
+                records TEXT
+            );
+            CREATE TABLE IF NOT EXISTS workers (shard INTEGER PRIMARY KEY, stats TEXT);
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE 先拿写锁，多个 worker 同时领取任务时不会领到同一批
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def push(self, items):
+        """加入 (shard, host, url)，已存在的 URL 忽略，返回新加入的数量；被窃取过的主机进入它现在的分片"""
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (shard, host, url) "
+                "VALUES (COALESCE((SELECT shard FROM owners WHERE host = ?), ?), ?, ?)",
+                ((host, shard, host, url) for shard, host, url in items))
+            return conn.total_changes - before
+
+    def pop(self, shard, size):
+        """领取该分片至多 size 个任务，返回 [(task_id, url), ...]"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("UPDATE tasks SET state = ? WHERE state = ? AND claimed_at < ?",
+                         (self.QUEUED, self.CLAIMED, now - self.lease))
+            rows = conn.execute("SELECT id, url FROM tasks WHERE shard = ? AND state = ? ORDER BY id LIMIT ?",
+                                (shard, self.QUEUED, size)).fetchall()
+            conn.executemany("UPDATE tasks SET state = ?, claimed_at = ? WHERE id = ?",
+                             [(self.CLAIMED, now, task_id) for task_id, _ in rows])
+        return rows
+
+    def ack(self, task_ids):
+        with self._transaction() as conn:
+            conn.executemany("UPDATE tasks SET state = ? WHERE id = ?", [(self.DONE, i) for i in task_ids])
+
+    def steal(self, shard):
+        """
+        把其他分片排队最多的主机转给 shard，返回转移的任务数。
+
+        正在被抓取（有已领取任务）的主机不会被窃取，否则新旧两个 worker 会同时请求它；
+        已经被窃取过的主机，只有在新主人窃取后、以及最后一次领取它的任务后都超过 lease 秒（多半已崩溃）时才能再次窃取，
+        刚窃取、还没来得及领取的主机不会被其他空闲分片抢回去。
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT t.shard, t.host, COUNT(*) AS n FROM tasks t "
+                "WHERE t.state = ? AND t.shard != ? "
+                "AND NOT EXISTS (SELECT 1 FROM tasks c WHERE c.host = t.host AND c.state = ?) "
+                "AND NOT EXISTS (SELECT 1 FROM owners o WHERE o.host = t.host AND MAX(o.since, "
+                "    (SELECT COALESCE(MAX(claimed_at), 0) FROM tasks d WHERE d.host = t.host)) >= ?) "
+                "GROUP BY t.shard, t.host ORDER BY n DESC LIMIT 1",
+                (self.QUEUED, shard, self.CLAIMED, now - self.lease)).fetchone()
+            if row is None:
+                return 0
+            _, host, _ = row
+            conn.execute("INSERT OR REPLACE INTO owners VALUES (?, ?, ?)", (host, shard, now))
+            return conn.execute("UPDATE tasks SET shard = ? WHERE state = ? AND host = ?",
+                                (shard, self.QUEUED, host)).rowcount
+
+    def remaining(self):
+        """返回 (排队中, 已领取未确认) 的任务数"""
+        counts = dict(self._conn.execute(
+            "SELECT state, COUNT(*) FROM tasks WHERE state != ? GROUP BY state", (self.DONE,)).fetchall())
+        return counts.get(self.QUEUED, 0), counts.get(self.CLAIMED, 0)
+
+    def put_results(self, shard, results):
+        """results 为 [(url, status, error, records), ...]"""
+        with self._transaction() as conn:
+            conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                             [(url, shard, status, error, json.dumps(records, ensure_ascii=False))
+                              for url, status, error, records in results])
+
+    def put_stats(self, shard, stats):
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO workers VALUES (?, ?)", (shard, json.dumps(stats)))
+
+    def results(self):
+        """逐个产出 (url, shard, status, error, records)"""
+        for url, shard, status, error, records in self._conn.execute(
+                "SELECT url, shard, status, error, records FROM results ORDER BY rowid"):
+            yield url, shard, status, error, json.loads(records)
+
+    def stats(self):
+        return {shard: json.loads(stats) for shard, stats in self._conn.execute("SELECT shard, stats FROM workers")}
+
+    def close(self):
+        self._conn.close()
+
+
+# 以下脚本在 Redis 中原子执行，push / pop / steal 之间不会交错。ARGV[1] 均为键前缀
+_REDIS_PUSH = """
+local p, shard, host, url = ARGV[1], ARGV[2], ARGV[3], ARGV[4]
+if redis.call('SADD', p .. ':seen', url) == 0 then return 0 end
+shard = redis.call('HGET', p .. ':owner', host) or shard
+redis.call('HSET', p .. ':owner', host, shard)
+redis.call('RPUSH', p .. ':hostq:' .. host, url)
+redis.call('SADD', p .. ':hosts:' .. shard, host)
+redis.call('SADD', p .. ':shards', shard)
+redis.call('INCR', p .. ':queued')
+return 1
+"""
+
+_REDIS_POP = """
+local p, shard, size, now, lease = ARGV[1], ARGV[2], tonumber(ARGV[3]), tonumber(ARGV[4]), tonumber(ARGV[5])
+-- 超过租期仍未确认的任务放回所属主机队列的队首，主机归还给它现在的分片
+for _, url in ipairs(redis.call('ZRANGEBYSCORE', p .. ':claims', '-inf', now - lease)) do
+    local host = redis.call('HGET', p .. ':claim_host', url)
+    redis.call('ZREM', p .. ':claims', url)
+    redis.call('HDEL', p .. ':claim_host', url)
+    redis.call('HINCRBY', p .. ':claimed', host, -1)
+    redis.call('LPUSH', p .. ':hostq:' .. host, url)
+    redis.call('SADD', p .. ':hosts:' .. redis.call('HGET', p .. ':owner', host), host)
+    redis.call('INCR', p .. ':queued')
+end
+local out = {}
+for _, host in ipairs(redis.call('SMEMBERS', p .. ':hosts:' .. shard)) do
+    if #out >= size then break end
+    local key = p .. ':hostq:' .. host
+    local items = redis.call('LRANGE', key, 0, size - #out - 1)
+    if #items > 0 then
+        redis.call('LTRIM', key, #items, -1)
+        redis.call('HINCRBY', p .. ':claimed', host, #items)
+        redis.call('HSET', p .. ':claimed_at', host, now)
+        for _, url in ipairs(items) do
+            redis.call('ZADD', p .. ':claims', now, url)
+            redis.call('HSET', p .. ':claim_host', url, host)
+            table.insert(out, url)
+        end
+    end
+    if redis.call('LLEN', key) == 0 then redis.call('SREM', p .. ':hosts:' .. shard, host) end
+end
+if #out > 0 then redis.call('DECRBY', p .. ':queued', #out) end
+return out
+"""
+
+_REDIS_ACK = """
+local p = ARGV[1]
+local done = 0
+for i = 2, #ARGV do
+    local url = ARGV[i]
+    -- 已经因超时重新排队的任务不再重复扣减
+    if redis.call('ZREM', p .. ':claims', url) == 1 then
+        redis.call('HINCRBY', p .. ':claimed', redis.call('HGET', p .. ':claim_host', url), -1)
+        redis.call('HDEL', p .. ':claim_host', url)
+        done = done + 1
+    end
+end
+return done
+"""
+
+_REDIS_STEAL = """
+local p, shard, now, lease = ARGV[1], ARGV[2], tonumber(ARGV[3]), tonumber(ARGV[4])
+local idle_before = now - lease
+local best, best_n, victim = nil, 0, nil
+for _, s in ipairs(redis.call('SMEMBERS', p .. ':shards')) do
+    if s ~= shard then
+        for _, host in ipairs(redis.call('SMEMBERS', p .. ':hosts:' .. s)) do
+            local n = redis.call('LLEN', p .. ':hostq:' .. host)
+            local claimed = tonumber(redis.call('HGET', p .. ':claimed', host) or '0')
+            local stolen = redis.call('HEXISTS', p .. ':stolen', host) == 1
+            local claimed_at = tonumber(redis.call('HGET', p .. ':claimed_at', host) or '0')
+            if n > best_n and claimed <= 0 and (not stolen or claimed_at < idle_before) then
+                best, best_n, victim = host, n, s
+            end
+        end
+    end
+end
+if not best then return 0 end
+redis.call('SREM', p .. ':hosts:' .. victim, best)
+redis.call('SADD', p .. ':hosts:' .. shard, best)
+redis.call('SADD', p .. ':shards', shard)
+redis.call('HSET', p .. ':owner', best, shard)
+redis.call('HSET', p .. ':stolen', best, 1)
+-- 窃取也算新主人的一次领取，避免其他空闲分片在它领取之前又把主机抢走
+redis.call('HSET', p .. ':claimed_at', best, now)
+return best_n
+"""
+
+
+class RedisQueue:
+    """
+    基于 Redis（或兼容 Redis 协议的服务）的任务队列后端，用于跨机器的 worker。接口与 SqliteQueue 相同。
+
+    每个主机一个 URL 列表，每个分片一个主机集合；主机归属记录在 owner 哈希中，push() 按它分配分片。
+    steal() 与 SqliteQueue 相同：整体转移一个没有在途任务的主机，窃取过的主机要等新主人空闲 lease 秒才能再被窃取。
+    领取的任务记录在 claims 有序集合中（分数为领取时间），超过 lease 秒未 ack() 的任务在下一次 pop() 时
+    重新排队，worker 崩溃不会丢任务。
+
+    参数:
+        url (str): Redis 地址，默认 redis://localhost:6379/0
+        prefix (str): 键前缀，默认 crawl
+        lease (float): 任务领取后的租期（秒），默认 600
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="crawl", lease=600):
+        import redis
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.lease = lease
+        self._push = self._redis.register_script(_REDIS_PUSH)
+        self._pop = self._redis.register_script(_REDIS_POP)
+        self._ack = self._redis.register_script(_REDIS_ACK)
+        self._steal = self._redis.register_script(_REDIS_STEAL)
+
+    def _key(self, *parts):
+        return ":".join([self.prefix, *map(str, parts)])
+
+    def push(self, items):
+        added = 0
+        pipe = self._redis.pipeline(transaction=False)
+        for count, (shard, host, url) in enumerate(items, 1):
+            self._push(args=[self.prefix, shard, host, url], client=pipe)
+            if count % 1000 == 0:
+                added += sum(pipe.execute())
+        added += sum(pipe.execute())
+        return added
+
+    def pop(self, shard, size):
+        # URL 已经去重，任务 id 直接用 URL
+        return [(url, url) for url in self._pop(args=[self.prefix, shard, size, time.time(), self.lease])]
+
+    def ack(self, task_ids):
+        if task_ids:
+            self._ack(args=[self.prefix, *task_ids])
+
+    def steal(self, shard):
+        return int(self._steal(args=[self.prefix, shard, time.time(), self.lease]))
+
+    def remaining(self):
+        queued = int(self._redis.get(self._key("queued")) or 0)
+        return queued, self._redis.zcard(self._key("claims"))
+
+    def put_results(self, shard, results):
+        if results:
+            self._redis.rpush(self._key("results"), *[
+                json.dumps([url, shard, status, error, records], ensure_ascii=False)
+                for url, status, error, records in results])
+
+    def put_stats(self, shard, stats):
+        self._redis.hset(self._key("workers"), shard, json.dumps(stats))
+
+    def results(self):
+        for item in self._redis.lrange(self._key("results"), 0, -1):
+            yield tuple(json.loads(item))
+
+    def stats(self):
+        return {int(shard): json.loads(stats) for shard, stats in self._redis.hgetall(self._key("workers")).items()}
+
+    def close(self):
+        self._redis.close()
+
+
+def open_queue(spec):
+    """redis:// 开头的地址使用 RedisQueue，否则视为 SQLite 文件路径"""
+    if spec.startswith(("redis://", "rediss://")):
+        return RedisQueue(spec)
+    return SqliteQueue(spec)
+
+
+def run_worker(queue_spec, shard, parser=None, concurrency=8, batch_size=None, rate=None, poll_interval=0.5,
+               fetch_kwargs=None):
+    """
+    一个 worker 的主循环：领取本分片的任务，用 safe_get_many 并发抓取，结果写回队列后端。
+    本分片没有任务时从其他分片窃取；所有任务都完成后退出并写入本 worker 的统计。
+
+    参数:
+        queue_spec (str): 队列后端，SQLite 路径或 redis:// 地址
+        shard (int): 本 worker 的分片号
+        parser (str or callable, optional): pipeline 中注册的解析器名或 func(url, html)；None 表示只记录状态
+        concurrency (int): 并发请求数，默认 8
+        batch_size (int, optional): 每次领取的任务数，默认 concurrency * 4
+        rate (float, optional): 每个主机每秒的请求数；None 表示不限速
+        poll_interval (float): 其他 worker 仍有未确认任务时的轮询间隔（秒）
+        fetch_kwargs (dict, optional): 传给 SafeClient.get 的其他参数
+    """
+    if isinstance(parser, str):
+        from pipeline import PARSERS
+        parser = PARSERS[parser]
+    queue = open_queue(queue_spec)
+    metrics = Metrics()
+    limiter = HostRateLimiter(rate=rate, burst=1) if rate else None
+    client = SafeClient(pool_maxsize=concurrency, metrics=metrics, rate_limiter=limiter)
+    batch_size = batch_size or concurrency * 4
+    stats = {"fetched": 0, "errors": 0, "records": 0, "stolen": 0, "hosts": {}}
+    started = time.perf_counter()
+
+    try:
+        while True:
+            tasks = queue.pop(shard, batch_size)
+            if not tasks:
+                stolen = queue.steal(shard)
+                if stolen:
+                    stats["stolen"] += stolen
+                    continue
+                queued, claimed = queue.remaining()
+                if not queued and not claimed:
+                    break
+                time.sleep(poll_interval)  # 其他 worker 的任务可能因超时重新排队
+                continue
+
+            ids = {url: task_id for task_id, url in tasks}
+            results = []
+            for url, result in safe_get_many(list(ids), concurrency=concurrency, client=client,
+                                             **(fetch_kwargs or {})):
+                records, error = [], result["error"]
+                if result["success"]:
+                    stats["fetched"] += 1
+                    if parser is not None:
+                        # 单个页面解析失败只记录错误，这一批的其他结果照常写回并确认，不会反复重抓
+                        try:
+                            records = parser(url, result["data"])
+                        except Exception as e:
+                            print(f"❌ 解析失败 {url}: {e!r}")
+                            error = f"解析失败: {e!r}"
+                            stats["errors"] += 1
+                        else:
+                            stats["records"] += len(records)
+                else:
+                    stats["errors"] += 1
+                host = urlsplit(url).netloc
+                stats["hosts"][host] = stats["hosts"].get(host, 0) + 1
+                results.append((url, result.status, error, records))
+                result.release()
+            queue.put_results(shard, results)
+            queue.ack(list(ids.values()))
+    finally:
+        stats["elapsed"] = time.perf_counter() - started
+        stats["p95"] = {host: metrics.percentile(host, "total", 95) for host in stats["hosts"]}
+        # 直方图桶固定，合并统计时可以直接相加，得到所有 worker 一起的百分位数
+        stats["latency"] = {}
+        for host in stats["hosts"]:
+            histogram = metrics.histogram(host, "total")
+            if histogram is not None:
+                stats["latency"][host] = histogram.to_dict()
+        queue.put_stats(shard, stats)
+        client.close()
+        queue.close()
+    return stats
+
+
+def merge_stats(worker_stats):
+    """
+    合并各 worker 的统计：计数相加，主机列表合并，elapsed 取最长；
+    各 worker 的延迟直方图相加后重新计算 p95（按主机和全部请求）。
+    """
+    merged = {"workers": len(worker_stats), "fetched": 0, "errors": 0, "records": 0, "stolen": 0,
+              "hosts": {}, "elapsed": 0.0}
+    latency = {}
+    for stats in worker_stats.values():
+        for key in ("fetched", "errors", "records", "stolen"):
+            merged[key] += stats[key]
+        for host, count in stats["hosts"].items():
+            merged["hosts"][host] = merged["hosts"].get(host, 0) + count
+        merged["elapsed"] = max(merged["elapsed"], stats["elapsed"])
+        for host, data in stats.get("latency", {}).items():
+            latency.setdefault(host, Histogram()).merge(Histogram.from_dict(data))
+    total = Histogram()
+    for histogram in latency.values():
+        total.merge(histogram)
+    merged["p95"] = {host: histogram.percentile(95) for host, histogram in latency.items()}
+    merged["p95_all"] = total.percentile(95)
+    return merged
+
+
+def crawl_distributed(urls, workers=4, queue_spec="crawl.db", parser=None, output=None, **worker_kwargs):
+    """
+    在本机启动 workers 个进程分片抓取 urls，结束后合并结果和统计。
+
+    参数:
+        urls (iterable): 种子 URL
+        workers (int): worker 进程数（即分片数），默认 4
+        queue_spec (str): 队列后端，默认 crawl.db
+        parser (str, optional): pipeline 中注册的解析器名（需能传给子进程）
+        output (str, optional): 合并输出的文件（.jsonl / .csv / .db），每条解析记录一行，附带 url 字段
+        **worker_kwargs: 传给 run_worker 的其他参数
+
+    返回:
+        dict: merge_stats() 的合并统计
+    """
+    import multiprocessing
+
+    queue = open_queue(queue_spec)
+    added = queue.push(shard_urls(HashRing(workers), urls))
+    print(f"📥 新加入 {added} 个 URL，启动 {workers} 个 worker")
+    processes = [multiprocessing.Process(target=run_worker, args=(queue_spec, shard, parser), kwargs=worker_kwargs)
+                 for shard in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    if output:
+        from sinks import open_sink
+
+        with open_sink(output) as sink:
+            for url, _, status, error, records in queue.results():
+                sink.write_many({"url": url, **record} for record in records)
+    # 同一个库可能被分片数不同的上次运行用过，只合并本次的分片
+    merged = merge_stats({shard: stats for shard, stats in queue.stats().items() if shard < workers})
+    queue.close()
+    return merged
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="按主机一致性哈希分片的分布式抓取")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="在本机启动多个 worker 进程抓取")
+    run.add_argument("urls", nargs="?", default="-", help="URL 列表文件，每行一个，默认读标准输入")
+    run.add_argument("--workers", type=int, default=4)
+    run.add_argument("--queue", default="crawl.db", help="SQLite 路径或 redis:// 地址")
+    run.add_argument("--parser", default=None, help="pipeline 中注册的解析器，如 douban_top250")
+    run.add_argument("--output", default=None, help="合并输出文件（.jsonl / .csv / .db）")
+    run.add_argument("--concurrency", type=int, default=8)
+    run.add_argument("--rate", type=float, default=None, help="每个主机每秒的请求数")
+
+    seed = sub.add_parser("seed", help="只把 URL 加入共享队列（多机部署时使用）")
+    seed.add_argument("urls", nargs="?", default="-")
+    seed.add_argument("--shards", type=int, required=True)
+    seed.add_argument("--queue", required=True)
+
+    worker = sub.add_parser("worker", help="作为一个分片加入共享队列（可在其他机器上运行）")
+    worker.add_argument("--shard", type=int, required=True)
+    worker.add_argument("--queue", required=True)
+    worker.add_argument("--parser", default=None)
+    worker.add_argument("--concurrency", type=int, default=8)
+    worker.add_argument("--rate", type=float, default=None)
+
+    args = parser.parse_args()
+
+    def read_urls(path):
+        import sys
+        lines = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        return [line.strip() for line in lines if line.strip()]
+
+    if args.command == "run":
+        print(crawl_distributed(read_urls(args.urls), workers=args.workers, queue_spec=args.queue,
+                                parser=args.parser, output=args.output,
+                                concurrency=args.concurrency, rate=args.rate))
+    elif args.command == "seed":
+        backend = open_queue(args.queue)
+        print("新加入", backend.push(shard_urls(HashRing(args.shards), read_urls(args.urls))), "个 URL")
+        backend.close()
+    else:
+        print(run_worker(args.queue, args.shard, parser=args.parser, concurrency=args.concurrency, rate=args.rate))
@@ -0,0 +1,300 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from resilience import backoff_time
+
+
+class DownloadError(Exception):
+    """下载失败、服务器不支持续传或完整性校验不通过"""
+
+
+class Downloader:
+    """
+    可断点续传的多段并行下载器，用于 chromedriver 和爬虫需要的大文件。
+
+    - 服务器支持 Range 时把文件分成若干段并行下载，否则退化为单连接
+    - 下载中的数据写入 <dest>.part，进度写入 <dest>.part.json；中断后再次调用会从断点继续
+      （用 If-Range 确认远端文件没有变化）
+    - 每次读取的块大小在 chunk_size 和 max_chunk_size 之间按读取耗时自动调整
+    - 完成后校验文件大小和可选的 checksum（如 "sha256:..."），通过后原子重命名为 dest
+
+    参数:
+        segments (int): 最多并行的分段数，默认 4
+        min_segment_size (int): 每段的最小字节数，默认 1 MB；小文件不会被切得过碎
+        chunk_size (int): 初始读取块大小，默认 64 KB
+        max_chunk_size (int): 读取块大小上限，默认 4 MB
+        timeout (float): 连接和读取超时（秒），默认 30
+        max_retries (int): 每段失败后的最大重试次数，默认 3
+        backoff_factor (float): 重试退避因子，默认 0.5
+        headers (dict, optional): 额外的请求头
+    """
+
+    def __init__(self,
+                 segments=4,
+                 min_segment_size=1024 * 1024,
+                 chunk_size=64 * 1024,
+                 max_chunk_size=4 * 1024 * 1024,
+                 timeout=30,
+                 max_retries=3,
+                 backoff_factor=0.5,
+                 headers=None):
+        self.segments = max(1, segments)
+        self.min_segment_size = min_segment_size
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._session = requests.Session()
+        # 分段下载要保留原始字节，不接受压缩编码
+        self._session.headers.update({"Accept-Encoding": "identity"})
+        if headers:
+            self._session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=self.segments, pool_maxsize=self.segments)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def close(self):
+        self._session.close()
+
+    def _probe(self, url):
+        """请求第一个字节，返回 (文件大小或 None, 是否支持 Range, ETag/Last-Modified)"""
+        with self._session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+            if response.status_code == 206:
+                match = re.search(r"/(\d+)$", response.headers.get("Content-Range", ""))
+                if match:
+                    return int(match.group(1)), True, validator
+            length = response.headers.get("Content-Length")
+            return (int(length) if length else None), False, validator
+
+    def _chunks(self, response):
+        """按读取耗时自适应调整块大小：读得快就加倍，读得慢就减半"""
+        size = self.chunk_size
+        while True:
+            started = time.perf_counter()
+            chunk = response.raw.read(size)
+            if not chunk:
+                return
+            yield chunk
+            elapsed = time.perf_counter() - started
+            if elapsed < 0.1:
+                size = min(size * 2, self.max_chunk_size)
+            elif elapsed > 0.5:
+                size = max(size // 2, self.chunk_size)
+
+    def _fetch_segment(self, url, part_path, segment, validator, save):
+        """下载一段 [start, end]；segment = [start, end, 已下载字节数]，原地更新进度"""
+        errors = 0
+        while segment[0] + segment[2] <= segment[1]:
+            offset = segment[0] + segment[2]
+            headers = {"Range": f"bytes={offset}-{segment[1]}"}
+            if validator:
+                headers["If-Range"] = validator
+            try:
+                with self._session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    if response.status_code != 206:
+                        raise DownloadError(f"服务器没有返回请求的范围（状态码 {response.status_code}），远端文件可能已变化")
+                    with open(part_path, "r+b") as f:
+                        f.seek(offset)
+                        for chunk in self._chunks(response):
+                            chunk = chunk[:segment[1] + 1 - segment[0] - segment[2]]
+                            f.write(chunk)
+                            segment[2] += len(chunk)
+                            save()
+                            if segment[0] + segment[2] > segment[1]:
+                                break
+            except DownloadError:
+                raise
+            except (requests.RequestException, OSError) as e:
+                errors += 1
+                if errors > self.max_retries:
+                    raise DownloadError(f"分段 {segment[0]}-{segment[1]} 下载失败: {e}") from e
+                time.sleep(backoff_time(self.backoff_factor, errors, jitter=True))
+
+    def _fetch_whole(self, url, part_path):
+        """服务器不支持 Range 时单连接下载整个文件"""
+        errors = 0
+        while True:
+            try:
+                with self._session.get(url, stream=True, timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    with open(part_path, "wb") as f:
+                        for chunk in self._chunks(response):
+                            f.write(chunk)
+                return
+            except (requests.RequestException, OSError) as e:
+                errors += 1
+                if errors > self.max_retries:
+                    raise DownloadError(f"下载失败: {e}") from e
+                time.sleep(backoff_time(self.backoff_factor, errors, jitter=True))
+
+    def _plan(self, size):
+        count = max(1, min(self.segments, size // max(1, self.min_segment_size)))
+        step = -(-size // count)
+        return [[start, min(start + step, size) - 1, 0] for start in range(0, size, step)]
+
+    def download(self, url, dest, checksum=None):
+        """
+        下载 url 到 dest，返回 dest 的 Path。
+
+        参数:
+            url (str): 下载地址
+            dest (str or Path): 保存路径
+            checksum (str, optional): "算法:十六进制摘要"，如 "sha256:ab12..."；不通过时删除文件并抛出 DownloadError
+        """
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part_path = dest.with_name(dest.name + ".part")
+        state_path = dest.with_name(dest.name + ".part.json")
+
+        size, ranged, validator = self._probe(url)
+        if size is None or not ranged or size == 0:
+            self._fetch_whole(url, part_path)
+        else:
+            state = None
+            try:
+                with open(state_path, encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                pass
+            if (not state or state.get("url") != url or state.get("size") != size
+                    or state.get("validator") != validator
+                    or not part_path.exists() or part_path.stat().st_size != size):
+                state = {"url": url, "size": size, "validator": validator, "segments": self._plan(size)}
+                with open(part_path, "wb") as f:
+                    f.truncate(size)
+
+            lock = threading.Lock()
+            last_saved = [0.0]
+
+            def save(force=False):
+                # 进度最多每 0.5 秒落盘一次
+                now = time.monotonic()
+                if not force and now - last_saved[0] < 0.5:
+                    return
+                with lock:
+                    last_saved[0] = now
+                    tmp = state_path.with_name(f"{state_path.name}.{threading.get_ident()}.tmp")
+                    with open(tmp, "w", encoding="utf-8") as f:
+                        json.dump(state, f)
+                    os.replace(tmp, state_path)
+
+            pending = [segment for segment in state["segments"] if segment[0] + segment[2] <= segment[1]]
+            try:
+                with ThreadPoolExecutor(max_workers=max(1, len(pending))) as executor:
+                    for future in [executor.submit(self._fetch_segment, url, part_path, segment, validator, save)
+                                   for segment in pending]:
+                        future.result()
+            finally:
+                save(force=True)
+
+        self._verify(part_path, size, checksum, state_path)
+        os.replace(part_path, dest)
+        if state_path.exists():
+            state_path.unlink()
+        return dest
+
+    @staticmethod
+    def _verify(path, size, checksum, state_path):
+        actual_size = path.stat().st_size
+        problem = None
+        if size is not None and actual_size != size:
+            problem = f"文件大小不符：期望 {size}，实际 {actual_size}"
+        elif checksum:
+            algorithm, _, expected = checksum.partition(":")
+            digest = hashlib.new(algorithm)
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            if digest.hexdigest().lower() != expected.lower():
+                problem = f"{algorithm} 校验失败：期望 {expected}，实际 {digest.hexdigest()}"
+        if problem:
+            # 数据已损坏，续传也无意义，删掉重新下载
+            path.unlink()
+            if state_path.exists():
+                state_path.unlink()
+            raise DownloadError(problem)
+
+
+def extract_archive(archive, target_dir, prepare=None):
+    """
+    把 zip / tar 压缩包解压到 target_dir。
+
+    先解压到同级临时目录，调用 prepare(临时目录) 做整理（如移动文件、加执行权限），
+    再整体替换 target_dir；其他进程要么看到旧目录，要么看到完整的新目录。
+    """
+    archive = Path(archive)
+    target = Path(target_dir)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{target.name}-"))
+    try:
+        if zipfile.is_zipfile(archive):
+            with zipfile.ZipFile(archive) as zf:
+                broken = zf.testzip()
+                if broken:
+                    raise DownloadError(f"压缩包已损坏: {broken}")
+                zf.extractall(tmp_dir)
+        elif tarfile.is_tarfile(archive):
+            with tarfile.open(archive) as tf:
+                if hasattr(tarfile, "data_filter"):
+                    tf.extractall(tmp_dir, filter="data")
+                else:
+                    tf.extractall(tmp_dir)
+        else:
+            raise DownloadError(f"无法识别的压缩包格式: {archive}")
+
+        if prepare is not None:
+            prepare(tmp_dir)
+
+        backup = None
+        if target.exists():
+            backup = target.with_name(f".{target.name}.old-{os.getpid()}")
+            os.replace(target, backup)
+        os.replace(tmp_dir, target)
+        if backup is not None:
+            shutil.rmtree(backup, ignore_errors=True)
+        return target
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def download(url, dest, checksum=None, **kwargs):
+    """用一个临时 Downloader 下载单个文件，kwargs 传给 Downloader"""
+    downloader = Downloader(**kwargs)
+    try:
+        return downloader.download(url, dest, checksum=checksum)
+    finally:
+        downloader.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="可断点续传的多段并行下载")
+    parser.add_argument("url")
+    parser.add_argument("dest")
+    parser.add_argument("--segments", type=int, default=4)
+    parser.add_argument("--checksum", default=None, help="如 sha256:ab12...")
+    parser.add_argument("--extract-to", default=None, help="下载后解压到该目录")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    path = download(args.url, args.dest, checksum=args.checksum, segments=args.segments)
+    print(f"✅ 已下载 {path}（{path.stat().st_size / 1024:.1f} KB，{time.perf_counter() - started:.2f} 秒）")
+    if args.extract_to:
+        print("📦 已解压到", extract_archive(path, args.extract_to))
@@ -0,0 +1,152 @@
+from functools import lru_cache
+
+# lxml + cssselect 是可选依赖，缺失时自动回退到 BeautifulSoup
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# 豆瓣读书 Top250：class 为 pl2 的 div 下的 a 标签
+DOUBAN_TOP250 = {
+    "item": "div.pl2 a",
+    "fields": {
+        "title": (None, "text"),
+        "link": (None, "href"),
+    },
+}
+
+# 百度搜索结果：带 href 的 sc-link 链接，标题在其中的 tts-b-hl span 里
+BAIDU_RESULTS = {
+    "item": "a.sc-link[href]",
+    "fields": {
+        "title": ("span[class='tts-b-hl']", "text"),
+        "link": (None, "href"),
+    },
+}
+
+# 在页面中一次性执行提取规则的脚本，arguments[0] 为 spec
+_DOM_EXTRACT_JS = """
+var spec = arguments[0], records = [];
+document.querySelectorAll(spec.item).forEach(function (item) {
+    var record = {};
+    Object.keys(spec.fields).forEach(function (name) {
+        var selector = spec.fields[name][0], attr = spec.fields[name][1];
+        var node = selector ? item.querySelector(selector) : item;
+        if (!node) {
+            record[name] = null;
+        } else if (attr === "text") {
+            record[name] = (node.innerText || "").trim();
+        } else {
+            var value = node[attr];
+            record[name] = typeof value === "string" ? value : node.getAttribute(attr);
+        }
+    });
+    records.push(record);
+});
+return records;
+"""
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector):
+    """编译 CSS 选择器并缓存，同一选择器只解析一次"""
+    return CSSSelector(selector)
+
+
+# 元素内的文本节点，不含 <script>/<style> 中的代码（BeautifulSoup 的 get_text 同样跳过）
+_TEXT_NODES = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]") if HAS_LXML else None
+
+
+def _lxml_text(element):
+    # 与 BeautifulSoup 的 get_text(strip=True) 一致：逐段去空白后直接拼接
+    return "".join(s.strip() for s in _TEXT_NODES(element) if s.strip())
+
+
+def _extract_lxml(html, spec):
+    if not html.strip():
+        return []  # 空页面 lxml 会抛 ParserError，BeautifulSoup 则返回空结果
+    if isinstance(html, str) and html.lstrip().startswith("<?xml"):
+        html = html.encode("utf-8")  # 带编码声明的字符串 lxml 不接受
+    try:
+        root = lxml.html.fromstring(html)
+    except etree.ParserError:
+        return []  # 只有注释或 XML 声明、没有任何元素
+    records = []
+    for item in compile_selector(spec["item"])(root):
+        record = {}
+        for name, (selector, attr) in spec["fields"].items():
+            if selector:
+                found = compile_selector(selector)(item)
+                node = found[0] if found else None
+            else:
+                node = item
+            if node is None:
+                record[name] = None
+            elif attr == "text":
+                record[name] = _lxml_text(node)
+            else:
+                record[name] = node.get(attr)
+        records.append(record)
+    return records
+
+
+def _extract_bs4(html, spec):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    records = []
+    for item in soup.select(spec["item"]):
+        record = {}
+        for name, (selector, attr) in spec["fields"].items():
+            node = item.select_one(selector) if selector else item
+            if node is None:
+                record[name] = None
+            elif attr == "text":
+                record[name] = node.get_text(strip=True)
+            else:
+                value = node.get(attr)
+                # class 等多值属性在 bs4 中是 list，与 lxml 保持一致返回字符串
+                record[name] = " ".join(value) if isinstance(value, list) else value
+        records.append(record)
+    return records
+
+
+def extract(html, spec, engine="auto"):
+    """
+    按声明式规则从 HTML 中提取记录。
+
+    参数:
+        html (str or bytes): 页面源码
+        spec (dict): 提取规则
+            - item (str): 每条记录对应元素的 CSS 选择器
+            - fields (dict): 字段名 -> (子选择器, 属性)；子选择器为 None 表示元素本身，
+              属性为 "text" 表示取文本（等同 get_text(strip=True)），否则取该属性值
+        engine (str): "lxml"、"bs4" 或 "auto"（默认，有 lxml 时用 lxml）
+
+    返回:
+        list[dict]: 每条记录一个 dict，取不到的字段为 None
+    """
+    if engine == "auto":
+        engine = "lxml" if HAS_LXML else "bs4"
+    if engine == "lxml":
+        return _extract_lxml(html, spec)
+    if engine == "bs4":
+        return _extract_bs4(html, spec)
+    raise ValueError(f"未知的解析引擎: {engine}")
+
+
+def extract_dom(driver, spec):
+    """
+    在 Selenium 打开的页面中按同样的规则提取记录，只需一次 execute_script 往返。
+
+    与逐个 find_element / .text / get_attribute 相比，N 条记录的往返次数从约 3N 次降为 1 次，
+    也不会因为元素在循环中被替换而抛出 StaleElementReferenceException。
+
+    文本取 innerText 并去掉首尾空白（与 WebElement.text.strip() 一致）；
+    属性优先取 DOM 属性值（与 get_attribute 一致，如 href 为绝对地址），没有时取 HTML 属性。
+    """
+    fields = {name: list(field) for name, field in spec["fields"].items()}
+    return driver.execute_script(_DOM_EXTRACT_JS, {"item": spec["item"], "fields": fields})
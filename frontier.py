@@ -0,0 +1,201 @@
+import hashlib
+import heapq
+import itertools
+import math
+import sqlite3
+import threading
+from collections import OrderedDict
+from urllib.parse import urldefrag, urlsplit
+
+from safe_requests import safe_get_many
+
+
+class BloomFilter:
+    """
+    布隆过滤器：用很少的内存（约 1.2 字节/URL，误判率 1%）判断“可能见过”。
+
+    参数:
+        capacity (int): 预计元素数量
+        error_rate (float): 期望误判率，默认 0.01
+    """
+
+    def __init__(self, capacity=10_000_000, error_rate=0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item):
+        # 双重哈希：用一次 blake2b 的两段结果模拟 k 个哈希函数
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class CrawlFrontier:
+    """
+    可持久化、可断点续爬的 URL 调度器。
+
+    - 按主机划分子队列，每个子队列是优先级堆（priority 越小越先抓），
+      next_batch() 在各主机间轮转取 URL，避免一批请求全打到同一个站点
+    - 去重：先查布隆过滤器，只有“可能见过”时才查 SQLite 中的精确集合，
+      内存占用只有布隆过滤器的几个字节/URL
+    - 待抓队列和已见集合都写入 SQLite，进程被杀后用同一个 db_path 重建即可续爬
+
+    参数:
+        db_path (str): SQLite 检查点文件路径，默认 frontier.db
+        capacity (int): 预计 URL 总量，用于确定布隆过滤器大小
+        error_rate (float): 布隆过滤器误判率
+        checkpoint_every (int): 每多少次写操作提交一次事务，默认 500
+
+    用法:
+        frontier = CrawlFrontier("douban.db")
+        frontier.add_many(f"https://book.douban.com/top250?start={i}" for i in range(0, 250, 25))
+        for url, response in frontier.crawl(concurrency=5):
+            ...  # 解析出的新链接用 frontier.add() 加入
+        frontier.close()
+    """
+
+    def __init__(self, db_path="frontier.db", capacity=10_000_000, error_rate=0.01, checkpoint_every=500):
+        self.checkpoint_every = checkpoint_every
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS queue (
+                url TEXT PRIMARY KEY,
+                host TEXT NOT NULL,
+                priority REAL NOT NULL,
+                seq INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB);
+        """)
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._hosts = OrderedDict()  # host -> [(priority, seq, url), ...] 堆
+        self._seq = itertools.count()
+        self._bloom = self._load_bloom(capacity, error_rate)
+
+        # 恢复未完成的队列
+        max_seq = -1
+        for url, host, priority, seq in self._conn.execute("SELECT url, host, priority, seq FROM queue ORDER BY seq"):
+            self._hosts.setdefault(host, []).append((priority, seq, url))
+            max_seq = seq
+        for heap in self._hosts.values():
+            heapq.heapify(heap)
+        self._seq = itertools.count(max_seq + 1)
+
+    def _load_bloom(self, capacity, error_rate):
+        """优先使用上次正常关闭时保存的位图，否则从 seen 表重建"""
+        bloom = BloomFilter(capacity, error_rate)
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'bloom'").fetchone()
+        if row is not None and len(row[0]) == len(bloom.bits):
+            bloom.bits = bytearray(row[0])
+            self._conn.execute("DELETE FROM meta WHERE key = 'bloom'")  # 异常退出后不能再信任旧位图
+            self._conn.commit()
+        else:
+            for (url,) in self._conn.execute("SELECT url FROM seen"):
+                bloom.add(url)
+        return bloom
+
+    @staticmethod
+    def normalize(url):
+        """去掉 #fragment，避免同一页面被重复抓取"""
+        return urldefrag(url)[0]
+
+    def _seen(self, url):
+        if url not in self._bloom:
+            return False
+        return self._conn.execute("SELECT 1 FROM seen WHERE url = ?", (url,)).fetchone() is not None
+
+    def _wrote(self, count=1):
+        self._pending_writes += count
+        if self._pending_writes >= self.checkpoint_every:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def add(self, url, priority=0):
+        """加入一个 URL；已经见过的返回 False"""
+        url = self.normalize(url)
+        with self._lock:
+            if self._seen(url):
+                return False
+            host = urlsplit(url).netloc
+            seq = next(self._seq)
+            self._bloom.add(url)
+            self._conn.execute("INSERT OR IGNORE INTO seen (url) VALUES (?)", (url,))
+            self._conn.execute("INSERT OR REPLACE INTO queue (url, host, priority, seq) VALUES (?, ?, ?, ?)",
+                               (url, host, priority, seq))
+            heapq.heappush(self._hosts.setdefault(host, []), (priority, seq, url))
+            self._wrote(2)
+            return True
+
+    def add_many(self, urls, priority=0):
+        """批量加入，返回新加入的数量"""
+        return sum(self.add(url, priority) for url in urls)
+
+    def next_batch(self, size):
+        """
+        取出至多 size 个待抓 URL，在各主机之间轮转。
+
+        取出的 URL 仍保留在检查点中，调用 done() 后才真正删除，
+        因此中途崩溃不会丢失正在抓取的页面。
+        """
+        batch = []
+        with self._lock:
+            while len(batch) < size and self._hosts:
+                host, heap = next(iter(self._hosts.items()))
+                batch.append(heapq.heappop(heap)[2])
+                del self._hosts[host]
+                if heap:
+                    self._hosts[host] = heap  # 放到队尾，下一轮再取
+        return batch
+
+    def done(self, url):
+        """标记 URL 已处理完毕，从检查点队列中删除"""
+        with self._lock:
+            self._conn.execute("DELETE FROM queue WHERE url = ?", (url,))
+            self._wrote()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(heap) for heap in self._hosts.values())
+
+    def crawl(self, concurrency=8, batch_size=None, fetch_many=safe_get_many, **kwargs):
+        """
+        不断从队列取 URL 交给 fetch_many（默认 safe_get_many）并发抓取，逐个产出 (url, result)。
+
+        调用方处理完一个结果、取下一个时，该 URL 才会被标记为完成；
+        处理过程中新加入的 URL 会在后续批次中被抓取。
+        """
+        batch_size = batch_size or concurrency * 4
+        while True:
+            batch = self.next_batch(batch_size)
+            if not batch:
+                break
+            for url, result in fetch_many(batch, concurrency=concurrency, **kwargs):
+                yield url, result
+                self.done(url)
+        self.checkpoint()
+
+    def checkpoint(self):
+        """立即提交所有未写入的变更"""
+        with self._lock:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def close(self):
+        """保存布隆过滤器位图并关闭数据库，下次打开时无需重建"""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('bloom', ?)",
+                               (bytes(self._bloom.bits),))
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, TimeoutError as FutureTimeoutError, wait
+
+from metrics import Histogram
+from resilience import RetryBudget
+
+
+class HedgePolicy:
+    """
+    对冲请求策略：请求超过该主机观测到的 p95 延迟仍未返回时，再发一个相同请求，谁先返回用谁。
+
+    参数:
+        percentile (float): 触发对冲的延迟百分位，默认 95
+        min_delay (float): 对冲等待时间下限（秒），默认 0.05
+        default_delay (float): 该主机样本不足时的等待时间（秒），默认 1
+        min_samples (int): 使用观测值前至少需要的样本数，默认 20
+        budget (RetryBudget, optional): 对冲预算，默认最多增加约 5% 的请求量
+    """
+
+    def __init__(self, percentile=95, min_delay=0.05, default_delay=1.0, min_samples=20, budget=None):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.budget = budget or RetryBudget(ratio=0.05, min_per_second=0.0, max_tokens=20.0)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def delay(self, host):
+        """发出对冲请求前应等待的秒数"""
+        with self._lock:
+            histogram = self._histograms.get(host)
+            if histogram is None or histogram.count < self.min_samples:
+                return self.default_delay
+            return max(self.min_delay, histogram.percentile(self.percentile))
+
+    def record(self, host, latency):
+        with self._lock:
+            histogram = self._histograms.get(host)
+            if histogram is None:
+                histogram = self._histograms[host] = Histogram()
+            histogram.observe(latency)
+
+
+def _succeeded(future):
+    return not future.cancelled() and future.exception() is None and future.result()["success"]
+
+
+def _discard(future):
+    """丢弃对冲中落败的结果，关闭其连接"""
+    if not future.cancelled() and future.exception() is None:
+        response = future.result()["response"]
+        if response is not None:
+            response.close()
+
+
+def hedged_call(executor, policy, host, call):
+    """
+    在线程池中执行 call()，必要时发出对冲请求，返回先成功的结果。
+
+    落败的请求若尚未开始则直接取消，已在进行中的在完成后关闭连接。
+    """
+    policy.budget.deposit()
+    started = time.perf_counter()
+    primary = executor.submit(call)
+    try:
+        result = primary.result(timeout=policy.delay(host))
+        policy.record(host, time.perf_counter() - started)
+        return result
+    except FutureTimeoutError:
+        pass
+    if not policy.budget.try_spend():
+        result = primary.result()
+        policy.record(host, time.perf_counter() - started)
+        return result
+
+    backup = executor.submit(call)
+    pending = {primary, backup}
+    winner = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        winner = done.pop()
+        if _succeeded(winner) or not pending:
+            break
+    for future in (primary, backup):
+        if future is not winner and not future.cancel():
+            future.add_done_callback(_discard)
+    policy.record(host, time.perf_counter() - started)
+    return winner.result()
+
+
+async def async_hedged_call(policy, host, make_coro):
+    """hedged_call 的异步版本：make_coro() 每次返回一个新的请求协程，落败的任务会被取消"""
+    policy.budget.deposit()
+    started = time.perf_counter()
+    primary = asyncio.ensure_future(make_coro())
+    done, _ = await asyncio.wait({primary}, timeout=policy.delay(host))
+    if done or not policy.budget.try_spend():
+        result = await primary
+        policy.record(host, time.perf_counter() - started)
+        return result
+
+    backup = asyncio.ensure_future(make_coro())
+    pending = {primary, backup}
+    winner = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = done.pop()
+            if (winner.exception() is None and winner.result()["success"]) or not pending:
+                break
+    finally:
+        for task in (primary, backup):
+            if task is not winner:
+                task.cancel()
+    policy.record(host, time.perf_counter() - started)
+    return winner.result()
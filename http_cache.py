@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# 只保存条件请求和解码需要的响应头（正文已解压，不能保留 Content-Encoding/Length）
+_KEPT_HEADERS = ("ETag", "Last-Modified", "Content-Type")
+
+
+class HttpCache:
+    """
+    磁盘 + 内存两级的 HTTP 响应缓存，供 SafeClient(cache=...) 使用。
+
+    - 内存层：最近访问的 memory_items 个条目，命中时不读磁盘
+    - 磁盘层：每个 URL 一个文件，总大小超过 max_bytes 时按最近最少使用（LRU）淘汰
+    - 过期（超过 ttl）后携带 If-None-Match / If-Modified-Since 重新验证，
+      服务器返回 304 时直接复用缓存正文
+    - offline=True 时只读缓存，不发任何网络请求（离线回放）
+
+    参数:
+        directory (str or Path): 缓存目录，默认 .http_cache
+        max_bytes (int): 磁盘缓存上限（字节），默认 512 MB
+        memory_items (int): 内存层最多保存的条目数，默认 256
+        ttl (float or None): 缓存有效期（秒），默认 3600；None 表示永不过期
+        offline (bool): 是否离线回放，默认 False
+    """
+
+    def __init__(self,
+                 directory=".http_cache",
+                 max_bytes=512 * 1024 * 1024,
+                 memory_items=256,
+                 ttl=3600,
+                 offline=False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.ttl = ttl
+        self.offline = offline
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 磁盘索引：key -> 文件大小，按最近访问时间排序（最旧的在前）
+        files = sorted(self.directory.glob("*.cache"), key=lambda p: p.stat().st_mtime)
+        self._index = OrderedDict((p.stem, p.stat().st_size) for p in files)
+        self._total = sum(self._index.values())
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return self.directory / f"{key}.cache"
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, url):
+        """
+        取出缓存条目，未命中返回 None。
+
+        条目为 dict：url、status、headers、body (bytes)、encoding、stored_at
+        """
+        key = self.key(url)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                if key in self._index:
+                    self._index.move_to_end(key)
+                return entry
+            if key not in self._index:
+                return None
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                meta, body = f.read().split(b"\n", 1)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        entry = json.loads(meta)
+        entry["body"] = body
+
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+            self._remember(key, entry)
+        return entry
+
+    def _write(self, key, entry):
+        meta = {k: v for k, v in entry.items() if k != "body"}
+        data = json.dumps(meta, ensure_ascii=False).encode("utf-8") + b"\n" + entry["body"]
+        path = self._path(key)
+        # 先写临时文件再原子替换，避免并发读到半个文件
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return len(data)
+
+    def put(self, url, status, headers, body, encoding=None):
+        """保存一个响应；正文超过 max_bytes 的不缓存"""
+        entry = {
+            "url": url,
+            "status": status,
+            "headers": {k: headers[k] for k in _KEPT_HEADERS if k in headers},
+            "body": body,
+            "encoding": encoding,
+            "stored_at": time.time(),
+        }
+        if len(body) > self.max_bytes:
+            return
+        key = self.key(url)
+        size = self._write(key, entry)
+        with self._lock:
+            self._total += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self._remember(key, entry)
+            self._evict()
+
+    def refresh(self, url, entry):
+        """服务器返回 304 后调用：更新存储时间，重新开始计算 ttl"""
+        entry["stored_at"] = time.time()
+        key = self.key(url)
+        size = self._write(key, entry)
+        with self._lock:
+            self._total += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self._remember(key, entry)
+
+    def _evict(self):
+        while self._total > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            self._memory.pop(key, None)
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def is_fresh(self, entry):
+        """条目是否仍在 ttl 内，可以不经验证直接使用"""
+        return self.ttl is None or time.time() - entry["stored_at"] < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry):
+        """根据缓存条目生成条件请求头"""
+        if entry is None:
+            return {}
+        headers = {}
+        if "ETag" in entry["headers"]:
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if "Last-Modified" in entry["headers"]:
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    def clear(self):
+        """清空内存和磁盘缓存"""
+        with self._lock:
+            for key in self._index:
+                try:
+                    self._path(key).unlink()
+                except OSError:
+                    pass
+            self._index.clear()
+            self._memory.clear()
+            self._total = 0
+
+
+if __name__ == "__main__":
+    # 用本地替身服务器演示：第一次 200，过期后重新验证得到 304，离线模式直接回放
+    import tempfile
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from safe_requests import SafeClient
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = "<html>缓存测试</html>".encode("utf-8")
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            print("服务器收到:", self.requestline, "->", args[1])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/page"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = SafeClient(cache=HttpCache(tmp, ttl=0))
+        print(client.get(url)["data"])
+        print(client.get(url)["data"])
+        client.cache.offline = True
+        print(client.get(url)["data"])
+    server.shutdown()
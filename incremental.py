@@ -0,0 +1,230 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+
+# 默认 64 位 SimHash 分成 4 段，每段 16 位；汉明距离 <= 3 的两个指纹至少有一段完全相同
+BITS = 64
+BANDS = 4
+
+_TAGS = re.compile(r"<(script|style)\b.*?</\1\s*>|<[^>]+>", re.S | re.I)
+_SPACES = re.compile(r"\s+")
+
+
+def page_text(html):
+    """去掉标签、脚本和样式后的可见文本（空白压缩为单个空格），用于计算 SimHash"""
+    import html as html_lib
+
+    return _SPACES.sub(" ", html_lib.unescape(_TAGS.sub(" ", html))).strip()
+
+
+def _features(text, n=3):
+    # 字符 n-gram 对中文和英文都适用，不需要分词
+    text = text.lower()
+    if len(text) <= n:
+        return Counter([text])
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def simhash(text, bits=BITS):
+    """计算文本的 SimHash：内容相近的文本指纹的汉明距离也小"""
+    weights = [0] * bits
+    for feature, count in _features(text).items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+        for i in range(bits):
+            weights[i] += count if h >> i & 1 else -count
+    return sum(1 << i for i, weight in enumerate(weights) if weight > 0)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class Change:
+    """
+    FingerprintStore.check() 的结果，处理完页面后交给 FingerprintStore.commit() 保存。
+
+    属性:
+        url (str)
+        changed (bool): 是否是新页面或内容有变化；False 时可以跳过解析和输出
+        new (bool): 是否第一次见到该 URL
+        simhash (int or None): 本次内容的 SimHash（未变化时为 None，不计算）
+        near_duplicates (list): 与本页内容近似重复的其他 URL
+        body_hash (str): 本次正文的 SHA-1
+    """
+    __slots__ = ("url", "changed", "new", "simhash", "near_duplicates", "body_hash")
+
+    def __init__(self, url, changed, new=False, simhash=None, near_duplicates=(), body_hash=None):
+        self.url = url
+        self.changed = changed
+        self.new = new
+        self.simhash = simhash
+        self.near_duplicates = list(near_duplicates)
+        self.body_hash = body_hash
+
+
+class FingerprintStore:
+    """
+    增量重抓：为每个 URL 保存正文的精确哈希和可见文本的 SimHash。
+
+    - 正文哈希没变的页面判定为未变化，直接跳过（不解析、不输出，也不计算 SimHash）
+    - tolerance 不为 None 时，SimHash 与上次相差不超过 tolerance 位也视为未变化
+      （适合只有时间戳、广告位等细节变化的页面）
+    - 内容变化或新页面会通过 SimHash 分段索引查找近似重复的其他 URL（汉明距离 <= distance）
+
+    check() 只读不写；新指纹要等页面的记录真正写出后再 commit()，
+    否则解析失败或进程在输出前崩溃时，下次会把页面当成未变化，记录就永久丢失了。
+    已 check()、尚未 commit() 的指纹保存在内存索引中，同一次运行内的页面之间也能发现近似重复。
+
+    用法:
+        store = FingerprintStore("fingerprints.db")
+        with open_sink("items.jsonl") as sink:
+            for url, response, change in store.changed(safe_get_many(urls)):
+                records = extract(response["data"], spec)   # 只解析变化的页面
+                sink.write_many(records, on_flushed=partial(store.commit, change))
+        store.close()                                        # 先关闭 sink，再关闭 store
+
+    参数:
+        db_path (str): SQLite 文件路径，默认 fingerprints.db
+        distance (int): 近似重复的汉明距离阈值，默认 3（不能超过 BANDS - 1，否则分段索引会漏报）
+        tolerance (int, optional): 同一 URL 前后两次视为未变化的 SimHash 距离，默认 None（只看精确哈希）
+    """
+
+    def __init__(self, db_path="fingerprints.db", distance=3, tolerance=None):
+        if distance >= BANDS:
+            raise ValueError(f"distance 不能超过 {BANDS - 1}")
+        self.distance = distance
+        self.tolerance = tolerance
+        self.stats = {"unchanged": 0, "changed": 0, "new": 0, "near_duplicates": 0, "committed": 0}
+        self._lock = threading.Lock()
+        self._pending = {}                     # url -> 已检查、未提交的 SimHash
+        self._pending_bands = defaultdict(set)  # (band, value) -> URL 集合，对应 bands 表
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body_hash TEXT NOT NULL,
+                simhash TEXT NOT NULL,
+                checked_at REAL,
+                changed_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                url TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS bands_lookup ON bands (band, value);
+            CREATE INDEX IF NOT EXISTS bands_url ON bands (url);
+        """)
+
+    @staticmethod
+    def _bands(fingerprint):
+        width = BITS // BANDS
+        mask = (1 << width) - 1
+        return [(band, fingerprint >> (band * width) & mask) for band in range(BANDS)]
+
+    def _near(self, url, fingerprint):
+        candidates = set()
+        for band, value in self._bands(fingerprint):
+            for (other,) in self._conn.execute("SELECT url FROM bands WHERE band = ? AND value = ?", (band, value)):
+                candidates.add(other)
+            candidates.update(self._pending_bands.get((band, value), ()))
+        candidates.discard(url)
+        near = []
+        for other in sorted(candidates):
+            # 未提交的指纹比库里的新
+            other_hash = self._pending.get(other)
+            if other_hash is None:
+                row = self._conn.execute("SELECT simhash FROM pages WHERE url = ?", (other,)).fetchone()
+                other_hash = int(row[0], 16) if row is not None else None
+            if other_hash is not None and hamming(other_hash, fingerprint) <= self.distance:
+                near.append(other)
+        return near
+
+    def _forget_pending(self, url):
+        fingerprint = self._pending.pop(url, None)
+        if fingerprint is not None:
+            for key in self._bands(fingerprint):
+                urls = self._pending_bands[key]
+                urls.discard(url)
+                if not urls:
+                    del self._pending_bands[key]
+
+    def check(self, url, body):
+        """
+        比较 body（str 或 bytes）与上次保存的指纹，返回 Change；不修改保存的指纹，见 commit()。
+        """
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        body_hash = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            row = self._conn.execute("SELECT body_hash, simhash FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is not None and row[0] == body_hash:
+                self.stats["unchanged"] += 1
+                return Change(url, changed=False, body_hash=body_hash)
+
+            text = page_text(data.decode("utf-8", errors="replace"))
+            fingerprint = simhash(text)
+            if (row is not None and self.tolerance is not None
+                    and hamming(int(row[1], 16), fingerprint) <= self.tolerance):
+                self.stats["unchanged"] += 1
+                return Change(url, changed=False, body_hash=body_hash)
+
+            near = self._near(url, fingerprint)
+            self._forget_pending(url)
+            self._pending[url] = fingerprint
+            for key in self._bands(fingerprint):
+                self._pending_bands[key].add(url)
+            self.stats["new" if row is None else "changed"] += 1
+            self.stats["near_duplicates"] += bool(near)
+            return Change(url, changed=True, new=row is None, simhash=fingerprint, near_duplicates=near,
+                          body_hash=body_hash)
+
+    def commit(self, change):
+        """页面的记录写出后调用：保存 check() 得到的新指纹（未变化的页面只更新检查时间）"""
+        now = time.time()
+        with self._lock:
+            if not change.changed:
+                with self._conn:
+                    self._conn.execute("UPDATE pages SET checked_at = ? WHERE url = ?", (now, change.url))
+                return
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                                   (change.url, change.body_hash, format(change.simhash, "016x"), now, now))
+                self._conn.execute("DELETE FROM bands WHERE url = ?", (change.url,))
+                self._conn.executemany("INSERT INTO bands VALUES (?, ?, ?)",
+                                       [(band, value, change.url) for band, value in self._bands(change.simhash)])
+            if self._pending.get(change.url) == change.simhash:
+                self._forget_pending(change.url)
+            self.stats["committed"] += 1
+
+    def changed(self, results, on_duplicate=None):
+        """
+        过滤 safe_get / safe_get_many 的 (url, result)：产出成功且内容有变化的 (url, result, change)，
+        失败的原样产出、change 为 None。未变化的页面直接跳过（并更新检查时间）。
+
+        产出的页面处理并写出后，调用方需要 commit(change)。
+        on_duplicate(change) 在发现近似重复时调用，默认打印提示。
+        """
+        for url, result in results:
+            if not result["success"]:
+                yield url, result, None
+                continue
+            change = self.check(url, result["data"])
+            if not change.changed:
+                self.commit(change)
+                continue
+            if change.near_duplicates:
+                if on_duplicate is not None:
+                    on_duplicate(change)
+                else:
+                    print(f"⚠️ {url} 与 {', '.join(change.near_duplicates)} 内容近似重复")
+            yield url, result, change
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,316 @@
+import socket
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+# 直方图桶上限（秒），与 Prometheus 默认桶接近
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGES = ("dns", "connect", "tls", "ttfb", "download", "total")
+
+
+class RequestTiming:
+    """
+    单个请求的耗时明细（秒）。复用已有连接时 dns/connect/tls 为 0。
+
+    属性:
+        host, method, status, error
+        dns, connect, tls, ttfb, download, total
+        retries (int): 重试次数
+        bytes (int): 接收的字节数
+    """
+    __slots__ = ("host", "method", "status", "error",
+                 "dns", "connect", "tls", "ttfb", "download", "total",
+                 "retries", "bytes")
+
+    def __init__(self, host, method):
+        self.host = host
+        self.method = method
+        self.status = None
+        self.error = None
+        self.dns = self.connect = self.tls = self.ttfb = self.download = self.total = 0.0
+        self.retries = 0
+        self.bytes = 0
+
+
+class Histogram:
+    """固定桶直方图，记录一次只需一次二分查找"""
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # 最后一个是 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def percentile(self, pct):
+        """按桶线性插值估算百分位数，没有数据时返回 None"""
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        lower = 0.0
+        for i, count in enumerate(self.counts):
+            upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return BUCKETS[-1]
+
+    def merge(self, other):
+        """把另一个直方图的计数加到本直方图上（桶固定，合并后的百分位数与一起统计时相同）"""
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+        return self
+
+    def to_dict(self):
+        return {"counts": list(self.counts), "sum": self.sum, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = list(data["counts"])
+        histogram.sum = data["sum"]
+        histogram.count = data["count"]
+        return histogram
+
+
+class Metrics:
+    """
+    按主机聚合请求耗时，供 SafeClient(metrics=...) 和 AsyncSafeClient(metrics=...) 使用。
+
+    - add_callback(fn)：每个请求结束后调用 fn(RequestTiming)
+    - prometheus_text()：导出 Prometheus 文本格式
+    - summary() / start_periodic_log()：打印各主机的请求数、错误数和 p50/p95 延迟
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = defaultdict(Histogram)  # (host, stage) -> Histogram
+        self._requests = defaultdict(int)          # (host, status) -> 次数
+        self._errors = defaultdict(int)
+        self._retries = defaultdict(int)
+        self._bytes = defaultdict(int)
+        self._callbacks = []
+        self._log_stop = None
+
+    def add_callback(self, callback):
+        self._callbacks.append(callback)
+
+    def record(self, timing):
+        with self._lock:
+            host = timing.host
+            for stage in STAGES:
+                value = getattr(timing, stage)
+                if value or stage in ("ttfb", "total"):
+                    self._histograms[host, stage].observe(value)
+            self._requests[host, timing.status] += 1
+            if timing.error is not None:
+                self._errors[host] += 1
+            self._retries[host] += timing.retries
+            self._bytes[host] += timing.bytes
+        for callback in self._callbacks:
+            callback(timing)
+
+    def percentile(self, host, stage, pct):
+        """某主机某阶段的延迟百分位数（秒），没有数据时返回 None"""
+        with self._lock:
+            histogram = self._histograms.get((host, stage))
+            return histogram.percentile(pct) if histogram else None
+
+    def histogram(self, host, stage):
+        """某主机某阶段直方图的副本，没有数据时返回 None"""
+        with self._lock:
+            histogram = self._histograms.get((host, stage))
+            return Histogram().merge(histogram) if histogram else None
+
+    def prometheus_text(self, prefix="spider"):
+        """以 Prometheus 文本格式导出所有指标"""
+        lines = [f"# TYPE {prefix}_request_duration_seconds histogram"]
+        with self._lock:
+            for (host, stage), histogram in sorted(self._histograms.items()):
+                labels = f'host="{host}",stage="{stage}"'
+                cumulative = 0
+                for i, count in enumerate(histogram.counts):
+                    cumulative += count
+                    le = BUCKETS[i] if i < len(BUCKETS) else "+Inf"
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+            lines.append(f"# TYPE {prefix}_requests_total counter")
+            for (host, status), count in sorted(self._requests.items(), key=str):
+                lines.append(f'{prefix}_requests_total{{host="{host}",status="{status or "error"}"}} {count}')
+            for name, counter in (("request_errors_total", self._errors),
+                                  ("request_retries_total", self._retries),
+                                  ("response_bytes_total", self._bytes)):
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for host, value in sorted(counter.items()):
+                    lines.append(f'{prefix}_{name}{{host="{host}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """各主机一行的摘要"""
+        with self._lock:
+            hosts = sorted({host for host, _ in self._histograms})
+            rows = []
+            for host in hosts:
+                total = self._histograms[host, "total"]
+                ttfb = self._histograms[host, "ttfb"]
+                rows.append(
+                    f"{host}: 请求 {total.count} 次, 错误 {self._errors[host]}, 重试 {self._retries[host]}, "
+                    f"{self._bytes[host] / 1024:.1f} KB, "
+                    f"总耗时 p50 {total.percentile(50) * 1000:.0f} ms / p95 {total.percentile(95) * 1000:.0f} ms, "
+                    f"首字节 p95 {ttfb.percentile(95) * 1000:.0f} ms"
+                )
+        return "\n".join(rows)
+
+    def start_periodic_log(self, interval=60, log=print):
+        """启动后台线程，每 interval 秒输出一次摘要"""
+        self.stop_periodic_log()
+        stop = self._log_stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                text = self.summary()
+                if text:
+                    log(text)
+
+        threading.Thread(target=loop, daemon=True).start()
+
+    def stop_periodic_log(self):
+        if self._log_stop is not None:
+            self._log_stop.set()
+            self._log_stop = None
+
+    def trace_config(self):
+        """
+        生成 aiohttp.TraceConfig，把 DNS / 建连 / 首字节时间写入 trace_request_ctx 中的 RequestTiming。
+        aiohttp 的建连事件包含 TLS 握手，因此异步路径的 tls 记在 connect 中。
+        """
+        import aiohttp
+
+        async def on_request_start(session, ctx, params):
+            ctx.started = time.perf_counter()
+
+        async def on_dns_start(session, ctx, params):
+            ctx.dns_started = time.perf_counter()
+
+        async def on_dns_end(session, ctx, params):
+            ctx.trace_request_ctx.dns += time.perf_counter() - ctx.dns_started
+
+        async def on_connect_start(session, ctx, params):
+            ctx.connect_started = time.perf_counter()
+
+        async def on_connect_end(session, ctx, params):
+            timing = ctx.trace_request_ctx
+            timing.connect += time.perf_counter() - ctx.connect_started - timing.dns
+
+        async def on_request_end(session, ctx, params):
+            timing = ctx.trace_request_ctx
+            timing.ttfb = time.perf_counter() - ctx.started - timing.dns - timing.connect
+
+        trace = aiohttp.TraceConfig(trace_config_ctx_factory=_trace_ctx_factory)
+        trace.on_request_start.append(on_request_start)
+        trace.on_dns_resolvehost_start.append(on_dns_start)
+        trace.on_dns_resolvehost_end.append(on_dns_end)
+        trace.on_connection_create_start.append(on_connect_start)
+        trace.on_connection_create_end.append(on_connect_end)
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+
+def _trace_ctx_factory(trace_request_ctx=None):
+    from types import SimpleNamespace
+    # 未传入 RequestTiming 时（如会话被其他代码使用）用一个临时对象兜底
+    return SimpleNamespace(trace_request_ctx=trace_request_ctx or RequestTiming("", ""))
+
+
+# ---- 同步路径：通过自定义 urllib3 连接类记录 DNS / TCP / TLS 时间 ----
+
+_local = threading.local()
+
+
+def reset_connection_timing():
+    _local.dns = _local.connect = _local.tls = 0.0
+
+
+def connection_timing():
+    """返回当前线程最近一次请求新建连接的 (dns, connect, tls)，复用连接时全为 0"""
+    return getattr(_local, "dns", 0.0), getattr(_local, "connect", 0.0), getattr(_local, "tls", 0.0)
+
+
+class _TimedConnectionMixin:
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            addresses = []  # 交给 urllib3 自己解析并报错
+        resolved = time.perf_counter()
+        _local.dns = resolved - started
+        if not addresses:
+            sock = super()._new_conn()
+        else:
+            # 与 urllib3 一样按解析结果依次尝试，前面的地址连不上时换下一个；
+            # _dns_host 换成 IP 后 urllib3 内部的 getaddrinfo 不再查询 DNS
+            original_host = self._dns_host
+            try:
+                for index, address in enumerate(addresses):
+                    self._dns_host = address[4][0]
+                    try:
+                        sock = super()._new_conn()
+                        break
+                    except (NewConnectionError, ConnectTimeoutError):
+                        if index == len(addresses) - 1:
+                            raise
+            finally:
+                self._dns_host = original_host
+        _local.connect = time.perf_counter() - resolved
+        return sock
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        if isinstance(self, HTTPSConnection):
+            _local.tls = max(0.0, time.perf_counter() - started - _local.dns - _local.connect)
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """新建连接时记录 DNS / TCP / TLS 耗时的 HTTPAdapter"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
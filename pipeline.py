@@ -0,0 +1,184 @@
+import asyncio
+import inspect
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from async_safe_requests import AsyncSafeClient
+from extract import DOUBAN_TOP250, extract
+from sinks import Sink
+
+# 已注册的解析函数：name -> func(url, html) -> list[dict]
+# 函数必须定义在模块顶层，才能被 pickle 传给子进程
+PARSERS = {}
+
+_DONE = object()  # 队列结束标记
+
+
+def register_parser(name):
+    """装饰器：把解析函数注册为流水线的解析阶段"""
+    def decorator(func):
+        PARSERS[name] = func
+        return func
+    return decorator
+
+
+@register_parser("douban_top250")
+def parse_douban_top250(url, html):
+    """豆瓣读书 Top250：提取 div.pl2 a 的书名和链接"""
+    return extract(html, DOUBAN_TOP250)
+
+
+class Pipeline:
+    """
+    抓取 -> 解析 -> 输出 三段式流水线。
+
+    - 抓取：在事件循环中用 AsyncSafeClient 并发请求
+    - 解析：HTML 交给 ProcessPoolExecutor，解析不再受 GIL 限制，可以用满所有 CPU 核
+    - 输出：sink(url, records) 依次处理解析结果，可以是普通函数或协程函数；
+      普通函数在线程池中调用，写文件/SQLite 时不阻塞事件循环里的抓取
+    各阶段之间用有界队列连接，下游处理不过来时上游自动暂停（背压）。
+
+    参数:
+        parser (str or callable): 已注册的解析器名称，或顶层函数 func(url, html)
+        sink (callable): 接收 (url, records) 的输出函数，也可以直接传入 sinks 中的 JsonlSink / CsvSink / SqliteSink
+        fetch_concurrency (int): 并发抓取数，默认 20
+        parse_workers (int, optional): 解析进程数，默认 CPU 核数
+        queue_size (int): 每个队列的容量，默认 100
+        client (AsyncSafeClient, optional): 抓取使用的客户端；传入的客户端由调用方负责关闭
+        fetch_kwargs (dict, optional): 传给 client.get 的其他参数
+        fingerprints (FingerprintStore, optional): 增量模式，内容与上次相同的页面不再解析和输出，
+            见 incremental 模块；新指纹在页面记录交给 sink（Sink 实例则是真正写出）之后才提交
+    """
+
+    def __init__(self, parser, sink,
+                 fetch_concurrency=20,
+                 parse_workers=None,
+                 queue_size=100,
+                 client=None,
+                 fetch_kwargs=None,
+                 fingerprints=None):
+        self.parser = PARSERS[parser] if isinstance(parser, str) else parser
+        self.sink = sink
+        self.fetch_concurrency = fetch_concurrency
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self._owns_client = client is None
+        self.client = client or AsyncSafeClient(limit=fetch_concurrency)
+        self.fetch_kwargs = fetch_kwargs or {}
+        self.fingerprints = fingerprints
+        self.stats = {"fetched": 0, "fetch_errors": 0, "unchanged": 0, "parsed": 0, "parse_errors": 0, "records": 0}
+
+    async def _feed(self, urls, url_queue):
+        for url in urls:
+            await url_queue.put(url)
+        for _ in range(self.fetch_concurrency):
+            await url_queue.put(_DONE)
+
+    async def _fetch(self, url_queue, html_queue):
+        while True:
+            url = await url_queue.get()
+            if url is _DONE:
+                break
+            result = await self.client.get(url, **self.fetch_kwargs)
+            if result["success"]:
+                self.stats["fetched"] += 1
+                change = None
+                if self.fingerprints is not None:
+                    loop = asyncio.get_running_loop()
+                    change = await loop.run_in_executor(None, self.fingerprints.check, url, result["data"])
+                    if not change.changed:
+                        self.stats["unchanged"] += 1
+                        await loop.run_in_executor(None, self.fingerprints.commit, change)
+                        continue
+                    if change.near_duplicates:
+                        print(f"⚠️ {url} 与 {', '.join(change.near_duplicates)} 内容近似重复")
+                await html_queue.put((url, result["data"], change))
+            else:
+                self.stats["fetch_errors"] += 1
+                print(f"❌ 抓取失败 {url}: {result['error']}")
+
+    async def _parse(self, pool, html_queue, record_queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await html_queue.get()
+            if item is _DONE:
+                break
+            url, html, change = item
+            try:
+                records = await loop.run_in_executor(pool, self.parser, url, html)
+            except Exception as e:
+                self.stats["parse_errors"] += 1
+                print(f"❌ 解析失败 {url}: {e}")
+                continue
+            self.stats["parsed"] += 1
+            await record_queue.put((url, records, change))
+
+    async def _sink(self, record_queue):
+        loop = asyncio.get_running_loop()
+        is_async = inspect.iscoroutinefunction(self.sink) or inspect.iscoroutinefunction(
+            getattr(self.sink, "__call__", None))
+        while True:
+            item = await record_queue.get()
+            if item is _DONE:
+                break
+            url, records, change = item
+            self.stats["records"] += len(records)
+            commit = partial(self.fingerprints.commit, change) if change is not None else None
+            if isinstance(self.sink, Sink):
+                # 缓冲的记录真正写出后才提交指纹
+                await loop.run_in_executor(None, partial(self.sink, url, records, on_flushed=commit))
+                continue
+            if is_async:
+                await self.sink(url, records)
+            else:
+                result = await loop.run_in_executor(None, self.sink, url, records)
+                if inspect.isawaitable(result):
+                    await result
+            if commit is not None:
+                await loop.run_in_executor(None, commit)
+
+    async def run(self, urls):
+        """运行流水线直到 urls 全部处理完，返回统计信息"""
+        url_queue = asyncio.Queue(self.queue_size)
+        html_queue = asyncio.Queue(self.queue_size)
+        record_queue = asyncio.Queue(self.queue_size)
+        # 同时解析的页面数与进程数匹配，队列里不会堆积过多待解析的 HTML
+        parse_tasks_count = self.parse_workers * 2
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            feeder = asyncio.create_task(self._feed(urls, url_queue))
+            fetchers = [asyncio.create_task(self._fetch(url_queue, html_queue))
+                        for _ in range(self.fetch_concurrency)]
+            parsers = [asyncio.create_task(self._parse(pool, html_queue, record_queue))
+                       for _ in range(parse_tasks_count)]
+            sink = asyncio.create_task(self._sink(record_queue))
+
+            try:
+                await feeder
+                await asyncio.gather(*fetchers)
+                for _ in parsers:
+                    await html_queue.put(_DONE)
+                await asyncio.gather(*parsers)
+                await record_queue.put(_DONE)
+                await sink
+            finally:
+                for task in [feeder, *fetchers, *parsers, sink]:
+                    task.cancel()
+                if self._owns_client:
+                    await self.client.close()
+        return self.stats
+
+
+def run_pipeline(urls, parser, sink, **kwargs):
+    """同步入口：asyncio.run(Pipeline(parser, sink, **kwargs).run(urls))"""
+    return asyncio.run(Pipeline(parser, sink, **kwargs).run(urls))
+
+
+if __name__ == "__main__":
+    from sinks import JsonlSink
+
+    with JsonlSink("douban_top250.jsonl") as sink:
+        stats = run_pipeline((f"https://book.douban.com/top250?start={i}" for i in range(0, 250, 25)),
+                             "douban_top250", sink, fetch_concurrency=5)
+    print(stats)
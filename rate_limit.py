@@ -0,0 +1,297 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value):
+    """
+    解析 Retry-After 响应头，返回需要等待的秒数。
+
+    支持秒数（"120"）和 HTTP 日期（"Wed, 21 Oct 2015 07:28:00 GMT"）两种格式，
+    无法解析时返回 None。
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return max(0.0, float(value))
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶。
+
+    采用“预约”方式：reserve() 立即扣除一个令牌并返回调用方需要等待的秒数，
+    同步代码用 time.sleep、异步代码用 asyncio.sleep 等待即可，二者共用同一个桶。
+
+    参数:
+        rate (float): 每秒生成的令牌数；math.inf 表示不限速
+        burst (int): 桶容量，即允许的突发请求数，默认 1
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        # 暂停期间 _last 位于将来，此时不累积令牌
+        if now <= self._last:
+            return
+        if self.rate != math.inf:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def set_rate(self, rate):
+        """调整速率（自动限速时使用），已累积的令牌按旧速率结算"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if rate == math.inf:
+                self._tokens = float(self.burst)
+
+    def pause(self, seconds):
+        """
+        在接下来的 seconds 秒内不再发放令牌（用于遵守 Retry-After）。
+
+        暂停结束时桶里至多一个令牌，之后的请求按原速率依次发出，不会在暂停结束的瞬间一起涌出。
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._last = max(self._last, self._blocked_until)
+            self._tokens = min(self._tokens, 1.0)
+
+    def reserve(self):
+        """预约一个令牌，返回需要等待的秒数（0 表示可以立即发送）"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # 令牌从 _last 开始计算，暂停期间 _last 即暂停结束的时刻
+            wait = max(0.0, self._last - now)
+            if self.rate != math.inf:
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait += -self._tokens / self.rate if self.rate > 0 else math.inf
+            return max(wait, self._blocked_until - now)
+
+
+class HostRateLimiter:
+    """
+    按主机划分的令牌桶限速器，可同时传给 SafeClient 和 AsyncSafeClient 共享。
+
+    参数:
+        rate (float): 每个主机每秒允许的请求数，默认 2
+        burst (int): 每个主机允许的突发请求数，默认 1
+        per_host (dict, optional): 单独配置的主机速率，如 {"book.douban.com": 0.5}
+
+    用法:
+        limiter.acquire(host)        # 同步等待
+        await limiter.acquire_async(host)
+        ... 发送请求 ...
+        limiter.release(host, latency, status, retry_after)
+    """
+
+    def __init__(self, rate=2.0, burst=1, per_host=None):
+        self.rate = rate
+        self.burst = burst
+        self.per_host = per_host or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    rate = self.per_host.get(host, self.rate)
+                    bucket = self._buckets[host] = TokenBucket(rate, self.burst)
+        return bucket
+
+    def acquire(self, host):
+        """阻塞直到该主机可以发送下一个请求"""
+        wait = self.bucket(host).reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, host):
+        """acquire() 的异步版本，不阻塞事件循环"""
+        wait = self.bucket(host).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def release(self, host, latency=None, status=None, retry_after=None):
+        """请求结束后调用；遇到 429/503 时遵守 Retry-After"""
+        if status in (429, 503):
+            seconds = parse_retry_after(retry_after)
+            if seconds:
+                self.bucket(host).pause(seconds)
+
+
+class _HostState:
+    __slots__ = ("delay", "concurrency", "active", "bucket", "waiters")
+
+    def __init__(self, delay, concurrency):
+        self.delay = delay
+        self.concurrency = concurrency
+        self.active = 0
+        self.bucket = TokenBucket(1 / delay if delay > 0 else math.inf)
+        self.waiters = deque()  # 等待名额的异步任务 [loop, future, granted]，先到先得
+
+
+def _grant(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AutoThrottle:
+    """
+    自适应限速：根据每个主机的响应延迟和 429/503 情况自动调整请求间隔与并发数。
+
+    - 正常响应：目标间隔 = 延迟 / target_concurrency，与当前间隔取平均；并发数缓慢加一
+    - 429/503：间隔翻倍、并发数减半，并按 Retry-After 暂停该主机
+    接口与 HostRateLimiter 相同，可直接传给 SafeClient / AsyncSafeClient。
+
+    参数:
+        start_delay (float): 初始请求间隔（秒），默认 1
+        min_delay (float): 最小请求间隔（秒），默认 0
+        max_delay (float): 最大请求间隔（秒），默认 60
+        target_concurrency (float): 期望每个主机同时处理的请求数，默认 2
+        max_concurrency (int): 每个主机的并发上限，默认 8
+    """
+
+    def __init__(self,
+                 start_delay=1.0,
+                 min_delay=0.0,
+                 max_delay=60.0,
+                 target_concurrency=2.0,
+                 max_concurrency=8):
+        self.start_delay = start_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.target_concurrency = target_concurrency
+        self.max_concurrency = max_concurrency
+        self._hosts = {}
+        self._cond = threading.Condition()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.start_delay, 1.0)
+        return state
+
+    @staticmethod
+    def _wake(state):
+        """
+        有空闲名额时按排队顺序直接把名额交给等待的异步任务（调用方持有 _cond）。
+
+        名额在这里就记入 active，被唤醒的任务不用再和新来的请求抢；
+        任务可能在另一个线程的事件循环里，所以通过 call_soon_threadsafe 唤醒。
+        """
+        while state.waiters and state.active < int(state.concurrency):
+            waiter = state.waiters.popleft()
+            loop, future, _ = waiter
+            if future.cancelled():
+                continue
+            waiter[2] = True
+            state.active += 1
+            loop.call_soon_threadsafe(_grant, future)
+
+    def _leave(self, host):
+        """归还并发名额但不调整间隔（等待被中断、请求没有发出时使用）"""
+        with self._cond:
+            state = self._state(host)
+            state.active = max(0, state.active - 1)
+            self._wake(state)
+            self._cond.notify_all()
+
+    def acquire(self, host):
+        """阻塞直到该主机有空闲并发名额且满足请求间隔"""
+        with self._cond:
+            state = self._state(host)
+            while state.active >= int(state.concurrency):
+                self._cond.wait()
+            state.active += 1
+        try:
+            wait = state.bucket.reserve()
+            if wait > 0:
+                time.sleep(wait)
+        except BaseException:
+            self._leave(host)
+            raise
+
+    async def acquire_async(self, host):
+        """
+        acquire() 的异步版本，不阻塞事件循环；并发已满时排队等待 release() 交来的名额，先到先得。
+        等待期间被取消会归还已占用的名额。
+        """
+        with self._cond:
+            state = self._state(host)
+            if not state.waiters and state.active < int(state.concurrency):
+                state.active += 1
+                waiter = None
+            else:
+                loop = asyncio.get_running_loop()
+                waiter = [loop, loop.create_future(), False]
+                state.waiters.append(waiter)
+        if waiter is not None:
+            try:
+                await waiter[1]
+            except BaseException:
+                with self._cond:
+                    granted = waiter[2]
+                    if not granted:
+                        state.waiters.remove(waiter)
+                if granted:
+                    self._leave(host)
+                raise
+        try:
+            wait = state.bucket.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._leave(host)
+            raise
+
+    def release(self, host, latency=None, status=None, retry_after=None):
+        """请求结束后调用，根据本次结果调整该主机的间隔和并发数"""
+        with self._cond:
+            state = self._state(host)
+            state.active = max(0, state.active - 1)
+
+            if status in (429, 503):
+                state.delay = min(self.max_delay, max(state.delay * 2, self.start_delay))
+                state.concurrency = max(1.0, state.concurrency / 2)
+                seconds = parse_retry_after(retry_after)
+                if seconds:
+                    state.bucket.pause(seconds)
+            elif status is not None and status < 400 and latency is not None:
+                target = latency / self.target_concurrency
+                state.delay = min(self.max_delay, max(self.min_delay, (state.delay + target) / 2))
+                # 加性增：大约每完成一轮 concurrency 个请求，并发数加一
+                state.concurrency = min(self.max_concurrency, state.concurrency + 1 / state.concurrency)
+
+            state.bucket.set_rate(1 / state.delay if state.delay > 0 else math.inf)
+            self._wake(state)
+            self._cond.notify_all()
+
+    def stats(self):
+        """返回各主机当前的 {host: (delay, concurrency)}，便于观察调整效果"""
+        with self._cond:
+            return {host: (s.delay, int(s.concurrency)) for host, s in self._hosts.items()}
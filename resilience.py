@@ -0,0 +1,147 @@
+import random
+import threading
+import time
+
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+
+def backoff_time(backoff_factor, consecutive_errors, jitter=False):
+    """
+    计算第 consecutive_errors 次连续失败后的等待时间，与 urllib3 Retry 语义一致：
+    第一次重试立即进行，之后依次等待 factor*2、factor*4 ... 秒。
+    jitter=True 时额外加上 [0, backoff_factor) 的随机抖动，避免大量客户端同时重试。
+    """
+    if consecutive_errors <= 1:
+        delay = 0
+    else:
+        delay = backoff_factor * (2 ** (consecutive_errors - 1))
+    if jitter:
+        delay += random.uniform(0, backoff_factor)
+    return delay
+
+
+class CircuitBreaker:
+    """
+    按主机的熔断器。
+
+    - closed：正常放行；连续失败 failure_threshold 次后进入 open
+    - open：直接拒绝请求（快速失败），reset_timeout 秒后进入 half_open
+    - half_open：最多放行 half_open_max 个试探请求，成功则恢复 closed，失败则重新 open
+
+    参数:
+        failure_threshold (int): 触发熔断的连续失败次数，默认 5
+        reset_timeout (float): 熔断持续时间（秒），默认 30
+        half_open_max (int): 半开状态下同时允许的试探请求数，默认 1
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, half_open_max=1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self._hosts = {}  # host -> [state, failures, opened_at, trials]
+        self._lock = threading.Lock()
+
+    def _entry(self, host):
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [self.CLOSED, 0, 0.0, 0]
+        return entry
+
+    def allow(self, host):
+        """是否允许向该主机发送请求"""
+        with self._lock:
+            entry = self._entry(host)
+            if entry[0] == self.CLOSED:
+                return True
+            if entry[0] == self.OPEN:
+                if time.monotonic() - entry[2] < self.reset_timeout:
+                    return False
+                entry[0], entry[3] = self.HALF_OPEN, 0
+            if entry[3] < self.half_open_max:
+                entry[3] += 1
+                return True
+            return False
+
+    def record(self, host, ok):
+        """记录一次请求结果；ok 为 False 表示连接失败、超时或 5xx"""
+        with self._lock:
+            entry = self._entry(host)
+            if ok:
+                entry[0], entry[1], entry[3] = self.CLOSED, 0, 0
+                return
+            entry[1] += 1
+            if entry[0] == self.HALF_OPEN or entry[1] >= self.failure_threshold:
+                entry[0], entry[2], entry[3] = self.OPEN, time.monotonic(), 0
+
+    def cancel(self, host):
+        """请求被取消（如对冲请求落败）时调用：不计成败，只归还半开状态下占用的试探名额"""
+        with self._lock:
+            entry = self._entry(host)
+            if entry[0] == self.HALF_OPEN and entry[3] > 0:
+                entry[3] -= 1
+
+    def state(self, host):
+        with self._lock:
+            return self._entry(host)[0]
+
+
+class RetryBudget:
+    """
+    重试预算：重试次数不超过总请求数的 ratio（默认 10%），防止故障时重试把流量放大数倍。
+
+    每个请求存入 ratio 个令牌，每次重试消耗 1 个；另外每秒补充 min_per_second 个令牌，
+    保证低流量时也能重试。
+
+    参数:
+        ratio (float): 允许的重试比例，默认 0.1
+        min_per_second (float): 每秒保底的重试次数，默认 1
+        max_tokens (float): 令牌上限，默认 100
+    """
+
+    def __init__(self, ratio=0.1, min_per_second=1.0, max_tokens=100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._last) * self.min_per_second)
+        self._last = now
+
+    def deposit(self):
+        """每发出一个新请求调用一次"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self):
+        """申请一次重试，预算不足时返回 False"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class BudgetedRetry(Retry):
+    """受 RetryBudget 约束的 urllib3 Retry：预算用完时不再重试"""
+
+    budget = None
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.budget = self.budget
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        redirect = response is not None and response.get_redirect_location()
+        if self.budget is not None and not redirect and not self.budget.try_spend():
+            raise MaxRetryError(_pool, url, error or ResponseError("重试预算已用完"))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
@@ -1,9 +1,18 @@
+import json
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+
 import requests
-from requests import session
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from requests.structures import CaseInsensitiveDict
 import time
 
+from metrics import RequestTiming, TimedHTTPAdapter, connection_timing, reset_connection_timing
+from resilience import BudgetedRetry
+
 # 定义常量 BROWSER_HEADERS  浏览器请求头
 BROWSER_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36',
@@ -14,12 +23,456 @@ BROWSER_HEADERS = {
     'Upgrade-Insecure-Requests': '1',
 }
 
+
+class ResponseTooLarge(Exception):
+    """流式读取时响应体超过 max_bytes"""
+
+
+def _read_capped(response, max_bytes, chunk_size):
+    """读取完整响应体，超过 max_bytes 时立即中止并返回 None"""
+    buffer = bytearray()
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        buffer += chunk
+        if max_bytes is not None and len(buffer) > max_bytes:
+            response.close()
+            return None
+    return bytes(buffer)
+
+
+def _iter_capped(response, max_bytes, chunk_size):
+    """逐块产出响应体，读完或超限后关闭连接"""
+    received = 0
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            received += len(chunk)
+            if max_bytes is not None and received > max_bytes:
+                raise ResponseTooLarge(f"响应体超过上限（{max_bytes} 字节）")
+            yield chunk
+    finally:
+        response.close()
+
+
+_UNSET = object()
+
+
+class FetchResult:
+    """
+    请求结果。用 __slots__ 减少内存，正文在第一次访问 data 时才解码。
+
+    兼容原来的 dict 写法：result["success"]、result["data"]、result.get("error") 都可以继续使用。
+
+    属性:
+        success (bool): 是否成功
+        response (requests.Response or None): 响应对象（成功且未 release 时）
+        data (str or dict or bytes or iterator or None): 响应文本、JSON 数据、原始字节或字节块迭代器
+        error (str or None): 错误信息（失败时）
+        status (int or None): 状态码
+        headers (dict or None): 响应头
+
+    mode 为 "json" 时，JSON 在第一次访问 success / data / error 时解析，
+    解析失败则 success 为 False、error 为“响应不是有效的 JSON”。
+    """
+    __slots__ = ("_success", "_error", "_response", "_content", "_encoding", "_mode", "_data",
+                 "status", "headers")
+
+    _KEYS = ("success", "response", "data", "error")
+
+    def __init__(self, response=None, error=None, mode="text", data=_UNSET, content=None, encoding=None):
+        self._success = error is None
+        self._error = error
+        self._response = response
+        self._content = content
+        self._encoding = encoding
+        self._mode = mode
+        self._data = None if error is not None else data
+        if response is not None:
+            self.status = getattr(response, "status_code", None) or getattr(response, "status", None)
+            self.headers = response.headers
+        else:
+            self.status = self.headers = None
+
+    @classmethod
+    def failure(cls, error):
+        return cls(error=error)
+
+    def _decode(self):
+        response = self._response
+        if self._content is not None:
+            content = self._content
+        else:
+            content = response.content
+        if self._mode == "raw":
+            data = content
+        elif self._mode == "json":
+            try:
+                if self._content is None:
+                    data = response.json()
+                else:
+                    data = json.loads(content.decode(self._encoding or "utf-8"))
+            except ValueError:
+                self._success = False
+                self._error = '响应不是有效的 JSON'
+                self._response = None
+                data = None
+        elif self._content is None:
+            data = response.text
+        else:
+            data = content.decode(self._encoding or "utf-8", errors="replace")
+        self._data = data
+        if self._response is None:
+            self._content = None  # 已经 release，只保留解码后的结果
+
+    @property
+    def data(self):
+        if self._data is _UNSET:
+            self._decode()
+        return self._data
+
+    @property
+    def success(self):
+        if self._mode == "json" and self._data is _UNSET:
+            self._decode()
+        return self._success
+
+    @property
+    def error(self):
+        if self._mode == "json" and self._data is _UNSET:
+            self._decode()
+        return self._error
+
+    @property
+    def response(self):
+        if self._mode == "json" and self._data is _UNSET:
+            self._decode()
+        return self._response
+
+    def release(self):
+        """丢弃 Response 对象，只保留正文（或已解码的数据），减少长期持有结果时的内存占用"""
+        response = self._response
+        if response is None or self._mode == "stream":
+            return self
+        if self._data is _UNSET and self._content is None:
+            self._content = response.content
+            if self._mode == "text":
+                self._encoding = response.encoding or response.apparent_encoding
+        elif self._data is not _UNSET:
+            self._content = None
+        self._response = None
+        return self
+
+    def copy(self):
+        """浅拷贝：与原结果共享 Response 和正文，各自 release() 互不影响（请求合并时每个调用方一份）"""
+        clone = FetchResult.__new__(FetchResult)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        return clone
+
+    # ---- 兼容 dict 的访问方式 ----
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._KEYS else default
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def keys(self):
+        return self._KEYS
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self._KEYS}
+
+    def __repr__(self):
+        if self.success:
+            return f"<FetchResult success status={self.status}>"
+        return f"<FetchResult error={self.error!r}>"
+
+
+def _build_result(response, return_json, raw=False):
+    """把响应包装成 FetchResult，正文延迟到访问 data 时再解码"""
+    mode = "raw" if raw else "json" if return_json else "text"
+    return FetchResult(response, mode=mode)
+
+
+def _cached_response(entry):
+    """用缓存条目还原出 requests.Response"""
+    response = requests.Response()
+    response.status_code = entry['status']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response._content = entry['body']
+    response.encoding = entry['encoding']
+    response.url = entry['url']
+    return response
+
+
+class SafeClient:
+    """
+    长期存活、可在多线程间共享的请求客户端。
+
+    每种重试配置 (max_retries, backoff_factor) 只创建一个 requests.Session，
+    同一主机的请求复用连接池中的 TCP/TLS 连接（keep-alive），不再每次重新握手。
+
+    参数:
+        pool_connections (int): 缓存的主机连接池数量，默认 10
+        pool_maxsize (int): 每个主机连接池的最大连接数，默认 10（多线程共享时建议不小于线程数）
+        headers (dict, optional): 额外的默认请求头，会覆盖 BROWSER_HEADERS 中的同名字段
+        rate_limiter (HostRateLimiter or AutoThrottle, optional): 按主机限速器，见 rate_limit 模块
+        cache (HttpCache, optional): GET 响应缓存，见 http_cache 模块
+        metrics (Metrics, optional): 记录每个请求的 DNS/建连/TLS/首字节/下载耗时，见 metrics 模块
+        circuit_breaker (CircuitBreaker, optional): 按主机熔断，主机故障时快速失败，见 resilience 模块
+        retry_budget (RetryBudget, optional): 重试预算，限制重试占总请求的比例
+        jitter (bool): 重试退避时间是否加入随机抖动，默认 True
+        hedge_policy (HedgePolicy, optional): 对冲请求策略，request(..., hedge=True) 时生效，见 hedging 模块
+        single_flight (SingleFlight, optional): 合并同时发出的相同请求，见 singleflight 模块
+        coalesce_post (bool): 配置了 single_flight 时，请求体相同的 POST 是否也合并，默认 False
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, headers=None, rate_limiter=None, cache=None,
+                 metrics=None, circuit_breaker=None, retry_budget=None, jitter=True, hedge_policy=None,
+                 single_flight=None, coalesce_post=False):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.headers = {**BROWSER_HEADERS, **(headers or {})}
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.metrics = metrics
+        self.circuit_breaker = circuit_breaker
+        self.retry_budget = retry_budget
+        self.jitter = jitter
+        self.hedge_policy = hedge_policy
+        self.single_flight = single_flight
+        self.coalesce_post = coalesce_post
+        self._hedge_executor = None
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _get_session(self, max_retries, backoff_factor, retry_post=False):
+        """按重试配置取出（或创建）共享的 Session；urllib3 连接池本身是线程安全的"""
+        key = (max_retries, backoff_factor, retry_post)
+        session = self._sessions.get(key)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                # 配置重试策略：对 5xx 和连接错误重试
+                allowed_methods = ["HEAD", "GET", "OPTIONS"]  # 只对幂等方法重试
+                if retry_post:
+                    allowed_methods.append("POST")  # 调用方声明该 POST 是幂等的
+                retry_strategy = BudgetedRetry(
+                    total=max_retries,
+                    backoff_factor=backoff_factor,
+                    backoff_jitter=backoff_factor if self.jitter else 0.0,
+                    status_forcelist=[500, 502, 503, 504],  # 服务器错误时重试
+                    allowed_methods=allowed_methods
+                )
+                retry_strategy.budget = self.retry_budget
+                adapter_class = TimedHTTPAdapter if self.metrics is not None else HTTPAdapter
+                adapter = adapter_class(max_retries=retry_strategy,
+                                        pool_connections=self.pool_connections,
+                                        pool_maxsize=self.pool_maxsize)
+                session = requests.Session()
+                session.headers.update(self.headers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[key] = session
+        return session
+
+    def request(self, method, url, hedge=False, **kwargs):
+        """
+        发送请求并统一处理异常，返回 FetchResult，字段与 safe_get / safe_post 相同。
+
+        关键字参数:
+            headers、timeout、max_retries、backoff_factor、return_json: 含义见 safe_get
+            stream、raw、max_bytes、chunk_size: 流式 / 原始字节模式，含义见 safe_get
+            retry_post: 含义见 safe_post
+            hedge (bool): 配置了 hedge_policy 时，GET/HEAD 请求超过该主机 p95 延迟未返回会发出对冲请求
+            其余参数（data、json、params 等）原样传给 requests
+
+        配置了 cache 时，不带额外参数的非流式 GET 请求会先查缓存；
+        配置了 single_flight 时，同时发出的相同 GET/HEAD（以及 coalesce_post=True 时的相同 POST）只请求一次。
+        """
+        method = method.upper()
+        stream = kwargs.get("stream", False)
+
+        def send():
+            if hedge and self.hedge_policy is not None and method in ("GET", "HEAD") and not stream:
+                # hedging 依赖 asyncio，只在真正使用对冲时才导入，不拖慢 spider fetch 等命令的启动
+                from hedging import hedged_call
+
+                return hedged_call(self._get_hedge_executor(), self.hedge_policy, urlsplit(url).netloc,
+                                   lambda: self._send(method, url, **kwargs))
+            return self._send(method, url, **kwargs)
+
+        flight = self.single_flight
+        if flight is not None and not stream and (method in ("GET", "HEAD") or (method == "POST" and self.coalesce_post)):
+            from singleflight import request_key
+
+            return flight.do(request_key(method, url, kwargs), send)
+        return send()
+
+    def _send(self, method, url,
+              headers=None,
+              timeout=10,
+              max_retries=2,
+              backoff_factor=1,
+              return_json=False,
+              stream=False,
+              raw=False,
+              max_bytes=None,
+              chunk_size=64 * 1024,
+              retry_post=False,
+              **kwargs):
+        cache = self.cache if method == "GET" and not kwargs and not stream else None
+        entry = None
+        if cache is not None:
+            entry = cache.get(url)
+            if entry is not None and (cache.offline or cache.is_fresh(entry)):
+                return _build_result(_cached_response(entry), return_json, raw)
+            if cache.offline:
+                return FetchResult.failure('离线模式下缓存未命中')
+            headers = {**(headers or {}), **cache.conditional_headers(entry)}
+
+        host = urlsplit(url).netloc
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow(host):
+            return FetchResult.failure(f"熔断中：{host} 连续失败，暂停请求")
+        if self.retry_budget is not None:
+            self.retry_budget.deposit()
+        retry_post = retry_post and method == "POST"
+        if retry_post:
+            # 附带幂等键，服务端可据此识别重复提交
+            headers = {'Idempotency-Key': str(uuid.uuid4()), **(headers or {})}
+
+        session = self._get_session(max_retries, backoff_factor, retry_post)
+        limiter = self.rate_limiter
+        if limiter is not None:
+            limiter.acquire(host)
+        if self.metrics is not None:
+            reset_connection_timing()
+        started = time.perf_counter()
+        response = status = retry_after = error_msg = None
+
+        try:
+            chunked = stream or max_bytes is not None
+            response = session.request(method, url, headers=headers, timeout=timeout, stream=chunked, **kwargs)
+            status = response.status_code
+            retry_after = response.headers.get('Retry-After')
+
+            if chunked:
+                too_large = FetchResult.failure(f"响应体超过上限（{max_bytes} 字节）")
+                length = response.headers.get('Content-Length')
+                if max_bytes is not None and length and length.isdigit() and int(length) > max_bytes:
+                    response.close()
+                    return too_large
+                if stream:
+                    return FetchResult(response, mode="stream", data=_iter_capped(response, max_bytes, chunk_size))
+                body = _read_capped(response, max_bytes, chunk_size)
+                if body is None:
+                    return too_large
+                response._content = body
+
+            if cache is not None:
+                if status == 304 and entry is not None:
+                    # 内容未变化，复用缓存正文
+                    cache.refresh(url, entry)
+                    response = _cached_response(entry)
+                elif status == 200:
+                    cache.put(url, status, response.headers, response.content, response.encoding)
+
+            # 如果状态码不是 2xx，仍视为“成功请求”（因为拿到了响应）
+            # 如需严格检查，可调用 response.raise_for_status()
+            return _build_result(response, return_json, raw)
+
+        except requests.exceptions.Timeout:
+            error_msg = f"请求超时（超过 {timeout} 秒）"
+        except requests.exceptions.ConnectionError:
+            error_msg = "网络连接错误（DNS失败、拒绝连接等）"
+        except requests.exceptions.HTTPError as e:
+            error_msg = f"HTTP错误: {e}"
+        except requests.exceptions.TooManyRedirects:
+            error_msg = "重定向次数过多"
+        except requests.exceptions.RequestException as e:
+            error_msg = f"未知请求错误: {e}"
+        except Exception as e:
+            error_msg = f"未预期的错误: {e}"
+        finally:
+            elapsed = time.perf_counter() - started
+            if limiter is not None:
+                limiter.release(host, elapsed, status, retry_after)
+            if self.metrics is not None:
+                self._record_timing(host, method, elapsed, response, error_msg, stream)
+            if breaker is not None:
+                breaker.record(host, error_msg is None and (status is None or status < 500))
+
+        return FetchResult.failure(error_msg)
+
+    def _get_hedge_executor(self):
+        if self._hedge_executor is None:
+            with self._lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=self.pool_maxsize * 2,
+                                                              thread_name_prefix="hedge")
+        return self._hedge_executor
+
+    def _record_timing(self, host, method, total, response, error_msg, stream):
+        timing = RequestTiming(host, method)
+        timing.total = total
+        timing.error = error_msg
+        timing.dns, timing.connect, timing.tls = connection_timing()
+        if response is not None:
+            timing.status = response.status_code
+            # elapsed 是发出请求到解析完响应头的时间（含建连），之后才读取正文
+            headers_at = response.elapsed.total_seconds()
+            timing.ttfb = max(0.0, headers_at - timing.dns - timing.connect - timing.tls)
+            if not stream:
+                timing.download = max(0.0, total - headers_at)
+            raw = response.raw
+            if raw is not None:
+                if getattr(raw, "retries", None) is not None:
+                    timing.retries = len(raw.retries.history)
+                timing.bytes = raw.tell()
+        self.metrics.record(timing)
+
+    def get(self, url, **kwargs):
+        """发送 GET 请求，参数见 request()"""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        """发送 POST 请求，参数见 request()"""
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+    def close(self):
+        """关闭所有 Session，释放连接池"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            if self._hedge_executor is not None:
+                self._hedge_executor.shutdown(wait=False, cancel_futures=True)
+                self._hedge_executor = None
+
+
+# 模块级默认客户端：safe_get / safe_post 共用，脚本无需改动即可复用连接
+default_client = SafeClient()
+
+
 def safe_get(url,
              headers=None,
              timeout=10,
              max_retries=2,
              backoff_factor=1,
-             return_json=False):
+             return_json=False,
+             stream=False,
+             raw=False,
+             max_bytes=None):
     """
     安全地发送 GET 请求，自动处理异常、重试和超时。
 
@@ -30,79 +483,28 @@ def safe_get(url,
         max_retries (int): 失败后最大重试次数，默认 2 次（共尝试 3 次）
         backoff_factor (float): 重试间隔指数退避因子，默认 1 秒
         return_json (bool): 是否尝试返回 JSON 数据（若响应是 JSON）
+        stream (bool): 为 True 时 data 是逐块产出 bytes 的迭代器，适合直接写盘或喂给增量解析器；
+            迭代中超过 max_bytes 会抛出 ResponseTooLarge
+        raw (bool): 为 True 时 data 是未解码的 bytes，省去字符集检测和解码
+        max_bytes (int, optional): 响应体大小上限（字节），超过时尽早中止下载并返回失败
 
     返回:
-        dict: 包含以下字段
+        FetchResult: 支持 dict 式访问，包含以下字段
             - success (bool): 是否成功
             - response (requests.Response or None): 响应对象（成功时）
-            - data (str or dict or None): 响应文本或 JSON 数据
+            - data (str or dict or bytes or iterator or None): 响应文本、JSON 数据、原始字节或字节块迭代器
             - error (str or None): 错误信息（失败时）
     """
+    return default_client.get(url,
+                              headers=headers,
+                              timeout=timeout,
+                              max_retries=max_retries,
+                              backoff_factor=backoff_factor,
+                              return_json=return_json,
+                              stream=stream,
+                              raw=raw,
+                              max_bytes=max_bytes)
 
-    # 默认 User-Agent（模拟 Chrome）
-    default_headers = BROWSER_HEADERS
-    if headers:
-        default_headers.update(headers)
-    headers = default_headers
-
-    # 配置重试策略：对 5xx 和连接错误重试
-    retry_strategy = Retry(
-        total=max_retries,
-        backoff_factor=backoff_factor,
-        status_forcelist=[500, 502, 503, 504],  # 服务器错误时重试
-        allowed_methods=["HEAD", "GET", "OPTIONS"]  # 只对幂等方法重试
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session = requests.Session()
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-
-    try:
-        response = session.get(url, headers=headers, timeout=timeout)
-
-        # 如果状态码不是 2xx，仍视为“成功请求”（因为拿到了响应）
-        # 如需严格检查，可调用 response.raise_for_status()
-
-        data = None
-        if return_json:
-            try:
-                data = response.json()
-            except ValueError:
-                return {
-                    'success': False,
-                    'response': None,
-                    'data': None,
-                    'error': '响应不是有效的 JSON'
-                }
-        else:
-            data = response.text
-
-        return {
-            'success': True,
-            'response': response,
-            'data': data,
-            'error': None
-        }
-
-    except requests.exceptions.Timeout:
-        error_msg = f"请求超时（超过 {timeout} 秒）"
-    except requests.exceptions.ConnectionError:
-        error_msg = "网络连接错误（DNS失败、拒绝连接等）"
-    except requests.exceptions.HTTPError as e:
-        error_msg = f"HTTP错误: {e}"
-    except requests.exceptions.TooManyRedirects:
-        error_msg = "重定向次数过多"
-    except requests.exceptions.RequestException as e:
-        error_msg = f"未知请求错误: {e}"
-    except Exception as e:
-        error_msg = f"未预期的错误: {e}"
-
-    return {
-        'success': False,
-        'response': None,
-        'data': None,
-        'error': error_msg
-    }
 
 def safe_post(  url,
                 data=None,
@@ -111,7 +513,8 @@ def safe_post(  url,
                 timeout=10,
                 max_retries=2,
                 backoff_factor=1,
-                return_json=False):
+                return_json=False,
+                retry_post=False):
     """
         安全地发送 POST 请求，自动处理异常、重试和超时。
 
@@ -122,71 +525,83 @@ def safe_post(  url,
             max_retries (int): 失败后最大重试次数，默认 2 次（共尝试 3 次）
             backoff_factor (float): 重试间隔指数退避因子，默认 1 秒
             return_json (bool): 是否尝试返回 JSON 数据（若响应是 JSON）
+            retry_post (bool): 声明该 POST 是幂等的，允许对 5xx 和读超时重试；
+                会自动附带 Idempotency-Key 请求头。默认 False（POST 不重试）
 
         返回:
-            dict: 包含以下字段
+            FetchResult: 支持 dict 式访问，包含以下字段
                 - success (bool): 是否成功
                 - response (requests.Response or None): 响应对象（成功时）
                 - data (str or dict or None): 响应文本或 JSON 数据
                 - error (str or None): 错误信息（失败时）
     """
-    default_headers = BROWSER_HEADERS
-    if headers :
-        default_headers.update(headers)
-    headers = default_headers
-
-    # 配置重试策略：对 5xx 和连接错误重试
-    retry_strategy = Retry(
-        total=max_retries,
-        backoff_factor=backoff_factor,
-        status_forcelist=[500, 502, 503, 504],  # 服务器错误时重试
-        allowed_methods=["HEAD", "GET", "OPTIONS"]  # 只对幂等方法重试
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy) # 创建适配器
-    session = requests.Session() # 创建会话
-    session.mount("http://", adapter) # 将适配器添加到会话中
-    session.mount("https://", adapter) # 将适配器添加到会话中
+    return default_client.post(url,
+                               data=data,
+                               json=json,
+                               headers=headers,
+                               timeout=timeout,
+                               max_retries=max_retries,
+                               backoff_factor=backoff_factor,
+                               return_json=return_json,
+                               retry_post=retry_post)
 
-    try:
-        response = session.post(url,data=data, json=json,  headers=headers, timeout=timeout)
-        data = None
-        if return_json:
-            try:
-                data = response.json()
-            except ValueError:
-                return {
-                    'success': False,
-                    'response': None,
-                    'data': None,
-                    'error': '响应不是有效的 JSON'
-                }
-        else:
-            data = response.text
 
-        return {
-            'success': True,
-            'response': response,
-            'data': data,
-            'error': None
-        }
-
-    except requests.exceptions.Timeout:
-        error_msg = f"请求超时（超过 {timeout} 秒）"
-    except requests.exceptions.ConnectionError:
-        error_msg = "网络连接错误（DNS失败、拒绝连接等）"
-    except requests.exceptions.HTTPError as e:
-        error_msg = f"HTTP错误: {e}"
-    except requests.exceptions.TooManyRedirects:
-        error_msg = "重定向次数过多"
-    except requests.exceptions.RequestException as e:
-        error_msg = f"未知请求错误: {e}"
-
-    return {
-        'success': False,
-        'response': None,
-        'data': None,
-        'error': error_msg
-    }
+def safe_get_many(urls,
+                  concurrency=8,
+                  preserve_order=False,
+                  client=None,
+                  **kwargs):
+    """
+    用线程池并发抓取一批 URL，以迭代器形式边完成边返回结果。
+
+    同一时间最多只有 concurrency 个请求在途，urls 可以是生成器，
+    不会被一次性读入内存，已完成的结果也只在窗口内暂存。
+
+    参数:
+        urls (iterable): 要抓取的 URL
+        concurrency (int): 并发请求数，默认 8
+        preserve_order (bool): 是否按输入顺序返回；默认 False，按完成顺序返回
+        client (SafeClient, optional): 使用的客户端，默认模块级 default_client
+        **kwargs: 传给 SafeClient.get 的其他参数（timeout、return_json 等）
 
+    返回:
+        iterator: 逐个产出 (url, result)，result 结构与 safe_get 相同
+    """
+    client = client or default_client
+    url_iter = iter(urls)
 
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        def submit_next():
+            url = next(url_iter, None)
+            if url is None:
+                return None
+            return url, executor.submit(client.get, url, **kwargs)
 
+        if preserve_order:
+            window = deque()
+            for _ in range(concurrency):
+                item = submit_next()
+                if item is None:
+                    break
+                window.append(item)
+            while window:
+                url, future = window.popleft()
+                item = submit_next()
+                if item is not None:
+                    window.append(item)
+                yield url, future.result()
+        else:
+            in_flight = {}
+            for _ in range(concurrency):
+                item = submit_next()
+                if item is None:
+                    break
+                in_flight[item[1]] = item[0]
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = in_flight.pop(future)
+                    item = submit_next()
+                    if item is not None:
+                        in_flight[item[1]] = item[0]
+                    yield url, future.result()
@@ -1,20 +1,41 @@
-import requests
-from bs4 import BeautifulSoup
-from safe_requests import safe_get, BROWSER_HEADERS
+from functools import partial
 
-for star_num in range(0, 250, 25):
-    response = safe_get(f"https://book.douban.com/top250?start={star_num}")
-    if response["success"]:
-        soup = BeautifulSoup(response["data"], "html.parser")
-        # 使用 CSS 选择器：class 为 pl2 的 div 下的 a 标签
-        a_tags = soup.select('div.pl2 a')
-        book_names = []
-        for a_tag in a_tags:
-            book_name = a_tag.get_text(strip=True)
-            book_names.append(book_name)
-        for book_name in book_names:
-            print(book_name)
-    else:
-        print("请求失败:", response["error"])
+from extract import DOUBAN_TOP250, extract
+from incremental import FingerprintStore
+from safe_requests import safe_get_many
+from sinks import open_sink
 
+TOP250_URLS = [f"https://book.douban.com/top250?start={star_num}" for star_num in range(0, 250, 25)]
 
+
+def scrape_douban_top250(output="douban_top250.jsonl", fingerprints="douban_fingerprints.db", concurrency=5):
+    """
+    抓取豆瓣读书 Top250 的书名和链接，批量写入 output（.jsonl / .csv / .db）。
+
+    fingerprints 为增量模式的指纹库，与上次抓取内容相同的页面不再解析和写出；None 表示每次全量。
+    返回 {"written": 写出的记录数, "unchanged": 未变化的页面数, "files": 输出文件}
+    """
+    store = FingerprintStore(fingerprints) if fingerprints else None
+    # 并发抓取，按页码顺序返回；第一页到达后即可开始解析
+    results = safe_get_many(TOP250_URLS, concurrency=concurrency, preserve_order=True)
+    results = store.changed(results) if store is not None else ((url, r, None) for url, r in results)
+    try:
+        with open_sink(output) as sink:
+            for url, response, change in results:
+                if response["success"]:
+                    # 使用 CSS 选择器：class 为 pl2 的 div 下的 a 标签（有 lxml 时走 lxml，否则回退 BeautifulSoup）
+                    records = extract(response["data"], DOUBAN_TOP250)
+                    # 新指纹等这一页的记录写出后再保存，中途失败时下次会重新抓取解析
+                    sink.write_many(records, on_flushed=partial(store.commit, change) if change else None)
+                else:
+                    print("请求失败:", response["error"])
+    finally:
+        if store is not None:
+            store.close()
+    files = [str(f) for f in getattr(sink, "files", [sink.path])]
+    return {"written": sink.written, "unchanged": store.stats["unchanged"] if store else 0, "files": files}
+
+
+if __name__ == "__main__":
+    stats = scrape_douban_top250()
+    print(f"已保存 {stats['written']} 本书: {', '.join(stats['files'])}，未变化的页面 {stats['unchanged']} 个")
@@ -1,29 +1,29 @@
-import requests
+def translate_text(text, memo="translate_memo.db"):
+    """
+    翻译一段文字，返回搜狗的翻译建议 [{"k": ..., "v": ...}, ...]，请求失败时返回 None。
+    翻译过的词条缓存在 memo 中，重复输入不再请求；批量翻译文件请用 translate 模块。
+    """
+    from translate import TranslationMemo, Translator
 
-from safe_requests import safe_post
+    translator = Translator(memo=TranslationMemo(memo))
+    try:
+        return translator.translate(text)
+    finally:
+        translator.close()
 
-url_sougouTranslate = "https://fanyi.sogou.com/reventondc/suggV3"
-s = input("请输入要翻译的文字：")
-data ={
-    "text": s,
-    "from": "auto",
-    "to": "zh-CHS",
-    "client": "web",
-    "uuid": "d965db3d-3c40-436e-95b7-b8d2283b28c3",
-    "pid":"sogou-dict-vr",
-    "addSugg":"on"
-}
 
-res_sougouTranslate = safe_post(url_sougouTranslate, data=data, return_json=True)
-
-if res_sougouTranslate['success']:
-    result = res_sougouTranslate['data']
-    if 'sugg' in result:
-        sugg_list = result['sugg']
+def main():
+    s = input("请输入要翻译的文字：")
+    sugg_list = translate_text(s)
+    if sugg_list is None:
+        print("请求失败")
+    elif sugg_list:
         print("翻译建议：")
         for item in sugg_list:
             print(f"{item['k']}: {item['v']}")
     else:
         print("响应中没有 'sugg' 字段")
-else:
-    print("请求失败:", res_sougouTranslate['error'])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from urllib.parse import quote
+
+from extract import BAIDU_RESULTS, extract_dom
+from webdriver_pool import WebDriverPool
+
+SEARCH_URL = "https://www.baidu.com/s?wd={query}&pn={offset}"
+
+
+def search_page_urls(query, pages=5, base_url=SEARCH_URL):
+    """直接构造每一页的地址（百度每页 10 条，pn 为偏移量），不必在一个浏览器里逐页点“下一页”"""
+    return [base_url.format(query=quote(query), offset=10 * page) for page in range(pages)]
+
+
+def scrape_results_page(driver, url, timeout=10):
+    """打开一页搜索结果，等结果出现后一次性提取标题和链接"""
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get(url)
+    try:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, BAIDU_RESULTS["item"])))
+    except TimeoutException:
+        print(f"⚠️ 结果加载超时: {url}")
+        return []
+    return extract_dom(driver, BAIDU_RESULTS)
+
+
+def search(query, pages=5, pool=None, base_url=SEARCH_URL):
+    """
+    搜索 query 的前 pages 页，各页分发到 WebDriver 池中并发抓取。
+
+    返回按页序去重后的 [{"title": ..., "link": ...}, ...]。
+    """
+    own_pool = pool is None
+    pool = pool or WebDriverPool(size=min(pages, 4))
+    try:
+        results = pool.map(scrape_results_page, search_page_urls(query, pages, base_url))
+    finally:
+        if own_pool:
+            pool.close()
+
+    seen = set()
+    records = []
+    for page_records in results:
+        for record in page_records:
+            if record["title"] and record["title"] not in seen:
+                seen.add(record["title"])
+                records.append(record)
+    return records
+
+
+if __name__ == "__main__":
+    import os
+
+    records = search("Selenium 爬虫", pages=5)
+    print("✅ 总计获取到", len(records), "个标题")
+    print("-" * 50)
+    for record in records:
+        print(f"标题: {record['title']}")
+        print(f"链接: {record['link']}")
+
+    # === AI 总结（设置了 DASHSCOPE_API_KEY 时）===
+    if records and os.getenv("DASHSCOPE_API_KEY"):
+        from summarize import DashScopeBackend, Summarizer
+
+        print("\n🧠 正在调用 AI 进行总结...")
+        summary = Summarizer(DashScopeBackend(), topic="Selenium 爬虫").summarize(r["title"] for r in records)
+        print("\n✅ AI 总结结果：")
+        print(summary)
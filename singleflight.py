@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import json
+import threading
+
+
+def request_key(method, url, kwargs):
+    """
+    由请求方法、URL 和其余参数（请求体、请求头、返回模式等）生成合并键。
+    请求体以哈希参与比较，参数完全相同的请求才会合并。
+    """
+    digest = hashlib.sha1(json.dumps(kwargs, sort_keys=True, default=repr).encode("utf-8")).hexdigest()
+    return method.upper(), url, digest
+
+
+def _share(result):
+    # 每个调用方拿到一份浅拷贝，FetchResult 的拷贝共享 Response 和正文，
+    # 某个调用方 release() 只清空自己那份，不会影响其他调用方
+    copy = getattr(result, "copy", None)
+    return copy() if copy is not None else result
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    线程版请求合并：同一时刻对同一个键的多次调用只真正执行一次，其余调用等待并共享结果。
+    每个调用方（包括真正执行的那个）得到结果的浅拷贝 result.copy()，没有 copy 方法的结果原样返回。
+
+    用法:
+        flight = SingleFlight()
+        result = flight.do(key, lambda: client.get(url))
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return _share(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return _share(call.result)
+
+    def in_flight(self):
+        """当前正在执行的请求数"""
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    asyncio 版请求合并：第一个调用创建任务，之后的相同调用等待同一个任务。
+    单个调用方被取消不会影响其他等待者（任务本身用 shield 保护）。
+    与 SingleFlight 一样，每个调用方得到结果的浅拷贝。
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def do(self, key, make_coro):
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(make_coro())
+            task.add_done_callback(lambda done: self._tasks.pop(key) if self._tasks.get(key) is done else None)
+        return _share(await asyncio.shield(task))
+
+    def in_flight(self):
+        return len(self._tasks)
@@ -0,0 +1,270 @@
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# 压缩方式 -> (打开函数, 文件后缀)
+COMPRESSORS = {
+    "gzip": (gzip.open, ".gz"),
+    "bz2": (bz2.open, ".bz2"),
+    "xz": (lzma.open, ".xz"),
+}
+
+
+def _scalar(value):
+    """dict / list 等嵌套值以 JSON 文本保存，便于 CSV 和 SQLite 列直接存放"""
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+
+
+class Sink:
+    """
+    带缓冲的记录输出基类：记录先放在内存里，攒够 batch_size 条或距上次写入超过 flush_interval 秒时批量写出。
+
+    子类只需实现 _write_batch(records) 和 _close()。
+    实例可以直接作为 Pipeline 的 sink 使用：sink(url, records)。
+    write / write_many 的 on_flushed 回调在这些记录真正写出后才调用（如提交增量抓取的指纹）。
+
+    参数:
+        batch_size (int): 每批写出的记录数，默认 1000
+        flush_interval (float or None): 最长缓冲时间（秒），默认 5；后台线程定时检查，
+            没有新记录时也会按时写出。None 表示只按条数写出
+    """
+
+    def __init__(self, batch_size=1000, flush_interval=5.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._buffer = []
+        self._callbacks = []  # 等待本批写出后调用的 on_flushed
+        self._lock = threading.RLock()
+        self._last_flush = time.monotonic()
+        self._closed = False
+        self._stop = None
+        if flush_interval:
+            self._stop = threading.Event()
+            threading.Thread(target=self._flush_periodically, daemon=True).start()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def write(self, record, on_flushed=None):
+        """写入一条记录（dict）；on_flushed() 在它写出后调用"""
+        self.write_many([record], on_flushed)
+
+    def write_many(self, records, on_flushed=None):
+        with self._lock:
+            self._buffer.extend(records)
+            if on_flushed is not None:
+                self._callbacks.append(on_flushed)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def __call__(self, url, records, on_flushed=None):
+        self.write_many(records, on_flushed)
+
+    def flush(self):
+        """立即写出缓冲区中的所有记录，然后调用这些记录的 on_flushed"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if (not self._buffer and not self._callbacks) or self._closed:
+                return
+            batch, self._buffer = self._buffer, []
+            callbacks, self._callbacks = self._callbacks, []
+            if batch:
+                self._write_batch(batch)
+                self.written += len(batch)
+            for callback in callbacks:
+                callback()
+
+    def close(self):
+        if self._stop is not None:
+            self._stop.set()
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self._closed = True
+            self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_batch(self, records):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class _FileSink(Sink):
+    """
+    文本文件输出的公共部分：可选压缩，可按大小轮转。
+
+    轮转时依次写入 name-00001.jsonl、name-00002.jsonl ...；rotate_bytes 按写入的未压缩字节数计算。
+    """
+
+    def __init__(self, path, compress=None, rotate_bytes=None, **kwargs):
+        if compress is not None and compress not in COMPRESSORS:
+            raise ValueError(f"不支持的压缩方式: {compress}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.compress = compress
+        self.rotate_bytes = rotate_bytes
+        self.files = []
+        self._file = None
+        self._part = 0
+        self._bytes = 0
+        super().__init__(**kwargs)
+
+    def _next_path(self):
+        path = self.path
+        if self.rotate_bytes:
+            self._part += 1
+            path = path.with_name(f"{path.stem}-{self._part:05d}{path.suffix}")
+        if self.compress:
+            path = path.with_name(path.name + COMPRESSORS[self.compress][1])
+        return path
+
+    def _open(self):
+        path = self._next_path()
+        is_new = not path.exists() or path.stat().st_size == 0
+        if self.compress:
+            opener = COMPRESSORS[self.compress][0]
+            self._file = opener(path, "at", encoding="utf-8", newline="")
+        else:
+            self._file = open(path, "a", encoding="utf-8", newline="", buffering=1024 * 1024)
+        self._bytes = 0
+        self.files.append(path)
+        self._on_open(is_new)
+
+    def _on_open(self, is_new):
+        pass
+
+    def _write_batch(self, records):
+        if self._file is None:
+            self._open()
+        text = self._format(records)
+        self._file.write(text)
+        self._file.flush()
+        self._bytes += len(text.encode("utf-8"))
+        if self.rotate_bytes and self._bytes >= self.rotate_bytes:
+            self._file.close()
+            self._file = None
+
+    def _format(self, records):
+        raise NotImplementedError
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JsonlSink(_FileSink):
+    """
+    每行一个 JSON 对象的输出文件。
+
+    参数:
+        path (str or Path): 输出文件，如 items.jsonl
+        compress (str, optional): "gzip"、"bz2" 或 "xz"，文件名自动加后缀
+        rotate_bytes (int, optional): 单个文件的最大（未压缩）字节数，超过后换新文件
+        batch_size, flush_interval: 见 Sink
+    """
+
+    def _format(self, records):
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+class CsvSink(_FileSink):
+    """
+    CSV 输出，参数同 JsonlSink；fields 为列名，默认取第一条记录的键。新文件（包括轮转出的文件）会写表头，
+    dict / list 类型的值以 JSON 文本保存。
+    """
+
+    def __init__(self, path, fields=None, **kwargs):
+        self.fields = list(fields) if fields else None
+        self._needs_header = False
+        super().__init__(path, **kwargs)
+
+    def _on_open(self, is_new):
+        self._needs_header = is_new
+
+    def _format(self, records):
+        if self.fields is None:
+            self.fields = list(records[0])
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.fields, extrasaction="ignore")
+        if self._needs_header:
+            writer.writeheader()
+            self._needs_header = False
+        writer.writerows({name: _scalar(value) for name, value in record.items()} for record in records)
+        return buffer.getvalue()
+
+
+class SqliteSink(Sink):
+    """
+    SQLite 输出：每批记录在一个事务中用 executemany 写入。
+
+    表不存在时按 fields（默认取第一条记录的键）建表；dict / list 类型的值以 JSON 文本保存。
+
+    参数:
+        path (str or Path): 数据库文件
+        table (str): 表名，默认 items
+        fields (list, optional): 列名
+        batch_size, flush_interval: 见 Sink
+    """
+
+    def __init__(self, path, table="items", fields=None, **kwargs):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self.fields = list(fields) if fields else None
+        # 后台定时写出在另一个线程，写入本身由 Sink 的锁串行化
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._insert = None
+        super().__init__(**kwargs)
+
+    def _prepare(self, record):
+        if self.fields is None:
+            self.fields = list(record)
+        columns = ", ".join(f'"{name}"' for name in self.fields)
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({columns})')
+        self._insert = f'INSERT INTO "{self.table}" ({columns}) VALUES ({", ".join("?" * len(self.fields))})'
+
+    def _write_batch(self, records):
+        if self._insert is None:
+            self._prepare(records[0])
+        rows = [tuple(_scalar(record.get(name)) for name in self.fields) for record in records]
+        with self._conn:
+            self._conn.executemany(self._insert, rows)
+
+    def _close(self):
+        self._conn.close()
+
+
+def open_sink(path, **kwargs):
+    """
+    按扩展名选择输出：.jsonl / .json -> JsonlSink，.csv -> CsvSink，.db / .sqlite / .sqlite3 -> SqliteSink。
+    kwargs 传给对应的类。
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jsonl", ".json"):
+        return JsonlSink(path, **kwargs)
+    if suffix == ".csv":
+        return CsvSink(path, **kwargs)
+    if suffix in (".db", ".sqlite", ".sqlite3"):
+        return SqliteSink(path, **kwargs)
+    raise ValueError(f"无法根据扩展名确定输出格式: {path}")
@@ -0,0 +1,131 @@
+import argparse
+import sys
+
+# 顶层只导入 argparse / sys：每个子命令在执行时才导入自己的依赖（requests、lxml、selenium、dashscope ...），
+# 这样 spider.py --help 和短任务不必为用不到的模块付出导入时间（python bench_startup.py 可测量）
+
+BENCHES = {
+    "http": "bench_http",
+    "extract": "bench_extract",
+    "dom": "bench_dom_extract",
+    "startup": "bench_startup",
+}
+
+
+def cmd_douban(args):
+    from scrape_doubanread import scrape_douban_top250
+
+    summary = scrape_douban_top250(output=args.output,
+                                   fingerprints=None if args.no_incremental else args.fingerprints,
+                                   concurrency=args.concurrency)
+    print(f"✅ 写出 {summary['written']} 条记录，{summary['unchanged']} 页未变化，输出: {', '.join(summary['files'])}")
+
+
+def cmd_translate(args):
+    import translate
+
+    translate.main(args.args)
+
+
+def cmd_baidu_search(args):
+    from selenium_baiduSearch import search
+
+    records = search(args.query, pages=args.pages)
+    if args.output:
+        from sinks import open_sink
+
+        with open_sink(args.output) as sink:
+            sink.write_many(records)
+        print(f"✅ {len(records)} 条结果已写入 {args.output}")
+    else:
+        for record in records:
+            print(f"标题: {record['title']}")
+            print(f"链接: {record['link']}")
+        print("✅ 总计获取到", len(records), "个标题")
+
+    if args.summarize and records:
+        from summarize import DashScopeBackend, Summarizer
+
+        print("\n🧠 正在调用 AI 进行总结...")
+        print(Summarizer(DashScopeBackend(), topic=args.query).summarize(r["title"] for r in records))
+
+
+def cmd_fetch(args):
+    from safe_requests import safe_get_many
+
+    results = safe_get_many(args.urls, concurrency=args.concurrency, preserve_order=True, timeout=args.timeout)
+    if len(args.urls) == 1 and not args.output:
+        url, result = next(results)
+        if not result["success"]:
+            print("❌ 请求失败:", result["error"], file=sys.stderr)
+            return 1
+        print(result["data"])
+        return 0
+
+    from sinks import open_sink
+
+    failed = 0
+    with open_sink(args.output or "fetch.jsonl") as sink:
+        for url, result in results:
+            failed += not result["success"]
+            sink.write({"url": url, "status": result.status, "error": result["error"],
+                        "length": len(result["data"]) if result["success"] else 0})
+    print(f"✅ {len(args.urls) - failed} 个成功，{failed} 个失败，结果已写入 {args.output or 'fetch.jsonl'}")
+    return 1 if failed else 0
+
+
+def cmd_bench(args):
+    import importlib
+
+    importlib.import_module(BENCHES[args.name]).main(args.args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="spider", description="practice-spider 统一入口")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("douban", help="抓取豆瓣读书 Top250")
+    p.add_argument("-o", "--output", default="douban_top250.jsonl", help="输出文件（.jsonl / .csv / .db）")
+    p.add_argument("--fingerprints", default="douban_fingerprints.db", help="增量模式的指纹库")
+    p.add_argument("--no-incremental", action="store_true", help="全量抓取，不跳过未变化的页面")
+    p.add_argument("--concurrency", type=int, default=5)
+    p.set_defaults(func=cmd_douban)
+
+    # 其余参数（包括 -h）都原样交给 translate.main 解析
+    p = sub.add_parser("translate", help="批量翻译（搜狗 suggV3），参数同 translate.py", add_help=False)
+    p.set_defaults(func=cmd_translate, passthrough=True)
+
+    p = sub.add_parser("baidu-search", help="用 WebDriver 池抓取百度搜索结果")
+    p.add_argument("query")
+    p.add_argument("--pages", type=int, default=5)
+    p.add_argument("-o", "--output", default=None, help="输出文件（.jsonl / .csv / .db），默认打印")
+    p.add_argument("--summarize", action="store_true", help="用 DashScope 总结标题（需要 DASHSCOPE_API_KEY）")
+    p.set_defaults(func=cmd_baidu_search)
+
+    p = sub.add_parser("fetch", help="通过 safe_get_many 抓取 URL")
+    p.add_argument("urls", nargs="+")
+    p.add_argument("-o", "--output", default=None,
+                   help="写出 url/status/error/length 记录；只有一个 URL 且未指定时直接打印正文")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--timeout", type=float, default=10)
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser("bench", help="运行基准测试，其余参数原样传给对应脚本")
+    p.add_argument("name", choices=sorted(BENCHES))
+    p.add_argument("args", nargs=argparse.REMAINDER)
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if getattr(args, "passthrough", False):
+        args.args = extra
+    elif extra:
+        parser.error(f"无法识别的参数: {' '.join(extra)}")
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import random
+import threading
+
+from aiohttp import web
+
+
+class StandInServer:
+    """
+    本地 HTTP 替身服务器，用来代替 httpbin / 豆瓣 / 搜狗做可重复的测试和基准测试。
+
+    服务器在后台线程的独立事件循环中运行，同步和异步客户端都可以访问。
+    所有路径都返回同样的响应，以下参数也可以用查询字符串按请求覆盖，
+    如 /page?latency=0.2&error_rate=0.5&size=4096。
+    例外：路径以 /suggV3 结尾时模拟搜狗翻译建议接口，返回 {"sugg": [{"k": text, "v": ...}]}。
+
+    参数:
+        latency (float): 基础响应延迟（秒），默认 0
+        jitter (float): 延迟的随机抖动幅度（秒），默认 0
+        error_rate (float): 返回 503 的概率，默认 0
+        payload_size (int): 响应体大小（字节），默认 1024
+        retry_after (float, optional): 返回 503 时附带的 Retry-After 秒数
+        seed (int, optional): 随机种子，便于复现
+        host (str): 监听地址，默认 127.0.0.1
+        port (int): 监听端口，默认 0（随机可用端口）
+    """
+
+    def __init__(self,
+                 latency=0.0,
+                 jitter=0.0,
+                 error_rate=0.0,
+                 payload_size=1024,
+                 retry_after=None,
+                 seed=None,
+                 host="127.0.0.1",
+                 port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.payload_size = payload_size
+        self.retry_after = retry_after
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.peers = set()  # 客户端连接的 (地址, 端口)，len(peers) 即建立过的连接数，可用来检查 keep-alive
+        self._random = random.Random(seed)
+        self._payloads = {}
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _payload(self, size):
+        payload = self._payloads.get(size)
+        if payload is None:
+            unit = b"<p>stand-in payload</p>\n"
+            payload = self._payloads[size] = (unit * (size // len(unit) + 1))[:size]
+        return payload
+
+    async def _handle(self, request):
+        self.requests += 1
+        self.peers.add(request.transport.get_extra_info("peername") if request.transport else None)
+        query = request.query
+        latency = float(query.get("latency", self.latency))
+        jitter = float(query.get("jitter", self.jitter))
+        error_rate = float(query.get("error_rate", self.error_rate))
+        size = int(query.get("size", self.payload_size))
+        retry_after = query.get("retry_after", self.retry_after)
+
+        form = await request.post() if request.can_read_body else {}
+        delay = max(0.0, latency + self._random.uniform(-jitter, jitter))
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self._random.random() < error_rate:
+            headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+            return web.Response(status=503, text="service unavailable", headers=headers)
+        if request.path.endswith("/suggV3"):
+            text = form.get("text", "")
+            return web.json_response({"sugg": [{"k": text, "v": f"{text} 的译文（{form.get('to', '')}）"}]})
+        if "json" in query:
+            return web.json_response({"path": request.path, "size": size})
+        return web.Response(body=self._payload(size), content_type="text/html", charset="utf-8")
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    def start(self):
+        """在后台线程启动服务器，返回 base_url"""
+        self._loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.base_url
+
+    def stop(self):
+        """停止服务器并结束后台线程"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地 HTTP 替身服务器")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-size", type=int, default=1024)
+    parser.add_argument("--retry-after", type=float, default=None)
+    args = parser.parse_args()
+
+    server = StandInServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           payload_size=args.payload_size, retry_after=args.retry_after, port=args.port)
+    print("替身服务器已启动:", server.start())
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,176 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+MAP_PROMPT = (
+    "以下是关于“{topic}”的一些搜索结果标题，请用中文总结这些标题反映的核心内容、常见问题或技术趋势，"
+    "要求简洁、有条理，不超过{limit}字：\n\n{items}"
+)
+REDUCE_PROMPT = (
+    "以下是对关于“{topic}”的搜索结果标题分批总结得到的要点，请合并成一份总结，"
+    "去掉重复内容，要求简洁、有条理，不超过{limit}字：\n\n{items}"
+)
+
+_CJK = re.compile(r"[\u3000-\u303f\u3400-\u9fff\uf900-\ufaff\uff00-\uffef]")
+
+
+def estimate_tokens(text):
+    """粗略估算 token 数：中日韩字符和全角标点按 1 个计，其余字符按 4 个 1 token 计"""
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def chunk_items(items, max_tokens):
+    """把条目按顺序装进若干块，每块的估算 token 数不超过 max_tokens（单个超长条目独占一块）"""
+    chunks, current, used = [], [], 0
+    for item in items:
+        cost = estimate_tokens(item) + 2  # "- " 前缀和换行
+        if current and used + cost > max_tokens:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class DashScopeBackend:
+    """
+    阿里云 DashScope（通义千问）后端。
+
+    参数:
+        model (str): 模型名，默认 qwen-max（也可以用 qwen-plus、qwen-turbo）
+        api_key (str, optional): 默认读取环境变量 DASHSCOPE_API_KEY
+    """
+
+    def __init__(self, model="qwen-max", api_key=None):
+        import dashscope
+
+        self.model = model
+        self.name = f"dashscope:{model}"
+        api_key = api_key or os.getenv("DASHSCOPE_API_KEY")
+        if api_key:
+            dashscope.api_key = api_key
+
+    def __call__(self, prompt):
+        from dashscope import Generation
+
+        response = Generation.call(model=self.model, prompt=prompt)
+        if response.status_code != 200:
+            raise RuntimeError(f"AI 调用失败: {response}")
+        return response.output.text.strip()
+
+
+class FakeBackend:
+    """
+    本地假后端，测试时代替 DashScope：不联网，返回由输入决定的固定文本，并记录调用次数。
+
+    参数:
+        latency (float): 每次调用模拟的耗时（秒），默认 0
+    """
+
+    name = "fake"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        lines = [line[2:] for line in prompt.splitlines() if line.startswith("- ")]
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"要点 {digest}：共 {len(lines)} 条，首条为 {lines[0] if lines else ''}"
+
+
+class Summarizer:
+    """
+    分块 + 并发 + 缓存的标题总结。
+
+    - 标题去重后按 token 预算分块，各块并发调用模型得到分块总结（map）
+    - 分块总结再合并为一份（reduce）；合并内容仍超出预算时继续分块合并
+    - 每次调用的结果按 (后端名, 提示词) 的哈希缓存到磁盘，相同输入不再重复付费
+
+    参数:
+        backend (callable): 模型后端，backend(prompt) -> str，如 DashScopeBackend() 或 FakeBackend()
+        topic (str): 标题的主题，写入提示词，默认 "Selenium 爬虫"
+        max_tokens (int): 每次调用中条目部分的 token 预算，默认 2000
+        concurrency (int): 同时调用模型的次数，默认 4
+        limit (int): 要求的总结字数上限，默认 150
+        cache_dir (str or Path, optional): 缓存目录，默认 .summary_cache；None 表示不缓存
+    """
+
+    def __init__(self, backend, topic="Selenium 爬虫", max_tokens=2000, concurrency=4, limit=150,
+                 cache_dir=".summary_cache"):
+        self.backend = backend
+        self.topic = topic
+        self.max_tokens = max_tokens
+        self.concurrency = concurrency
+        self.limit = limit
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.stats = {"calls": 0, "cache_hits": 0}
+        self._lock = threading.Lock()
+
+    def _complete(self, prompt):
+        name = getattr(self.backend, "name", type(self.backend).__name__)
+        key = hashlib.sha256(f"{name}\n{prompt}".encode("utf-8")).hexdigest()
+        path = self.cache_dir / f"{key}.txt" if self.cache_dir is not None else None
+        if path is not None and path.exists():
+            with self._lock:
+                self.stats["cache_hits"] += 1
+            return path.read_text(encoding="utf-8")
+
+        text = self.backend(prompt)
+        with self._lock:
+            self.stats["calls"] += 1
+        if path is not None:
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        return text
+
+    def _prompt(self, template, items):
+        return template.format(topic=self.topic, limit=self.limit, items="\n".join(f"- {item}" for item in items))
+
+    def _map(self, template, chunks):
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            return list(executor.map(lambda chunk: self._complete(self._prompt(template, chunk)), chunks))
+
+    def summarize(self, titles):
+        """总结一组标题，返回总结文本；没有标题时返回空字符串"""
+        titles = list(dict.fromkeys(t.strip() for t in titles if t and t.strip()))
+        if not titles:
+            return ""
+        chunks = chunk_items(titles, self.max_tokens)
+        summaries = self._map(MAP_PROMPT, chunks)
+        while len(summaries) > 1:
+            chunks = chunk_items(summaries, self.max_tokens)
+            if len(chunks) == len(summaries) and len(chunks) > 1:
+                # 每条总结都独占一块时两两合并，保证逐轮收敛
+                chunks = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+            summaries = self._map(REDUCE_PROMPT, chunks)
+        return summaries[0]
+
+
+if __name__ == "__main__":
+    # 用假后端演示：500 个标题分块并发总结，第二次运行全部命中缓存
+    import tempfile
+
+    titles = [f"Selenium 爬虫实战第 {i} 篇：如何处理动态加载和反爬" for i in range(500)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for round_ in (1, 2):
+            backend = FakeBackend(latency=0.2)
+            summarizer = Summarizer(backend, max_tokens=1000, cache_dir=tmp)
+            started = time.perf_counter()
+            summary = summarizer.summarize(titles)
+            print(f"第 {round_} 次: {time.perf_counter() - started:.2f} 秒, {summarizer.stats}, 结果: {summary}")
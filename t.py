@@ -1,109 +1,125 @@
 import os
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from extract import BAIDU_RESULTS, extract_dom
 
-import dashscope  # 阿里云SDK
-from dashscope import Generation
-
-# 阿里云 API 密钥
-dashscope_api_key = os.getenv("DASHSCOPE_API_KEY")  # 获取阿里云 API 密钥（环境变量形式）
 
 # 阿里云 QWEN 模型
 def summarize_with_qwen(titles):
-    prompt = (
-        "以下是关于“Selenium 爬虫”的一些搜索结果标题，请用中文总结这些标题反映的核心内容、常见问题或技术趋势，"
-        "要求简洁、有条理，不超过150字：\n\n" + "\n".join(f"- {title}" for title in titles)
-    )
+    # 标题按 token 预算分块并发总结后再合并，结果按内容哈希缓存在 .summary_cache 中
+    # dashscope 只在真正总结时才导入，API 密钥从环境变量 DASHSCOPE_API_KEY 读取
+    if not os.getenv("DASHSCOPE_API_KEY"):
+        raise EnvironmentError("请设置环境变量 DASHSCOPE_API_KEY")
+    from summarize import DashScopeBackend, Summarizer
 
     try:
-        response = Generation.call(
-            model="qwen-max",  # 也可以用 qwen-plus、qwen-turbo
-            prompt=prompt
-        )
-        if response.status_code == 200:
-            return response.output.text.strip()
-        else:
-            print("❌ AI 调用失败:", response)
-            return "AI 总结失败"
+        return Summarizer(DashScopeBackend(model="qwen-max"), topic="Selenium 爬虫").summarize(titles)
     except Exception as e:
         print("❌ 调用异常:", e)
         return "AI 调用异常"
 
-# === 配置 Chrome 选项 ===
-chrome_options = Options()
-# 禁用自动化标志（重要！）
-chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-chrome_options.add_experimental_option('useAutomationExtension', False)
 
-# === 启动浏览器 ===
-chromedriver_path = r"D:\PythonProject\practice-spider\chromedriver.exe"
-service = Service(executable_path=chromedriver_path)
-driver = webdriver.Chrome(service=service, options=chrome_options)
+def make_driver(driver_path=None, headless=False):
+    """
+    启动带反检测设置的 Chrome；driver_path 为空时由 auto_chromedriver 匹配本机 Chrome 版本。
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    chrome_options = Options()
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    if headless:
+        chrome_options.add_argument("--headless=new")  # 调试时建议关闭 headless
+
+    if driver_path is None:
+        from auto_chromedriver import get_chromedriver_path
+
+        driver_path = get_chromedriver_path()
+    driver = webdriver.Chrome(service=Service(executable_path=driver_path), options=chrome_options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    return driver
 
-# 绕过 webdriver 检测（关键 JS）
-driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
 
-titles_list = []  # 用于存储标题
+def search_first_page(query="Selenium 爬虫", driver_path=None, headless=False):
+    """
+    在百度首页搜索 query，打印第一页结果的标题和链接，返回各结果的完整链接文本列表。
+    """
+    from selenium.common.exceptions import NoSuchElementException, TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
 
-try:
-    driver.get("https://www.baidu.com")
-    print("当前 URL:", driver.current_url)
+    # === 启动浏览器（含反检测设置）===
+    driver = make_driver(driver_path, headless)
 
-    wait = WebDriverWait(driver, 15)
+    titles_list = []  # 用于存储标题
 
     try:
-        # 等待搜索框可见且可交互
-        search_box = wait.until(EC.visibility_of_element_located((By.ID, "chat-textarea")))
-        driver.execute_script("arguments[0].scrollIntoView(true);", search_box)
-        search_box.send_keys("Selenium 爬虫")
+        driver.get("https://www.baidu.com")
+        print("当前 URL:", driver.current_url)
+
+        wait = WebDriverWait(driver, 15)
+
+        try:
+            # 等待搜索框可见且可交互
+            search_box = wait.until(EC.visibility_of_element_located((By.ID, "chat-textarea")))
+            driver.execute_script("arguments[0].scrollIntoView(true);", search_box)
+            search_box.send_keys(query)
+
+            search_button = wait.until(EC.element_to_be_clickable((By.ID, "chat-submit-button")))
+            search_button.click()
+
+            WebDriverWait(driver, 10).until(EC.title_contains(query))
+            print("✅ 页面标题:", driver.title)
+
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.ID, "content_left"))
+            )
+
+            # === 提取所有搜索结果（标题 + 链接）===
+            # 一次 execute_script 取回全部结果，"text" 为整个链接的文本
+            spec = {
+                "item": "#content_left a.sc-link[href]",
+                "fields": {
+                    "title": BAIDU_RESULTS["fields"]["title"],
+                    "link": (None, "href"),
+                    "text": (None, "text"),
+                },
+            }
+            for record in extract_dom(driver, spec):
+                if record["title"] is None:
+                    # 跳过无法解析的单个结果
+                    continue
+                print(f"标题: {record['title']}")
+                print(f"链接: {record['link']}")
+                print("-" * 50)
 
-        search_button = wait.until(EC.element_to_be_clickable((By.ID, "chat-submit-button")))
-        search_button.click()
+                if record["text"]:
+                    titles_list.append(record["text"])
 
-        WebDriverWait(driver, 10).until(EC.title_contains("Selenium 爬虫"))
-        print("✅ 页面标题:", driver.title)
+        except (TimeoutException, NoSuchElementException) as e:
+            print("⚠️ 页面交互或元素定位失败:", e)
 
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, "content_left"))
-        )
+        return titles_list
 
-        # === 提取所有搜索结果（标题 + 链接）===
-        results = driver.find_elements(By.XPATH, "//div[@id='content_left']//a[contains(@class, 'sc-link') and @href]")
+    finally:
+        driver.quit()
 
-        for result in results:
-            try:
-                title_span = result.find_element(By.XPATH, ".//span[@class='tts-b-hl']")
-                title_text = title_span.text
-                link_url = result.get_attribute("href")
 
-                print(f"标题: {title_text}")
-                print(f"链接: {link_url}")
-                print("-" * 50)
+def main(query="Selenium 爬虫", summarize=False):
+    titles_list = search_first_page(query)
+    if summarize:
+        if titles_list:
+            print("\n🧠 正在调用 AI 进行总结...")
+            summary = summarize_with_qwen(titles_list)
+            print("\n✅ AI 总结结果：")
+            print(summary)
+        else:
+            print("⚠️ 未获取到任何标题，无法总结。")
+    return titles_list
+
 
-                title_text_clean = result.text.strip()
-                if title_text_clean:
-                    titles_list.append(title_text_clean)
-            except NoSuchElementException:
-                # 跳过无法解析的单个结果
-                continue
-
-    except (TimeoutException, NoSuchElementException) as e:
-        print("⚠️ 页面交互或元素定位失败:", e)
-
-    # if titles_list:
-    #     print("\n🧠 正在调用 AI 进行总结...")
-    #     summary = summarize_with_qwen(titles_list)
-    #     print("\n✅ AI 总结结果：")
-    #     print(summary)
-    # else:
-    #     print("⚠️ 未获取到任何标题，无法总结。")
-
-finally:
-    driver.quit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
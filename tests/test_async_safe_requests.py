@@ -0,0 +1,48 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_safe_requests import AsyncSafeClient  # noqa: E402
+
+
+async def _disconnecting_server():
+    """读完请求后不回响应直接断开（ServerDisconnected），返回 (server, url, 收到的请求数)"""
+    received = []
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        received.append(1)
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/submit", received
+
+
+def _post_count(**kwargs):
+    async def run():
+        server, url, received = await _disconnecting_server()
+        client = AsyncSafeClient(jitter=False)
+        try:
+            result = await client.post(url, data=b"payload", max_retries=2, backoff_factor=0, **kwargs)
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+        return result, len(received)
+
+    return asyncio.run(run())
+
+
+def test_post_sent_once_when_server_disconnects():
+    result, count = _post_count()
+    assert not result["success"]
+    assert count == 1
+
+
+def test_idempotent_post_retried_when_server_disconnects():
+    result, count = _post_count(retry_post=True)
+    assert not result["success"]
+    assert count == 3
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from distributed import SqliteQueue, run_worker  # noqa: E402
+from stand_in_server import StandInServer  # noqa: E402
+
+
+def _push(queue, shard, host, count, start=0):
+    return queue.push((shard, host, f"http://{host}/{i}") for i in range(start, start + count))
+
+
+def _shards(queue, host):
+    return {shard for (shard,) in queue._conn.execute("SELECT DISTINCT shard FROM tasks WHERE host = ?", (host,))}
+
+
+def test_steal_skips_hosts_with_claimed_tasks(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "q.db"))
+    _push(queue, 0, "a.test", 5)
+    _push(queue, 0, "b.test", 2)
+    assert queue.pop(0, 1) == [(1, "http://a.test/0")]
+
+    # a.test 排队更多，但正在被分片 0 抓取，只能窃取 b.test
+    assert queue.steal(1) == 2
+    assert _shards(queue, "b.test") == {1} and _shards(queue, "a.test") == {0}
+    # 之后加入的同主机 URL 进入新主人的分片
+    _push(queue, 0, "b.test", 1, start=2)
+    assert _shards(queue, "b.test") == {1}
+    # 新主人还没来得及领取，其他空闲分片也不能马上抢回去
+    assert queue.steal(2) == 0
+    queue.close()
+
+
+def test_stolen_host_can_move_again_after_owner_idle(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "q.db"), lease=0.2)
+    _push(queue, 0, "a.test", 3)
+    assert queue.steal(1) == 3
+    assert queue.steal(2) == 0
+    time.sleep(0.3)  # 分片 1 超过租期没有领取（多半已崩溃）
+    assert queue.steal(2) == 3
+    assert _shards(queue, "a.test") == {2}
+    queue.close()
+
+
+def test_unacked_tasks_requeued_after_lease(tmp_path):
+    queue = SqliteQueue(str(tmp_path / "q.db"), lease=0.2)
+    _push(queue, 0, "a.test", 3)
+    claimed = queue.pop(0, 3)
+    assert len(claimed) == 3 and queue.pop(0, 3) == []
+    queue.ack([claimed[0][0]])
+    assert queue.remaining() == (0, 2)
+
+    time.sleep(0.3)
+    assert queue.pop(0, 3) == claimed[1:]  # 已确认的不会回来
+    queue.ack([task_id for task_id, _ in claimed[1:]])
+    assert queue.remaining() == (0, 0)
+    queue.close()
+
+
+def test_parser_error_recorded_and_acked(tmp_path):
+    def parser(url, html):
+        if url.endswith("/bad"):
+            raise ValueError("broken page")
+        return [{"size": len(html)}]
+
+    db = str(tmp_path / "q.db")
+    with StandInServer(seed=1) as server:
+        host = server.base_url.split("//")[1]
+        queue = SqliteQueue(db)
+        queue.push((0, host, f"{server.base_url}/{name}") for name in ("a", "bad", "c"))
+        queue.close()
+        stats = run_worker(db, 0, parser=parser, concurrency=2, poll_interval=0.05)
+
+    queue = SqliteQueue(db)
+    results = {url.rsplit("/", 1)[1]: (status, error, records) for url, _, status, error, records in queue.results()}
+    assert queue.remaining() == (0, 0)
+    queue.close()
+    assert stats["fetched"] == 3 and stats["errors"] == 1 and stats["records"] == 2
+    assert results["bad"][0] == 200 and "broken page" in results["bad"][1] and results["bad"][2] == []
+    assert results["a"][1] is None and results["a"][2] == [{"size": 1024}]
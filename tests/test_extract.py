@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_extract import PARITY_CASES, synthetic_page  # noqa: E402
+from extract import DOUBAN_TOP250, extract  # noqa: E402
+
+
+@pytest.mark.parametrize("html", ["", "   \n\t", b"", b"  ", "<!-- 空页面 -->", '<?xml version="1.0"?>'])
+def test_empty_input(html):
+    assert extract(html, DOUBAN_TOP250, engine="lxml") == []
+    assert extract(html, DOUBAN_TOP250, engine="bs4") == []
+
+
+@pytest.mark.parametrize("html", PARITY_CASES + [synthetic_page(0)])
+def test_engines_agree(html):
+    assert extract(html, DOUBAN_TOP250, engine="lxml") == extract(html, DOUBAN_TOP250, engine="bs4")
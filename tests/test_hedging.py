@@ -0,0 +1,53 @@
+import asyncio
+import os
+import sys
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_safe_requests import AsyncSafeClient  # noqa: E402
+from hedging import HedgePolicy  # noqa: E402
+from resilience import CircuitBreaker, RetryBudget  # noqa: E402
+
+
+async def _slow_first_server():
+    """第一个请求 1 秒后才返回，之后的请求立即返回，保证对冲请求胜出、主请求被取消"""
+    calls = []
+
+    async def handle(request):
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", calls
+
+
+def test_cancelled_hedge_loser_not_counted_as_failure():
+    async def run():
+        runner, base, calls = await _slow_first_server()
+        breaker = CircuitBreaker(failure_threshold=1)
+        policy = HedgePolicy(default_delay=0.05, budget=RetryBudget(ratio=1.0, max_tokens=10.0))
+        client = AsyncSafeClient(circuit_breaker=breaker, hedge_policy=policy)
+        try:
+            first = await client.get(base + "/a", hedge=True)
+            await asyncio.sleep(0.05)  # 让被取消的主请求走完 finally
+            state = breaker.state(base.split("//")[1])
+            second = await client.get(base + "/b")
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return first, state, second, len(calls)
+
+    first, state, second, calls = asyncio.run(run())
+    assert first["success"] and calls >= 2
+    assert state == CircuitBreaker.CLOSED
+    assert second["success"]
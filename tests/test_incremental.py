@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incremental import FingerprintStore  # noqa: E402
+
+ARTICLE = " ".join(f"第{i}段：Selenium 显式等待、动态加载、反爬策略与代理池的实践记录。" for i in range(40))
+
+
+def _page(i):
+    # 正文相同，只有页脚的访问计数不同：精确哈希不同，SimHash 几乎相同
+    return f"<html><body><article>{ARTICLE}</article><footer>访问 {i}</footer></body></html>"
+
+
+def test_near_duplicates_within_one_run(tmp_path):
+    store = FingerprintStore(str(tmp_path / "fp.db"))
+    urls = [f"https://example.com/mirror/{i}" for i in range(20)]
+    changes = [store.check(url, _page(i)) for i, url in enumerate(urls)]
+
+    # 都还没 commit（记录尚未写出），后面的页面也能发现前面的近似重复
+    assert all(c.changed and c.new for c in changes)
+    assert changes[0].near_duplicates == []
+    assert all(changes[i].near_duplicates for i in range(1, 20))
+    assert set(changes[-1].near_duplicates) == set(urls[:-1])
+    assert store.stats["near_duplicates"] == 19
+    assert store._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0] == 0
+
+    for change in changes:
+        store.commit(change)
+    assert store._pending == {} and not store._pending_bands
+    store.close()
+
+    # 提交后写入数据库，下次运行从库里查到
+    store = FingerprintStore(str(tmp_path / "fp.db"))
+    change = store.check("https://example.com/mirror/new", _page(99))
+    assert set(change.near_duplicates) == set(urls)
+    store.close()
+
+
+def test_unchanged_page_skipped_after_commit(tmp_path):
+    store = FingerprintStore(str(tmp_path / "fp.db"))
+    change = store.check("https://example.com/a", _page(1))
+    assert change.changed
+    store.commit(change)
+    assert not store.check("https://example.com/a", _page(1)).changed
+    store.close()
@@ -0,0 +1,28 @@
+import os
+import socket
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Metrics  # noqa: E402
+from safe_requests import SafeClient  # noqa: E402
+from stand_in_server import StandInServer  # noqa: E402
+
+
+def test_falls_back_to_next_resolved_address(monkeypatch):
+    """第一个解析结果连不上（127.0.0.2 上没有监听）时，开启 metrics 也要换下一个地址"""
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host == "multi.test":
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (ip, port)) for ip in ("127.0.0.2", "127.0.0.1")]
+        return real_getaddrinfo(host, port, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    with StandInServer(seed=1) as server:
+        metrics = Metrics()
+        client = SafeClient(metrics=metrics)
+        host = f"multi.test:{server.port}"
+        result = client.get(f"http://{host}/a", max_retries=0)
+        assert result["success"] and result["response"].status_code == 200
+        assert metrics.histogram(host, "connect").count == 1
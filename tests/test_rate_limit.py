@@ -0,0 +1,88 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limit import AutoThrottle, TokenBucket  # noqa: E402
+
+
+def _throttle():
+    # 间隔为 0、并发为 1：只测试并发名额的排队
+    return AutoThrottle(start_delay=0.0, max_concurrency=1)
+
+
+def test_async_waiters_served_in_order():
+    async def run():
+        throttle = _throttle()
+        await throttle.acquire_async("h")
+        order = []
+
+        async def waiter(i):
+            await throttle.acquire_async("h")
+            order.append(i)
+            throttle.release("h")
+
+        tasks = [asyncio.create_task(waiter(i)) for i in range(5)]
+        await asyncio.sleep(0.01)
+        assert order == []
+        throttle.release("h")
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        return order, throttle._hosts["h"].active
+
+    order, active = asyncio.run(run())
+    assert order == [0, 1, 2, 3, 4]
+    assert active == 0
+
+
+def test_waiters_do_not_poll():
+    async def run():
+        throttle = _throttle()
+        await throttle.acquire_async("h")
+        task = asyncio.create_task(throttle.acquire_async("h"))
+        await asyncio.sleep(0.01)
+        wakeups = 0
+        original = asyncio.sleep
+
+        async def counting_sleep(*args, **kwargs):
+            nonlocal wakeups
+            wakeups += 1
+            return await original(*args, **kwargs)
+
+        asyncio.sleep = counting_sleep
+        try:
+            await original(0.2)
+        finally:
+            asyncio.sleep = original
+        assert not task.done()
+        throttle.release("h")
+        await asyncio.wait_for(task, 1)
+        return wakeups
+
+    assert asyncio.run(run()) == 0
+
+
+def test_cancelled_waiter_returns_slot():
+    async def run():
+        throttle = _throttle()
+        await throttle.acquire_async("h")
+        cancelled = asyncio.create_task(throttle.acquire_async("h"))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        throttle.release("h")
+        await asyncio.wait_for(throttle.acquire_async("h"), 1)
+        throttle.release("h")
+        return throttle._hosts["h"].active
+
+    assert asyncio.run(run()) == 0
+
+
+def test_requests_after_pause_are_paced():
+    bucket = TokenBucket(10, burst=1)
+    bucket.reserve()
+    bucket.pause(0.5)
+    waits = [bucket.reserve() for _ in range(4)]
+    gaps = [b - a for a, b in zip(waits, waits[1:])]
+    assert waits[0] >= 0.5
+    assert all(abs(gap - 0.1) < 0.01 for gap in gaps)
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from safe_requests import SafeClient, safe_get, safe_post  # noqa: E402
+from stand_in_server import StandInServer  # noqa: E402
+
+KEYS = ("success", "response", "data", "error")
+
+
+def test_session_and_connection_reused():
+    with StandInServer(seed=1) as server:
+        client = SafeClient()
+        results = [client.get(server.base_url + f"/page/{i}") for i in range(5)]
+        assert all(r["success"] for r in results)
+        assert len(client._sessions) == 1
+        assert server.requests == 5
+        assert len(server.peers) == 1  # 5 个请求走同一个 keep-alive 连接
+
+
+def test_get_retried_on_503():
+    with StandInServer(seed=1) as server:
+        result = SafeClient().get(server.base_url + "/a?error_rate=1", max_retries=2, backoff_factor=0)
+        assert server.requests == 3
+        assert not result["success"]
+        assert result["response"] is None and result["error"]
+
+
+def test_get_waits_for_retry_after():
+    with StandInServer(seed=1) as server:
+        start = time.perf_counter()
+        SafeClient().get(server.base_url + "/a?error_rate=1&retry_after=1", max_retries=1, backoff_factor=0)
+        assert server.requests == 2
+        assert time.perf_counter() - start >= 1
+
+
+def test_post_not_retried_unless_idempotent():
+    with StandInServer(seed=1) as server:
+        client = SafeClient()
+        result = client.post(server.base_url + "/a?error_rate=1", data={"q": 1}, max_retries=2, backoff_factor=0)
+        assert server.requests == 1
+        # 非 2xx 也算请求成功，由调用方检查状态码
+        assert result["success"] and result["response"].status_code == 503
+
+        client.post(server.base_url + "/a?error_rate=1", data={"q": 1},
+                    max_retries=2, backoff_factor=0, retry_post=True)
+        assert server.requests == 4
+
+
+def test_return_shapes_unchanged():
+    with StandInServer(seed=1) as server:
+        text = safe_get(server.base_url + "/a")
+        assert tuple(text.keys()) == KEYS and tuple(dict(text)) == KEYS
+        assert text["success"] and text["error"] is None
+        assert isinstance(text["data"], str) and text["response"].status_code == 200
+
+        data = safe_get(server.base_url + "/a?json=1", return_json=True)
+        assert data["data"] == {"path": "/a", "size": 1024}
+
+        posted = safe_post(server.base_url + "/reventondc/suggV3",
+                           data={"text": "hi", "to": "en"}, return_json=True)
+        assert tuple(posted.keys()) == KEYS
+        assert posted["data"]["sugg"][0]["k"] == "hi"
+
+    failed = safe_get("http://127.0.0.1:1/", max_retries=0)
+    assert dict(failed) == {"success": False, "response": None, "data": None,
+                            "error": "网络连接错误（DNS失败、拒绝连接等）"}
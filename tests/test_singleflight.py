@@ -0,0 +1,44 @@
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_safe_requests import AsyncSafeClient  # noqa: E402
+from safe_requests import SafeClient  # noqa: E402
+from singleflight import AsyncSingleFlight, SingleFlight  # noqa: E402
+from stand_in_server import StandInServer  # noqa: E402
+
+
+def _check_independent(results):
+    """一个调用方 release() 之后，其他调用方的 response 和正文仍然可用"""
+    assert len({id(r) for r in results}) == len(results)
+    body = results[1].data
+    results[0].release()
+    assert results[0].response is None and results[0].data == body
+    assert all(r.response is not None and r.status == 200 for r in results[1:])
+    assert all(r.data == body for r in results[1:])
+
+
+def test_thread_callers_get_own_result():
+    with StandInServer(latency=0.2, seed=1) as server:
+        client = SafeClient(single_flight=SingleFlight())
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(lambda _: client.get(server.base_url + "/a"), range(5)))
+        assert server.requests == 1
+        _check_independent(results)
+
+
+def test_async_callers_get_own_result():
+    async def run(url):
+        client = AsyncSafeClient(single_flight=AsyncSingleFlight())
+        try:
+            return await asyncio.gather(*(client.get(url) for _ in range(5)))
+        finally:
+            await client.close()
+
+    with StandInServer(latency=0.2, seed=1) as server:
+        results = asyncio.run(run(server.base_url + "/a"))
+        assert server.requests == 1
+        _check_independent(results)
@@ -0,0 +1,65 @@
+import hashlib
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from summarize import REDUCE_PROMPT, Summarizer, chunk_items  # noqa: E402
+
+REDUCE_HEAD = REDUCE_PROMPT.split("“")[0]
+
+
+def _reply(prompt):
+    return "总结-" + hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+
+
+class RecordingModel:
+    """记录每次收到的提示词，返回由提示词决定的固定文本"""
+
+    name = "recording"
+
+    def __init__(self):
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+        return _reply(prompt)
+
+    def split(self):
+        """按提示词开头区分 (map 提示词, reduce 提示词)"""
+        reduce = [p for p in self.prompts if p.startswith(REDUCE_HEAD)]
+        return [p for p in self.prompts if p not in reduce], reduce
+
+
+def _items(prompt):
+    return [line[2:] for line in prompt.splitlines() if line.startswith("- ")]
+
+
+def test_map_reduce_and_cache(tmp_path):
+    titles = [f"Selenium 爬虫实战第 {i} 篇：显式等待与动态加载" for i in range(60)]
+    titles += titles[:10] + ["", "  "]  # 重复和空标题不参与总结
+    unique = titles[:60]
+    expected_chunks = chunk_items(unique, 200)
+    assert len(expected_chunks) > 1
+
+    model = RecordingModel()
+    summary = Summarizer(model, max_tokens=200, concurrency=4, cache_dir=tmp_path).summarize(titles)
+
+    maps, reduces = model.split()
+    assert len(maps) == len(expected_chunks)
+    assert sorted(_items(p) for p in maps) == sorted(expected_chunks)
+    # 分块总结按块的顺序、原样作为 reduce 的输入（map 是并发的，先按块顺序排好）
+    assert len(reduces) == 1
+    ordered = sorted(maps, key=lambda p: expected_chunks.index(_items(p)))
+    assert _items(reduces[0]) == [_reply(p) for p in ordered]
+    assert summary == _reply(reduces[0])
+
+    # 第二次运行：相同输入全部命中磁盘缓存，不再调用模型
+    again = RecordingModel()
+    summarizer = Summarizer(again, max_tokens=200, concurrency=4, cache_dir=tmp_path)
+    assert summarizer.summarize(titles) == summary
+    assert again.prompts == []
+    assert summarizer.stats == {"calls": 0, "cache_hits": len(maps) + 1}
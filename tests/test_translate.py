@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stand_in_server import StandInServer  # noqa: E402
+from translate import TranslationMemo, Translator  # noqa: E402
+
+
+def _translator(server, **kwargs):
+    return Translator(server.base_url + "/reventondc/suggV3", target="en",
+                      memo=TranslationMemo(None), rate=1000, **kwargs)
+
+
+def test_duplicate_lines_request_once():
+    with StandInServer(latency=0.05, seed=1) as server:
+        translator = _translator(server)
+        lines = ["apple\n", "apple", "", "pear", "  apple  ", "pear"]
+        results = list(translator.translate_lines(lines))
+        assert [text for text, _ in results] == ["apple", "apple", "pear", "apple", "pear"]
+        assert results[0][1] == [{"k": "apple", "v": "apple 的译文（en）"}]
+        assert all(sugg == results[0][1] for text, sugg in results if text == "apple")
+        assert server.requests == 2
+        assert translator.stats["duplicates"] == 3
+
+        # 第二次全部命中缓存
+        assert list(translator.translate_lines(lines)) == results
+        assert server.requests == 2
+        translator.close()
+
+
+def test_early_stop_does_not_drain_window():
+    with StandInServer(latency=0.2, seed=1) as server:
+        translator = _translator(server, concurrency=2, window=1000)
+        lines = (f"word {i}" for i in range(40))
+        started = time.perf_counter()
+        results = translator.translate_lines(lines)
+        first = next(results)
+        results.close()
+        elapsed = time.perf_counter() - started
+        time.sleep(0.3)  # 让已经发出的请求结束
+        assert first[0] == "word 0"
+        # 排队的 38 个请求被取消：不会再花 38 * 0.2 / 2 秒把窗口跑完
+        assert elapsed < 1
+        assert server.requests <= 4
+        translator.close()
@@ -0,0 +1,122 @@
+import importlib.util
+import os
+import queue
+import sys
+import threading
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webdriver_pool import WebDriverPool  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def selenium_exceptions(monkeypatch):
+    """没有安装 selenium 时只补上 release() 用到的异常模块，浏览器本身由 FakeDriver 代替"""
+    if importlib.util.find_spec("selenium") is not None:
+        return
+    exceptions = types.ModuleType("selenium.common.exceptions")
+    exceptions.WebDriverException = type("WebDriverException", (Exception,), {})
+    monkeypatch.setitem(sys.modules, "selenium", types.ModuleType("selenium"))
+    monkeypatch.setitem(sys.modules, "selenium.common", types.ModuleType("selenium.common"))
+    monkeypatch.setitem(sys.modules, "selenium.common.exceptions", exceptions)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.cdp = []
+        self.quit_called = False
+        self.current_window_handle = "tab"
+        self.switch_to = types.SimpleNamespace(new_window=lambda kind: None, window=lambda handle: None)
+
+    def execute_script(self, script):
+        return "https://example.com"
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append(cmd)
+
+    def close(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakePool(WebDriverPool):
+    """_create 返回 FakeDriver；fail 为 True 时模拟 Chrome 启动失败"""
+
+    def __init__(self, **kwargs):
+        super().__init__(driver_path="chromedriver", **kwargs)
+        self.fail = False
+        self.created = []
+
+    def _create(self):
+        if self.fail:
+            raise RuntimeError("chrome crashed")
+        driver = FakeDriver()
+        self._prepare_tab(driver)
+        self.created.append(driver)
+        return driver
+
+
+def test_release_recycles_tab_and_clears_cookies():
+    pool = FakePool(size=1)
+    driver = pool.acquire()
+    pool.release(driver)
+    assert "Network.clearBrowserCookies" in driver.cdp
+    assert "Storage.clearDataForOrigin" in driver.cdp
+    assert pool.acquire(timeout=1) is driver and not driver.quit_called
+
+
+def test_driver_replaced_after_max_uses():
+    pool = FakePool(size=1, max_uses=2)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire(timeout=1) is first
+    pool.release(first)
+    assert first.quit_called
+    second = pool.acquire(timeout=1)
+    assert second is not first and pool._drivers == [second]
+    pool.release(second)
+    assert not second.quit_called  # 新实例从 0 开始计数
+
+
+def test_failed_recreation_keeps_pool_size():
+    pool = FakePool(size=2)
+    broken = pool.acquire()
+    pool.fail = True
+    pool.release(broken, broken=True)  # 重建失败不抛出
+    assert broken.quit_called and pool._missing == 1 and len(pool._drivers) == 1
+
+    pool.fail = False
+    drivers = [pool.acquire(timeout=1), pool.acquire(timeout=1)]  # acquire 时补建
+    assert pool._missing == 0 and len(pool._drivers) == 2
+    assert broken not in drivers
+
+
+def test_acquire_raises_when_every_browser_failed():
+    pool = FakePool(size=2)
+    drivers = [pool.acquire(), pool.acquire()]
+    pool.fail = True
+    for driver in drivers:
+        pool.release(driver, broken=True)
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=1)
+
+
+def test_acquire_blocks_until_release():
+    pool = FakePool(size=1)
+    driver = pool.acquire()
+    with pytest.raises(queue.Empty):
+        pool.acquire(timeout=0.05)
+
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=2)))
+    waiter.start()
+    waiter.join(0.1)
+    assert waiter.is_alive() and not got
+    pool.release(driver)
+    waiter.join(2)
+    assert got == [driver]
@@ -0,0 +1,247 @@
+import json
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+SUGG_URL = "https://fanyi.sogou.com/reventondc/suggV3"
+
+
+class TranslationMemo:
+    """
+    翻译结果的两级缓存：内存 LRU + SQLite，键为 (text, from, to)。
+
+    参数:
+        db_path (str): SQLite 文件路径，默认 translate_memo.db；None 表示只用内存
+        memory_items (int): 内存层最多保存的条目数，默认 10000
+    """
+
+    def __init__(self, db_path="translate_memo.db", memory_items=10_000):
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path is not None:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS memo ("
+                "text TEXT, source TEXT, target TEXT, sugg TEXT, PRIMARY KEY (text, source, target))"
+            )
+
+    def _remember(self, key, sugg):
+        self._memory[key] = sugg
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, text, source, target):
+        """返回缓存的 sugg 列表，未命中返回 None"""
+        key = (text, source, target)
+        with self._lock:
+            sugg = self._memory.get(key)
+            if sugg is not None:
+                self._memory.move_to_end(key)
+                return sugg
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT sugg FROM memo WHERE text = ? AND source = ? AND target = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            sugg = json.loads(row[0])
+            self._remember(key, sugg)
+            return sugg
+
+    def put(self, text, source, target, sugg):
+        key = (text, source, target)
+        with self._lock:
+            self._remember(key, sugg)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("INSERT OR REPLACE INTO memo VALUES (?, ?, ?, ?)",
+                                       (*key, json.dumps(sugg, ensure_ascii=False)))
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class Translator:
+    """
+    搜狗翻译建议（suggV3）的批量翻译：去重、查缓存，未命中的并发请求并限速，结果按输入顺序流式返回。
+
+    用法:
+        translator = Translator()
+        for text, sugg in translator.translate_lines(open("terms.txt", encoding="utf-8")):
+            ...  # sugg 为 [{"k": ..., "v": ...}, ...]，请求失败时为 None
+
+    参数:
+        url (str): 接口地址，默认搜狗 suggV3；测试时可指向 StandInServer 的 /reventondc/suggV3
+        source (str): 源语言，默认 auto
+        target (str): 目标语言，默认 zh-CHS
+        memo (TranslationMemo, optional): 结果缓存，默认 TranslationMemo()
+        concurrency (int): 并发请求数，默认 8
+        rate (float): 每秒最多请求数，默认 5
+        window (int): 最多提前处理的行数，控制乱序完成时缓冲的结果数量，默认 1000
+        client (SafeClient, optional): 发送请求的客户端，默认按 concurrency 和 rate 创建
+    """
+
+    def __init__(self,
+                 url=SUGG_URL,
+                 source="auto",
+                 target="zh-CHS",
+                 memo=None,
+                 concurrency=8,
+                 rate=5.0,
+                 window=1000,
+                 client=None):
+        self.url = url
+        self.source = source
+        self.target = target
+        self.memo = memo if memo is not None else TranslationMemo()
+        self.concurrency = concurrency
+        self.window = window
+        if client is None:
+            # requests 等依赖在真正需要客户端时才导入，translate --help 不必加载
+            from rate_limit import HostRateLimiter
+            from safe_requests import SafeClient
+
+            client = SafeClient(pool_maxsize=concurrency, rate_limiter=HostRateLimiter(rate=rate, burst=concurrency))
+        self.client = client
+        self.uuid = str(uuid.uuid4())
+        self.stats = {"lines": 0, "memo_hits": 0, "duplicates": 0, "requests": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def _fetch(self, text):
+        data = {
+            "text": text,
+            "from": self.source,
+            "to": self.target,
+            "client": "web",
+            "uuid": self.uuid,
+            "pid": "sogou-dict-vr",
+            "addSugg": "on",
+        }
+        # 翻译建议是幂等查询，允许重试
+        result = self.client.post(self.url, data=data, return_json=True, retry_post=True)
+        failed = not result["success"] or not isinstance(result["data"], dict)
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["errors"] += failed
+        if failed:
+            print(f"❌ 翻译失败 {text!r}: {result['error'] or '响应不是 JSON 对象'}")
+            return None
+        sugg = result["data"].get("sugg", [])
+        self.memo.put(text, self.source, self.target, sugg)
+        return sugg
+
+    def translate(self, text):
+        """翻译单个文本，返回 sugg 列表，失败时返回 None"""
+        sugg = self.memo.get(text, self.source, self.target)
+        return sugg if sugg is not None else self._fetch(text)
+
+    def translate_lines(self, lines):
+        """
+        逐行翻译（去掉首尾空白，跳过空行），按输入顺序生成 (text, sugg)。
+
+        lines 可以是文件对象等任意可迭代对象，不会一次性读入内存；
+        重复的行只请求一次，之前翻译过的直接从缓存返回。
+        """
+        pending = deque()   # (text, future)，按输入顺序
+        in_flight = {}      # text -> 尚未输出的 future，相同的行共用一个请求
+
+        def drain(block):
+            while pending and (block or pending[0][1].done() or len(pending) >= self.window):
+                text, future = pending.popleft()
+                yield text, future.result()
+                if in_flight.get(text) is future:
+                    del in_flight[text]
+
+        # 不用 with：调用方提前停止迭代（break、异常、close()）时，with 会等完窗口内所有排队的请求
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            for line in lines:
+                text = line.strip()
+                if not text:
+                    continue
+                self.stats["lines"] += 1
+                future = in_flight.get(text)
+                if future is not None:
+                    self.stats["duplicates"] += 1
+                else:
+                    sugg = self.memo.get(text, self.source, self.target)
+                    if sugg is not None:
+                        self.stats["memo_hits"] += 1
+                        future = Future()
+                        future.set_result(sugg)
+                    else:
+                        future = executor.submit(self._fetch, text)
+                    in_flight[text] = future
+                pending.append((text, future))
+                yield from drain(block=False)
+            yield from drain(block=True)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        self.client.close()
+        self.memo.close()
+
+
+def main(argv=None):
+    """命令行入口：python translate.py terms.txt -o out.jsonl，或 spider translate ..."""
+    import argparse
+    import contextlib
+    import sys
+    import time
+
+    from sinks import open_sink
+
+    parser = argparse.ArgumentParser(description="批量翻译文本文件中的每一行（搜狗 suggV3）")
+    parser.add_argument("input", nargs="?", default="-", help="输入文件，每行一个词条，默认读标准输入")
+    parser.add_argument("-o", "--output", default=None, help="输出文件（.jsonl / .csv / .db），默认打印")
+    parser.add_argument("--from", dest="source", default="auto")
+    parser.add_argument("--to", dest="target", default="zh-CHS")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=5.0, help="每秒最多请求数")
+    parser.add_argument("--url", default=SUGG_URL, help="接口地址")
+    parser.add_argument("--memo", default="translate_memo.db", help="缓存数据库")
+    parser.add_argument("--stand-in", action="store_true", help="使用本地替身接口（测试用）")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.stand_in:
+        from stand_in_server import StandInServer
+        server = StandInServer(latency=0.05)
+        args.url = server.start() + "/reventondc/suggV3"
+
+    translator = Translator(args.url, args.source, args.target, memo=TranslationMemo(args.memo),
+                            concurrency=args.concurrency, rate=args.rate)
+    sink = open_sink(args.output) if args.output else None
+    started = time.perf_counter()
+    try:
+        with (contextlib.nullcontext(sys.stdin) if args.input == "-"
+              else open(args.input, encoding="utf-8")) as lines:
+            for text, sugg in translator.translate_lines(lines):
+                if sink is not None:
+                    sink.write({"text": text, "sugg": sugg})
+                else:
+                    print(f"{text}\t" + "; ".join(f"{item['k']}: {item['v']}" for item in sugg or []))
+    finally:
+        if sink is not None:
+            sink.close()
+        translator.close()
+        if server is not None:
+            server.stop()
+    print(f"{translator.stats}，用时 {time.perf_counter() - started:.2f} 秒", file=sys.stderr)
+    return translator.stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# 默认屏蔽的资源类型及对应的 URL 模式（用于 CDP Network.setBlockedURLs）
+RESOURCE_PATTERNS = {
+    "Image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.bmp*"],
+    "Font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "Stylesheet": ["*.css*"],
+    "Media": ["*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*"],
+}
+BLOCKED_RESOURCES = ("Image", "Font", "Stylesheet", "Media")
+
+# 与 test.py 相同的反检测脚本，改为在每个新文档加载前注入
+_HIDE_WEBDRIVER_JS = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+
+class WebDriverPool:
+    """
+    可复用的无头 Chrome 池：启动时一次性创建 size 个浏览器，之后的任务轮流借用，不再每次冷启动。
+
+    - 页面加载策略为 eager：DOMContentLoaded 后即返回，不等图片等子资源
+    - 通过 CDP（Network.setBlockedURLs）屏蔽图片、字体、样式表和音视频请求，
+      图片另外用 Chrome 偏好设置禁用；setBlockedURLs 只能按 URL 匹配，
+      没有扩展名的资源（如动态图片接口）不会被屏蔽
+    - 任务之间打开新标签页并关闭旧标签页、清空 Cookie，相当于一个干净的上下文
+    - 设置 max_uses 时，浏览器执行满 max_uses 个任务后关闭并换一个新的，避免 Chrome 长时间运行内存上涨
+    - chromedriver 默认由 auto_chromedriver 获取（热启动不联网）
+
+    用法:
+        with WebDriverPool(size=4) as pool:
+            records = pool.map(scrape_page, urls)      # scrape_page(driver, url)
+            with pool.driver() as driver:              # 也可以手动借用
+                driver.get(url)
+
+    参数:
+        size (int): 浏览器实例数，默认 4
+        driver_path (str, optional): chromedriver 路径，默认由 auto_chromedriver 获取
+        headless (bool): 是否无头运行，默认 True
+        block_resources (iterable): 要屏蔽的资源类型（RESOURCE_PATTERNS 的键），默认 BLOCKED_RESOURCES
+        page_load_timeout (float): 页面加载超时（秒），默认 30
+        fresh_tab (bool): 每次归还时是否换新标签页并清空 Cookie，默认 True
+        max_uses (int, optional): 每个浏览器最多执行的任务数，达到后换新实例；默认 None 不限制
+    """
+
+    def __init__(self,
+                 size=4,
+                 driver_path=None,
+                 headless=True,
+                 block_resources=BLOCKED_RESOURCES,
+                 page_load_timeout=30,
+                 fresh_tab=True,
+                 max_uses=None):
+        self.size = size
+        self.driver_path = driver_path
+        self.headless = headless
+        self.block_resources = tuple(block_resources or ())
+        self.blocked_urls = [pattern for kind in self.block_resources for pattern in RESOURCE_PATTERNS[kind]]
+        self.page_load_timeout = page_load_timeout
+        self.fresh_tab = fresh_tab
+        self.max_uses = max_uses
+        self._uses = {}  # 浏览器 -> 已执行的任务数
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._missing = 0  # 重建失败、尚未补上的浏览器数
+
+    def _options(self):
+        from selenium.webdriver.chrome.options import Options
+
+        options = Options()
+        if self.headless:
+            options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--no-first-run")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option("useAutomationExtension", False)
+        if "Image" in self.block_resources:
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        options.page_load_strategy = "eager"
+        return options
+
+    def _prepare_tab(self, driver):
+        """CDP 设置只对当前标签页生效，每个新标签页都要重新设置"""
+        if self.blocked_urls:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls})
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _HIDE_WEBDRIVER_JS})
+
+    def _create(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        driver = webdriver.Chrome(service=Service(executable_path=self.driver_path), options=self._options())
+        driver.set_page_load_timeout(self.page_load_timeout)
+        self._prepare_tab(driver)
+        return driver
+
+    def start(self):
+        """并行启动所有浏览器；多次调用只启动一次"""
+        with self._lock:
+            if self._started:
+                return self
+            if self.driver_path is None:
+                from auto_chromedriver import get_chromedriver_path
+                self.driver_path = get_chromedriver_path()
+                if not self.driver_path:
+                    raise RuntimeError("未找到可用的 chromedriver")
+            with ThreadPoolExecutor(max_workers=self.size) as executor:
+                drivers = list(executor.map(lambda _: self._create(), range(self.size)))
+            for driver in drivers:
+                self._drivers.append(driver)
+                self._idle.put(driver)
+            self._started = True
+        return self
+
+    def _recycle(self, driver):
+        """换一个新标签页并清空 Cookie 和上一个页面所在源的存储，让下一个任务从干净的状态开始"""
+        origin = driver.execute_script("return location.origin")
+        old = driver.current_window_handle
+        driver.switch_to.new_window("tab")
+        new = driver.current_window_handle
+        driver.switch_to.window(old)
+        driver.close()
+        driver.switch_to.window(new)
+        # delete_all_cookies 只删除当前文档所在域的 Cookie，新标签页是 about:blank，必须用 CDP 清空整个浏览器
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        if origin and origin.startswith("http"):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        self._prepare_tab(driver)
+
+    def _replace(self, driver):
+        """浏览器已损坏（崩溃、会话失效等）时关闭它，并补上一个新的放回池中"""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            self._uses.pop(driver, None)
+            self._missing += 1
+        self._refill()
+
+    def _refill(self):
+        """
+        补建之前创建失败的浏览器，保持池的大小；失败时只打印错误，留到下次 acquire 再试。
+
+        返回最后一次失败的异常，全部成功时返回 None。
+        """
+        while True:
+            with self._lock:
+                if not self._missing:
+                    return None
+                self._missing -= 1
+            try:
+                fresh = self._create()
+            except Exception as e:
+                with self._lock:
+                    self._missing += 1
+                print(f"❌ 重建浏览器失败，稍后重试: {e}")
+                return e
+            with self._lock:
+                self._drivers.append(fresh)
+            self._idle.put(fresh)
+
+    def acquire(self, timeout=None):
+        """借出一个空闲浏览器，没有空闲时等待；超时抛出 queue.Empty"""
+        self.start()
+        error = self._refill()
+        if error is not None:
+            with self._lock:
+                alive = bool(self._drivers)
+            if not alive and self._idle.empty():
+                raise RuntimeError("池中没有可用的浏览器，重建失败") from error
+        return self._idle.get(timeout=timeout)
+
+    def release(self, driver, broken=False):
+        """
+        归还浏览器；broken=True、重置失败或已执行满 max_uses 个任务时换一个新实例放回池中。
+
+        新实例创建失败不会抛出（以免掩盖任务本身的异常），池会在之后的 acquire 中补建。
+        """
+        from selenium.common.exceptions import WebDriverException
+
+        if not broken and self.max_uses:
+            with self._lock:
+                uses = self._uses[driver] = self._uses.get(driver, 0) + 1
+            if uses >= self.max_uses:
+                self._replace(driver)
+                return
+        if not broken and self.fresh_tab:
+            try:
+                self._recycle(driver)
+            except WebDriverException:
+                broken = True
+        if broken:
+            self._replace(driver)
+        else:
+            self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """借用一个浏览器的上下文管理器，任务抛出 WebDriverException 时视为浏览器损坏"""
+        from selenium.common.exceptions import WebDriverException
+
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def map(self, job, items):
+        """
+        把 items 分发到池中并发执行 job(driver, item)，按输入顺序返回结果列表。
+        任一任务抛出异常时在对应位置重新抛出。
+        """
+        self.start()
+
+        def run(item):
+            with self.driver() as driver:
+                return job(driver, item)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(run, items))
+
+    def close(self):
+        """关闭所有浏览器"""
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+            self._uses = {}
+            self._started = False
+            self._missing = 0
+        self._idle = queue.Queue()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    # 用本地静态页面演示：selenium_baiduSearch 的 5 页搜索结果分发到池中并发抓取，并统计被屏蔽资源是否被请求
+    import argparse
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+
+    from bench_dom_extract import fixture_page
+    from selenium_baiduSearch import scrape_results_page, search_page_urls
+
+    parser = argparse.ArgumentParser(description="WebDriver 池演示（本地页面）")
+    parser.add_argument("--size", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--driver", default=None, help="chromedriver 路径，默认由 auto_chromedriver 获取")
+    args = parser.parse_args()
+
+    asset_hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = urlsplit(self.path)
+            if path.path != "/s":
+                asset_hits.append(self.path)
+                self.send_response(404)
+                self.end_headers()
+                return
+            page = int(parse_qs(path.query).get("pn", ["0"])[0]) // 10
+            body = fixture_page(10).replace("</head>", "<link rel='stylesheet' href='/style.css'></head>")
+            body = body.replace("搜索结果标题", f"第 {page + 1} 页 标题").replace("<body>", "<body><img src='/logo.png'>")
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/s?wd={{query}}&pn={{offset}}"
+    urls = search_page_urls("Selenium 爬虫", args.pages, base_url)
+
+    started = time.perf_counter()
+    with WebDriverPool(size=args.size, driver_path=args.driver) as pool:
+        warmed = time.perf_counter()
+        pages = pool.map(scrape_results_page, urls)
+    finished = time.perf_counter()
+
+    for url, records in zip(urls, pages):
+        print(url, "->", len(records), "条，首条:", records[0]["title"] if records else None)
+    print(f"启动 {warmed - started:.2f} 秒，抓取 {len(urls)} 页 {finished - warmed:.2f} 秒")
+    print("被请求的静态资源:", asset_hits or "无（已全部屏蔽）")
+    server.shutdown()